@@ -0,0 +1,163 @@
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_COLUMNS = [
+    "application_id",
+    "applied_at",
+    "status",
+    "priority",
+    "rating",
+    "vacancy_id",
+    "vacancy_title",
+    "vacancy_position",
+    "player_id",
+    "player_name",
+    "player_email",
+    "player_position",
+    "player_experience",
+    "player_location",
+    "player_country",
+    "player_age",
+    "cover_letter",
+    "notes"
+]
+
+PLAYER_EXPORT_PROJECTION = {
+    "_id": 0, "id": 1, "name": 1, "email": 1, "position": 1,
+    "experience_level": 1, "location": 1, "country": 1, "age": 1
+}
+
+APPLICATION_EXPORT_PROJECTION = {
+    "_id": 0, "id": 1, "applied_at": 1, "status": 1, "priority": 1, "rating": 1,
+    "vacancy_id": 1, "player_id": 1, "player_name": 1, "cover_letter": 1, "notes": 1
+}
+
+
+def _cell(value):
+    """Plain export value, neutralising spreadsheet formula injection"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value
+    return value
+
+
+async def iter_applicant_chunks(db, club_id: str, status: Optional[str] = None,
+                                vacancy_id: Optional[str] = None,
+                                chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[List[Dict]]:
+    """
+    Yield export rows for a club's applicants, one chunk at a time
+
+    Applications are read from a single cursor. Each chunk resolves its
+    players with one $in query, so memory stays bounded by chunk_size
+    regardless of how many applicants the club has.
+    """
+    vacancy_filter = {"club_id": club_id}
+    if vacancy_id:
+        vacancy_filter["id"] = vacancy_id
+
+    vacancies = {}
+    async for vacancy in db.vacancies.find(vacancy_filter, {"_id": 0, "id": 1, "title": 1, "position": 1}):
+        vacancies[vacancy["id"]] = vacancy
+    if not vacancies:
+        return
+
+    app_filter = {"vacancy_id": {"$in": list(vacancies)}}
+    if status:
+        app_filter["status"] = status
+
+    cursor = db.applications.find(app_filter, APPLICATION_EXPORT_PROJECTION)
+    cursor = cursor.sort([("applied_at", -1), ("id", -1)]).batch_size(chunk_size)
+
+    chunk = []
+    async for application in cursor:
+        chunk.append(application)
+        if len(chunk) >= chunk_size:
+            yield await _build_rows(db, chunk, vacancies)
+            chunk = []
+    if chunk:
+        yield await _build_rows(db, chunk, vacancies)
+
+
+async def _build_rows(db, applications: List[Dict], vacancies: Dict[str, Dict]) -> List[Dict]:
+    player_ids = list({application["player_id"] for application in applications})
+    players = {}
+    async for player in db.players.find({"id": {"$in": player_ids}}, PLAYER_EXPORT_PROJECTION):
+        players[player["id"]] = player
+
+    rows = []
+    for application in applications:
+        vacancy = vacancies.get(application["vacancy_id"], {})
+        player = players.get(application["player_id"], {})
+        rows.append({
+            "application_id": application["id"],
+            "applied_at": application.get("applied_at"),
+            "status": application.get("status"),
+            "priority": application.get("priority"),
+            "rating": application.get("rating"),
+            "vacancy_id": application["vacancy_id"],
+            "vacancy_title": vacancy.get("title"),
+            "vacancy_position": vacancy.get("position"),
+            "player_id": application["player_id"],
+            "player_name": player.get("name", application.get("player_name")),
+            "player_email": player.get("email"),
+            "player_position": player.get("position"),
+            "player_experience": player.get("experience_level"),
+            "player_location": player.get("location"),
+            "player_country": player.get("country"),
+            "player_age": player.get("age"),
+            "cover_letter": application.get("cover_letter"),
+            "notes": application.get("notes")
+        })
+    return rows
+
+
+async def csv_stream(row_chunks: AsyncIterator[List[Dict]]) -> AsyncIterator[str]:
+    """Encode row chunks as CSV text, header first"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for rows in row_chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows({column: _cell(row[column]) for column in EXPORT_COLUMNS} for row in rows)
+        yield buffer.getvalue()
+
+
+async def write_xlsx(row_chunks: AsyncIterator[List[Dict]], path: str) -> int:
+    """
+    Write row chunks to an XLSX workbook at `path` and return the row count
+
+    Uses xlsxwriter's constant_memory mode, which flushes each row to disk
+    as it is written, so only the current chunk is ever held in memory.
+    Rows are written strictly in order, which that mode requires.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    worksheet = workbook.add_worksheet("Applicants")
+    worksheet.write_row(0, 0, EXPORT_COLUMNS, workbook.add_format({"bold": True}))
+
+    def write_rows(rows, first_row):
+        for offset, row in enumerate(rows):
+            worksheet.write_row(first_row + offset, 0, [_cell(row[column]) for column in EXPORT_COLUMNS])
+
+    written = 0
+    try:
+        async for rows in row_chunks:
+            await run_in_threadpool(write_rows, rows, written + 1)
+            written += len(rows)
+    finally:
+        await run_in_threadpool(workbook.close)
+
+    return written
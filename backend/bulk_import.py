@@ -0,0 +1,112 @@
+import asyncio
+import csv
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from passlib.context import CryptContext
+
+IMPORT_BATCH_SIZE = 200
+
+# Hashing runs in worker processes, each with its own context
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_hash_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    """Process pool for bcrypt, created on first use"""
+    global _hash_pool
+    if _hash_pool is None:
+        workers = int(os.getenv("IMPORT_HASH_WORKERS", str(os.cpu_count() or 1)))
+        # Spawned, not forked: the parent holds the event loop and driver threads
+        _hash_pool = ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn"))
+    return _hash_pool
+
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash a batch of passwords in parallel without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    pool = get_hash_pool()
+    return await asyncio.gather(*(loop.run_in_executor(pool, _hash_password, password) for password in passwords))
+
+
+def detect_format(filename: Optional[str], explicit: Optional[str] = None) -> str:
+    """Return 'csv' or 'ndjson' from an explicit choice or the file extension"""
+    if explicit:
+        return explicit.lower()
+    suffix = Path(filename or "").suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".ndjson", ".jsonl", ".json"):
+        return "ndjson"
+    raise ValueError("Cannot determine import format, use 'csv' or 'ndjson'")
+
+
+def _clean_csv_row(row: dict, list_fields: Iterable[str]) -> dict:
+    record = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        value = value.strip() if isinstance(value, str) else value
+        if value == "" or value is None:
+            continue
+        if key in list_fields:
+            value = [item.strip() for item in value.split(";") if item.strip()]
+        record[key.strip()] = value
+    return record
+
+
+def iter_records(stream: BinaryIO, file_format: str, list_fields: Iterable[str] = ()) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (line_number, record) pairs from an NDJSON or CSV byte stream
+
+    Records are parsed lazily. A line that cannot be parsed yields a
+    ValueError in place of the record so it can be reported, not aborted on.
+    CSV list columns are split on ';'.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, _clean_csv_row(row, list_fields)
+    elif file_format == "ndjson":
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, ValueError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield line_number, ValueError("Each line must be a JSON object")
+                continue
+            yield line_number, record
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+
+def batched(iterable: Iterable, size: int = IMPORT_BATCH_SIZE) -> Iterator[list]:
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+DELETE_BATCH_SIZE = 500
+# A running deletion whose lease lapses (worker crashed or restarted) is picked up again
+DELETION_LEASE = timedelta(minutes=5)
+
+# Upload directory of each single-file field and media list, per entity type
+MEDIA_FIELDS = {
+    "player": {"avatar": "avatars", "cv_document": "documents", "photos": "photos", "videos": "videos"},
+    "club": {"logo": "logos", "gallery_images": "club_gallery", "videos": "club_videos"},
+    "vacancy": {}
+}
+
+# Cascade steps, in order; every step is idempotent so a resumed deletion repeats at most one batch
+CASCADE_STEPS = {
+    "player": ["root", "applications", "conversations", "recommendations", "auth_tokens", "media"],
+    "club": ["root", "vacancies", "conversations", "recommendations", "auth_tokens", "media"],
+    "vacancy": ["root", "applications"]
+}
+
+
+# Files of a media list entry: the upload and what the transcoding worker derived from it
+MEDIA_ITEM_FILES = ("filename", "web_filename", "poster_filename")
+
+
+def media_item_paths(directory: str, item: dict) -> List[str]:
+    """Storage keys of one photo, video or gallery entry"""
+    return [f"{directory}/{item[field]}" for field in MEDIA_ITEM_FILES if item.get(field)]
+
+
+def media_paths(entity_type: str, document: dict) -> List[str]:
+    """Storage keys of the uploads referenced by a player or club document"""
+    paths = []
+    for field, directory in MEDIA_FIELDS[entity_type].items():
+        value = document.get(field)
+        if isinstance(value, list):
+            for item in value:
+                paths.extend(media_item_paths(directory, item))
+        elif value:
+            paths.append(f"{directory}/{value}")
+    return paths
+
+
+class DeletionEngine:
+    """
+    Deletes players, clubs and vacancies with everything that hangs off them
+
+    `delete` removes the root document at once, so it disappears from every
+    read, and records a deletion in the `deletions` collection. The
+    cascade then runs in the background in batches: applications,
+    conversations and their messages, recommendation digests, auth tokens,
+    media entries and uploaded files. Each batch updates the deletion's
+    progress and lease; deletions left behind by a restart are resumed by
+    `resume`.
+    """
+
+    def __init__(self, db, storage, batch_size: int = DELETE_BATCH_SIZE,
+                 on_removed: Optional[Callable[[str, List[str]], Awaitable[None]]] = None):
+        self.db = db
+        self.storage = storage
+        self.batch_size = batch_size
+        self.on_removed = on_removed
+        self._tasks = set()
+
+    def _collection(self, entity_type: str):
+        return {"player": self.db.players, "club": self.db.clubs, "vacancy": self.db.vacancies}[entity_type]
+
+    async def ensure_indexes(self):
+        await self.db.deletions.create_index("id", unique=True)
+        await self.db.deletions.create_index([("status", 1), ("lease_until", 1)])
+        await self.db.applications.create_index("player_id")
+        await self.db.messages.create_index("conversation_id")
+
+    async def delete(self, entity_type: str, entity_id: str) -> Optional[dict]:
+        """
+        Remove an entity and schedule its cascade
+
+        Returns the deletion document, or None if the entity does not exist.
+        """
+        projection = {"_id": 0, "id": 1, **{field: 1 for field in MEDIA_FIELDS[entity_type]}}
+        document = await self._collection(entity_type).find_one({"id": entity_id}, projection)
+        if not document:
+            return None
+
+        now = datetime.utcnow()
+        deletion = {
+            "id": str(uuid.uuid4()),
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "status": "running",
+            "media": media_paths(entity_type, document),
+            "steps_done": [],
+            "progress": {},
+            "requested_at": now,
+            "started_at": now,
+            "finished_at": None,
+            "lease_until": now + DELETION_LEASE,
+            "error": None
+        }
+        # Recorded before the root goes, so a crash in between still gets resumed
+        await self.db.deletions.insert_one(dict(deletion))
+        await self._run_step(deletion, "root")
+        self._schedule(deletion)
+        return deletion
+
+    async def get(self, deletion_id: str) -> Optional[dict]:
+        return await self.db.deletions.find_one({"id": deletion_id}, {"_id": 0, "media": 0, "lease_until": 0})
+
+    async def resume(self) -> int:
+        """Pick up failed deletions and those whose worker went away; returns how many were resumed"""
+        resumed = 0
+        while True:
+            now = datetime.utcnow()
+            deletion = await self.db.deletions.find_one_and_update(
+                {"$or": [{"status": "running", "lease_until": {"$lt": now}}, {"status": "failed"}]},
+                {"$set": {"status": "running", "error": None, "lease_until": now + DELETION_LEASE}},
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER
+            )
+            if not deletion:
+                return resumed
+            logger.info(f"Resuming deletion {deletion['id']} of {deletion['entity_type']} {deletion['entity_id']}")
+            self._schedule(deletion)
+            resumed += 1
+
+    def _schedule(self, deletion: dict):
+        task = asyncio.get_running_loop().create_task(self._run(deletion))
+        # The loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, deletion: dict):
+        try:
+            for step in CASCADE_STEPS[deletion["entity_type"]]:
+                if step not in deletion["steps_done"]:
+                    await self._run_step(deletion, step)
+        except Exception as e:
+            logger.exception(f"Deletion {deletion['id']} failed at a cascade step")
+            await self.db.deletions.update_one(
+                {"id": deletion["id"]},
+                {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.utcnow()}}
+            )
+            return
+        await self.db.deletions.update_one(
+            {"id": deletion["id"]},
+            {"$set": {"status": "completed", "finished_at": datetime.utcnow()}}
+        )
+        logger.info(f"Deletion {deletion['id']} completed: {deletion['progress']}")
+
+    async def _run_step(self, deletion: dict, step: str):
+        await getattr(self, f"_cascade_{step}")(deletion)
+        deletion["steps_done"].append(step)
+        await self.db.deletions.update_one({"id": deletion["id"]}, {"$addToSet": {"steps_done": step}})
+
+    async def _record(self, deletion: dict, counter: str, count: int):
+        """Add a batch to the progress counters and extend the lease"""
+        deletion["progress"][counter] = deletion["progress"].get(counter, 0) + count
+        await self.db.deletions.update_one(
+            {"id": deletion["id"]},
+            {"$inc": {f"progress.{counter}": count}, "$set": {"lease_until": datetime.utcnow() + DELETION_LEASE}}
+        )
+
+    async def _batches(self, collection, filter_query: dict, projection: Optional[dict] = None):
+        """
+        Matching documents, a batch at a time
+
+        Callers delete each batch before asking for the next, so every query
+        starts from the front.
+        """
+        while True:
+            batch = await collection.find(filter_query, projection or {"_id": 0, "id": 1}).limit(self.batch_size).to_list(self.batch_size)
+            if not batch:
+                return
+            yield batch
+
+    async def _cascade_root(self, deletion: dict):
+        entity_type, entity_id = deletion["entity_type"], deletion["entity_id"]
+        result = await self._collection(entity_type).delete_one({"id": entity_id})
+        await self._record(deletion, entity_type, result.deleted_count)
+        if self.on_removed:
+            await self.on_removed(entity_type, [entity_id])
+
+    async def _delete_applications(self, deletion: dict, filter_query: dict, uncount: bool):
+        async for batch in self._batches(self.db.applications, filter_query, {"_id": 0, "id": 1, "vacancy_id": 1}):
+            result = await self.db.applications.delete_many({"id": {"$in": [application["id"] for application in batch]}})
+            if uncount:
+                # Keep applicant counts on the player's remaining vacancies right
+                counts = Counter(application["vacancy_id"] for application in batch)
+                await self.db.vacancies.bulk_write(
+                    [UpdateOne({"id": vacancy_id}, {"$inc": {"applications_count": -count}}) for vacancy_id, count in counts.items()],
+                    ordered=False
+                )
+            await self._record(deletion, "applications", result.deleted_count)
+
+    async def _cascade_applications(self, deletion: dict):
+        if deletion["entity_type"] == "player":
+            await self._delete_applications(deletion, {"player_id": deletion["entity_id"]}, uncount=True)
+        else:
+            await self._delete_applications(deletion, {"vacancy_id": deletion["entity_id"]}, uncount=False)
+
+    async def _cascade_vacancies(self, deletion: dict):
+        async for batch in self._batches(self.db.vacancies, {"club_id": deletion["entity_id"]}):
+            vacancy_ids = [vacancy["id"] for vacancy in batch]
+            await self._delete_applications(deletion, {"vacancy_id": {"$in": vacancy_ids}}, uncount=False)
+            result = await self.db.vacancies.delete_many({"id": {"$in": vacancy_ids}})
+            if self.on_removed:
+                await self.on_removed("vacancy", vacancy_ids)
+            await self._record(deletion, "vacancies", result.deleted_count)
+
+    async def _cascade_conversations(self, deletion: dict):
+        member = {"members": {"$elemMatch": {"user_id": deletion["entity_id"], "user_type": deletion["entity_type"]}}}
+        async for batch in self._batches(self.db.conversations, member):
+            conversation_ids = [conversation["id"] for conversation in batch]
+            # Messages first, so an interrupted batch finds its conversations again
+            async for messages in self._batches(self.db.messages, {"conversation_id": {"$in": conversation_ids}}):
+                result = await self.db.messages.delete_many({"id": {"$in": [message["id"] for message in messages]}})
+                await self._record(deletion, "messages", result.deleted_count)
+            result = await self.db.conversations.delete_many({"id": {"$in": conversation_ids}})
+            await self._record(deletion, "conversations", result.deleted_count)
+
+    async def _cascade_recommendations(self, deletion: dict):
+        result = await self.db.recommendations.delete_many(
+            {"user_type": deletion["entity_type"], "user_id": deletion["entity_id"]}
+        )
+        await self._record(deletion, "recommendations", result.deleted_count)
+
+    async def _cascade_auth_tokens(self, deletion: dict):
+        result = await self.db.auth_tokens.delete_many(
+            {"user_type": deletion["entity_type"], "user_id": deletion["entity_id"]}
+        )
+        await self._record(deletion, "auth_tokens", result.deleted_count)
+
+    async def _cascade_media(self, deletion: dict):
+        paths = deletion["media"]
+        for start in range(0, len(paths), self.batch_size):
+            removed = await asyncio.to_thread(self.storage.delete_many, paths[start:start + self.batch_size])
+            await self._record(deletion, "media_files", removed)
+        # Photos, videos and gallery images, see media.MediaLibrary
+        directories = MEDIA_FIELDS[deletion["entity_type"]]
+        owned = {"owner_type": deletion["entity_type"], "owner_id": deletion["entity_id"]}
+        projection = {"_id": 0, "id": 1, "kind": 1, **{field: 1 for field in MEDIA_ITEM_FILES}}
+        async for batch in self._batches(self.db.media, owned, projection):
+            # Files first, so an interrupted batch finds its entries again
+            batch_paths = [path for item in batch for path in media_item_paths(directories[item["kind"]], item)]
+            removed = await asyncio.to_thread(self.storage.delete_many, batch_paths)
+            await self._record(deletion, "media_files", removed)
+            result = await self.db.media.delete_many({"id": {"$in": [item["id"] for item in batch]}})
+            await self._record(deletion, "media_entries", result.deleted_count)
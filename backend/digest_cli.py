@@ -0,0 +1,36 @@
+"""
+Compute recommendation digests for all verified players and all clubs
+
+Meant to run nightly from cron. An interrupted run is resumed from its
+last finished chunk unless --restart is given.
+
+Usage:
+    python digest_cli.py
+    python digest_cli.py --workers 4 --chunk-size 500
+"""
+import asyncio
+import json
+from typing import Optional
+
+import typer
+
+from digests import DIGEST_CHUNK_SIZE, DIGEST_SIZE, DigestJob
+from server import db
+
+cli = typer.Typer(add_completion=False)
+
+
+@cli.command()
+def main(
+    workers: Optional[int] = typer.Option(None, help="Scoring processes, defaults to the CPU count"),
+    chunk_size: int = typer.Option(DIGEST_CHUNK_SIZE, help="Users scored per chunk"),
+    digest_size: int = typer.Option(DIGEST_SIZE, help="Recommendations kept per user"),
+    restart: bool = typer.Option(False, help="Start a new run instead of resuming an interrupted one")
+):
+    job = DigestJob(db, chunk_size=chunk_size, digest_size=digest_size, workers=workers)
+    run = asyncio.run(job.run(resume=not restart))
+    typer.echo(json.dumps(run, default=str, indent=2))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from pymongo import UpdateOne
+
+from matching import (
+    PLAYER_COLUMNS, PLAYER_PROJECTION, VACANCY_PROJECTION,
+    FeatureTable, MatchIndex, match_scores, top_k, utc_timestamp
+)
+
+logger = logging.getLogger(__name__)
+
+DIGEST_CHUNK_SIZE = 1000
+DIGEST_SIZE = 10
+# How far back a user without an earlier digest is shown new items from
+DIGEST_LOOKBACK = timedelta(days=7)
+
+
+def _score_player_chunk(players: Dict[str, np.ndarray], vacancies: Dict[str, np.ndarray],
+                        player_since: np.ndarray, vacancy_published: np.ndarray,
+                        excluded: List[tuple], vacancy_ids: List[str], limit: int) -> List[list]:
+    """Worker: top new vacancies for each player in a chunk"""
+    scores = match_scores({name: column[:, None] for name, column in players.items()}, vacancies)
+    scores = np.where(vacancy_published[None, :] > player_since[:, None], scores, -np.inf)
+    for row, column in excluded:
+        scores[row, column] = -np.inf
+    return [top_k(scores[row], vacancy_ids, limit) for row in range(len(player_since))]
+
+
+def _score_club_chunk(club_vacancies: List[Dict[str, np.ndarray]], players: Dict[str, np.ndarray],
+                      club_since: np.ndarray, player_created: np.ndarray,
+                      excluded: List[List[int]], player_ids: List[str], limit: int) -> List[list]:
+    """Worker: best new players for each club in a chunk, over all of its open vacancies"""
+    results = []
+    for vacancies, since, club_excluded in zip(club_vacancies, club_since, excluded):
+        grid = match_scores(players, {name: column[:, None] for name, column in vacancies.items()})
+        scores = np.where(player_created > since, grid.max(axis=0), -np.inf)
+        scores[club_excluded] = -np.inf
+        results.append(top_k(scores, player_ids, limit))
+    return results
+
+
+class DigestJob:
+    """
+    Computes recommendation digests into the `recommendations` collection
+
+    Players get the best vacancies published since their last digest,
+    clubs the best players registered since theirs. Users are processed in
+    id order, in chunks scored by a process pool; after each chunk the run
+    records its position in `digest_runs`, so an interrupted run resumes
+    from the last finished chunk.
+    """
+
+    def __init__(self, db, chunk_size: int = DIGEST_CHUNK_SIZE, digest_size: int = DIGEST_SIZE,
+                 workers: Optional[int] = None):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.digest_size = digest_size
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.features = MatchIndex(db)
+
+    async def ensure_indexes(self):
+        await self.db.recommendations.create_index([("user_type", 1), ("user_id", 1)], unique=True)
+        await self.db.digest_runs.create_index([("status", 1), ("started_at", -1)])
+        await self.db.vacancies.create_index([("status", 1), ("published_at", -1)])
+
+    async def run(self, resume: bool = True) -> dict:
+        """Run (or resume) a digest run and return its final run document"""
+        await self.ensure_indexes()
+        run = None
+        if resume:
+            run = await self.db.digest_runs.find_one({"status": "running"}, {"_id": 0}, sort=[("started_at", -1)])
+        if run:
+            logger.info(f"Resuming digest run {run['id']} at {run['phase']} after {run['last_id']}")
+        else:
+            await self.db.digest_runs.update_many({"status": "running"}, {"$set": {"status": "abandoned"}})
+            started_at = datetime.utcnow()
+            run = {
+                "id": str(uuid.uuid4()),
+                "status": "running",
+                "phase": "players",
+                "last_id": "",
+                "started_at": started_at,
+                "window_start": started_at - DIGEST_LOOKBACK,
+                "players_done": 0,
+                "clubs_done": 0
+            }
+            await self.db.digest_runs.insert_one(dict(run))
+
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            if run["phase"] == "players":
+                await self._run_players(run, pool)
+                await self._checkpoint(run, phase="clubs", last_id="")
+            await self._run_clubs(run, pool)
+        except BaseException:
+            # Left "running" so the next run resumes from the last checkpoint
+            logger.exception(f"Digest run {run['id']} interrupted")
+            raise
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        run["status"] = "completed"
+        run["completed_at"] = datetime.utcnow()
+        await self.db.digest_runs.update_one(
+            {"id": run["id"]}, {"$set": {"status": "completed", "completed_at": run["completed_at"]}}
+        )
+        logger.info(f"Digest run {run['id']} completed: {run['players_done']} players, {run['clubs_done']} clubs")
+        return run
+
+    async def _checkpoint(self, run: dict, **changes):
+        run.update(changes)
+        await self.db.digest_runs.update_one({"id": run["id"]}, {"$set": changes})
+
+    async def _previous_since(self, run: dict, user_type: str, user_ids: List[str]) -> np.ndarray:
+        """Start of each user's window: their last digest, bounded by the lookback"""
+        previous = {}
+        async for digest in self.db.recommendations.find(
+            {"user_type": user_type, "user_id": {"$in": user_ids}},
+            {"_id": 0, "user_id": 1, "run_id": 1, "since": 1, "generated_at": 1}
+        ):
+            # Already written by this run before an interruption: keep its window
+            previous[digest["user_id"]] = digest["since"] if digest["run_id"] == run["id"] else digest["generated_at"]
+        window_start = utc_timestamp(run["window_start"])
+        return np.array([max(utc_timestamp(previous.get(user_id), -np.inf), window_start) for user_id in user_ids])
+
+    async def _pipeline(self, chunks, submit, write):
+        """Keep up to `workers` chunks scoring at once, writing and checkpointing them in order"""
+        loop = asyncio.get_running_loop()
+        in_flight = deque()
+        async for chunk in chunks:
+            in_flight.append((chunk, loop.run_in_executor(*submit(chunk))))
+            if len(in_flight) >= self.workers:
+                await write(*await self._settle(in_flight))
+        while in_flight:
+            await write(*await self._settle(in_flight))
+
+    async def _settle(self, in_flight: deque) -> tuple:
+        chunk, future = in_flight.popleft()
+        return chunk, await future
+
+    async def _id_chunks(self, collection, filter_query: dict, projection: dict, after_id: str):
+        chunk = []
+        cursor = collection.find({**filter_query, "id": {"$gt": after_id}}, projection).sort("id", 1)
+        async for document in cursor.batch_size(self.chunk_size):
+            chunk.append(document)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def _write_digests(self, run: dict, user_type: str, user_ids: List[str], since: np.ndarray, results: List[list]):
+        operations = [
+            UpdateOne(
+                {"user_type": user_type, "user_id": user_id},
+                {"$set": {
+                    "items": [{"id": item_id, "score": score} for item_id, score in items],
+                    "since": datetime.fromtimestamp(window, timezone.utc).replace(tzinfo=None),
+                    "generated_at": run["started_at"],
+                    "run_id": run["id"]
+                }},
+                upsert=True
+            )
+            for user_id, window, items in zip(user_ids, since, results)
+        ]
+        if operations:
+            await self.db.recommendations.bulk_write(operations, ordered=False)
+
+    async def _run_players(self, run: dict, pool: ProcessPoolExecutor):
+        # Candidate vacancies: open ones published inside the widest window
+        now = datetime.utcnow()
+        candidates = []
+        async for vacancy in self.db.vacancies.find(
+            {"status": "active", "published_at": {"$gt": run["window_start"]}},
+            {**VACANCY_PROJECTION, "published_at": 1}
+        ):
+            deadline = vacancy.get("application_deadline")
+            if deadline and deadline < now:
+                continue
+            candidates.append(vacancy)
+        club_ids = list({vacancy["club_id"] for vacancy in candidates})
+        club_types = {}
+        async for club in self.db.clubs.find({"id": {"$in": club_ids}}, {"_id": 0, "id": 1, "club_type": 1}):
+            club_types[club["id"]] = club.get("club_type")
+
+        vacancies, vacancy_ids, published = self.features.vacancies, [], []
+        for vacancy in candidates:
+            self.features.upsert_vacancy(vacancy, club_types.get(vacancy["club_id"]))
+            vacancy_ids.append(vacancy["id"])
+            published.append(utc_timestamp(vacancy["published_at"]))
+        if not vacancy_ids:
+            logger.info("No new vacancies for player digests")
+        rows = [vacancies.rows[vacancy_id] for vacancy_id in vacancy_ids]
+        vacancy_features = vacancies.view(rows)
+        vacancy_published = np.array(published)
+        columns = {vacancy_id: column for column, vacancy_id in enumerate(vacancy_ids)}
+
+        async def prepare(chunks):
+            async for players in chunks:
+                player_ids = [player["id"] for player in players]
+                since = await self._previous_since(run, "player", player_ids)
+                excluded = []
+                if vacancy_ids:
+                    positions = {player_id: row for row, player_id in enumerate(player_ids)}
+                    async for application in self.db.applications.find(
+                        {"player_id": {"$in": player_ids}, "vacancy_id": {"$in": vacancy_ids}},
+                        {"_id": 0, "player_id": 1, "vacancy_id": 1}
+                    ):
+                        excluded.append((positions[application["player_id"]], columns[application["vacancy_id"]]))
+                # Fresh table per chunk so rows line up with player_ids
+                self.features.players = FeatureTable(PLAYER_COLUMNS)
+                for player in players:
+                    self.features.upsert_player(player)
+                yield player_ids, since, self.features.players.view(), excluded
+
+        def submit(chunk):
+            player_ids, since, features, excluded = chunk
+            return pool, _score_player_chunk, features, vacancy_features, since, vacancy_published, excluded, vacancy_ids, self.digest_size
+
+        async def write(chunk, results):
+            player_ids, since = chunk[0], chunk[1]
+            await self._write_digests(run, "player", player_ids, since, results)
+            await self._checkpoint(run, last_id=player_ids[-1], players_done=run["players_done"] + len(player_ids))
+
+        chunks = self._id_chunks(self.db.players, {"is_verified": True}, PLAYER_PROJECTION, run["last_id"])
+        await self._pipeline(prepare(chunks), submit, write)
+
+    async def _run_clubs(self, run: dict, pool: ProcessPoolExecutor):
+        # Candidate players: verified ones registered inside the widest window
+        self.features.players = FeatureTable(PLAYER_COLUMNS)
+        player_ids, created = [], []
+        async for player in self.db.players.find(
+            {"is_verified": True, "created_at": {"$gt": run["window_start"]}},
+            {**PLAYER_PROJECTION, "created_at": 1}
+        ):
+            self.features.upsert_player(player)
+            player_ids.append(player["id"])
+            created.append(utc_timestamp(player["created_at"]))
+        if not player_ids:
+            logger.info("No new players for club digests")
+        player_features = self.features.players.view()
+        player_created = np.array(created)
+        positions = {player_id: row for row, player_id in enumerate(player_ids)}
+
+        async def prepare(chunks):
+            async for clubs in chunks:
+                club_ids = [club["id"] for club in clubs]
+                club_types = {club["id"]: club.get("club_type") for club in clubs}
+                since = await self._previous_since(run, "club", club_ids)
+
+                by_club = {club_id: [] for club_id in club_ids}
+                vacancy_clubs = {}
+                async for vacancy in self.db.vacancies.find(
+                    {"club_id": {"$in": club_ids}, "status": "active"}, VACANCY_PROJECTION
+                ):
+                    self.features.upsert_vacancy(vacancy, club_types[vacancy["club_id"]])
+                    by_club[vacancy["club_id"]].append(self.features.vacancies.rows[vacancy["id"]])
+                    vacancy_clubs[vacancy["id"]] = vacancy["club_id"]
+
+                excluded = {club_id: [] for club_id in club_ids}
+                if player_ids and vacancy_clubs:
+                    async for application in self.db.applications.find(
+                        {"vacancy_id": {"$in": list(vacancy_clubs)}, "player_id": {"$in": player_ids}},
+                        {"_id": 0, "player_id": 1, "vacancy_id": 1}
+                    ):
+                        excluded[vacancy_clubs[application["vacancy_id"]]].append(positions[application["player_id"]])
+
+                # Clubs without open vacancies keep their previous digest
+                scored = [club_id for club_id in club_ids if by_club[club_id]]
+                yield (
+                    club_ids, scored,
+                    np.array([window for club_id, window in zip(club_ids, since) if by_club[club_id]]),
+                    [self.features.vacancies.view(by_club[club_id]) for club_id in scored],
+                    [excluded[club_id] for club_id in scored]
+                )
+                for vacancy_id in vacancy_clubs:
+                    self.features.remove_vacancy(vacancy_id)
+
+        def submit(chunk):
+            club_ids, scored, since, vacancies, excluded = chunk
+            return pool, _score_club_chunk, vacancies, player_features, since, player_created, excluded, player_ids, self.digest_size
+
+        async def write(chunk, results):
+            club_ids, scored, since = chunk[0], chunk[1], chunk[2]
+            await self._write_digests(run, "club", scored, since, results)
+            await self._checkpoint(run, last_id=club_ids[-1], clubs_done=run["clubs_done"] + len(scored))
+
+        chunks = self._id_chunks(self.db.clubs, {}, {"_id": 0, "id": 1, "club_type": 1}, run["last_id"])
+        await self._pipeline(prepare(chunks), submit, write)
@@ -0,0 +1,63 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import AsyncIterator, Iterable, List, Type
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    # Optional speedup, falls back to the standard library encoder
+    orjson = None
+
+
+def _default(value):
+    """Serialize values the JSON encoders don't handle natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response that serializes content directly, using orjson when installed
+
+    Returning this from a handler bypasses FastAPI's response_model validation
+    and jsonable_encoder pass, so it must only carry data that is already in
+    the response shape, e.g. rows built with trusted_rows().
+    """
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def trusted_rows(model: Type[BaseModel], documents: Iterable[dict]) -> List[dict]:
+    """
+    Shape trusted database documents as `model` without validating them
+
+    Documents are expected to come from our own collections, read through a
+    projection for the same model. model_construct only fills in defaults for
+    missing fields and drops anything the model doesn't declare.
+    """
+    return [model.model_construct(**document).__dict__ for document in documents]
+
+
+def ndjson_line(row) -> bytes:
+    """Encode one row as a newline-terminated JSON document"""
+    if orjson is not None:
+        return orjson.dumps(row, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(row, default=_default, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+async def ndjson_rows(model: Type[BaseModel], cursor) -> AsyncIterator[bytes]:
+    """Yield trusted documents from a Motor cursor as NDJSON, one at a time"""
+    async for document in cursor:
+        yield ndjson_line(model.model_construct(**document).__dict__)
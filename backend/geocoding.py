@@ -0,0 +1,109 @@
+import csv
+import logging
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GAZETTEER_PATH = Path(__file__).parent / "data" / "gazetteer.tsv"
+
+
+def normalize_place(value: Optional[str]) -> str:
+    """Lowercase ASCII form of a place name, without punctuation"""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    value = re.sub(r"[^a-z0-9 ]+", " ", value.lower())
+    return " ".join(value.split())
+
+
+def geo_point(longitude: float, latitude: float) -> dict:
+    """GeoJSON point; GeoJSON puts longitude first"""
+    return {"type": "Point", "coordinates": [round(longitude, 5), round(latitude, 5)]}
+
+
+class Gazetteer:
+    """
+    Offline place name lookup backed by a tab-separated gazetteer file
+
+    The file lists countries (feature A) and populated places (feature P)
+    with alternate names, coordinates and population; see
+    data/gazetteer.tsv. No network calls are made. Ambiguous names resolve
+    to a place in the hinted country, otherwise to the most populous one.
+    """
+
+    def __init__(self, path: Path = DEFAULT_GAZETTEER_PATH):
+        self.path = Path(path)
+        self.places: Dict[str, List[Tuple[str, float, float, int]]] = {}
+        self.countries: Dict[str, str] = {}
+        self._load()
+
+    def _load(self):
+        with self.path.open(encoding="utf-8", newline="") as f:
+            rows = csv.DictReader((line for line in f if not line.startswith("#")), delimiter="\t")
+            for row in rows:
+                names = [row["name"]] + [name for name in (row["alternate_names"] or "").split(",") if name]
+                keys = {normalize_place(name) for name in names} - {""}
+                if row["feature"] == "A":
+                    for key in keys:
+                        self.countries[key] = row["country_code"]
+                    continue
+                entry = (row["country_code"], float(row["latitude"]), float(row["longitude"]), int(row["population"] or 0))
+                for key in keys:
+                    self.places.setdefault(key, []).append(entry)
+        for candidates in self.places.values():
+            candidates.sort(key=lambda entry: -entry[3])
+        logger.info(f"Gazetteer loaded: {len(self.places)} place names, {len(self.countries)} country names")
+
+    def country_code(self, value: Optional[str]) -> Optional[str]:
+        return self.countries.get(normalize_place(value))
+
+    def _lookup(self, name: str, country_code: Optional[str]) -> Optional[tuple]:
+        candidates = self.places.get(name)
+        if not candidates:
+            return None
+        if country_code:
+            # A known country rules out same-named places elsewhere
+            return next((candidate for candidate in candidates if candidate[0] == country_code), None)
+        return candidates[0]
+
+    def geocode(self, location: Optional[str], country: Optional[str] = None) -> Optional[dict]:
+        """
+        GeoJSON point for a free-text location such as 'Amsterdam' or
+        'Bloemendaal, Netherlands', or None if no place in it is known
+
+        Only places are resolved; a bare country name returns None, since a
+        country centroid would place profiles far from where they are.
+        """
+        coordinates = self._coordinates(location, country)
+        return geo_point(*coordinates) if coordinates else None
+
+    @lru_cache(maxsize=10_000)
+    def _coordinates(self, location: Optional[str], country: Optional[str]) -> Optional[Tuple[float, float]]:
+        parts = [normalize_place(part) for part in (location or "").split(",")]
+        parts = [part for part in parts if part]
+        if not parts:
+            return None
+
+        country_code = self.country_code(country)
+        if not country_code and len(parts) > 1:
+            country_code = self.country_code(parts[-1])
+
+        # Most specific part first, then the whole string ("New York, NY")
+        for name in parts + [" ".join(parts)]:
+            if name in self.countries and name not in self.places:
+                continue
+            match = self._lookup(name, country_code)
+            if match:
+                return match[2], match[1]
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer, loaded on first use; GAZETTEER_PATH overrides the bundled file"""
+    return Gazetteer(Path(os.getenv("GAZETTEER_PATH", str(DEFAULT_GAZETTEER_PATH))))
@@ -0,0 +1,104 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def _utc(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def document_validators(documents: Iterable[dict], variant: str = "") -> Tuple[Optional[str], Optional[datetime]]:
+    """
+    Weak ETag and Last-Modified for a response built from `documents`
+
+    The ETag covers each document's id, updated_at and version (when
+    present) in order, so edits, additions, removals and reordering all
+    change it; `variant` distinguishes representations of the same
+    documents, such as card and full views. It is weak because counters
+    such as views_count change without touching updated_at. Returns
+    (None, None) if any document lacks updated_at, since its changes could
+    not be detected.
+    """
+    digest = hashlib.blake2b(variant.encode("utf-8"), digest_size=12)
+    last_modified = None
+    for document in documents:
+        updated_at = document.get("updated_at")
+        if isinstance(updated_at, str):
+            # Documents decoded from the shared profile cache
+            try:
+                updated_at = datetime.fromisoformat(updated_at)
+            except ValueError:
+                return None, None
+        if not isinstance(updated_at, datetime):
+            return None, None
+        updated_at = _utc(updated_at)
+        digest.update(f"{document.get('id')}|{updated_at.isoformat()}|{document.get('version', '')};".encode("utf-8"))
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+    return f'W/"{digest.hexdigest()}"', last_modified
+
+
+def version_etag(document: dict) -> Optional[str]:
+    """
+    Strong ETag `"<version>"` for a single versioned document
+
+    This is the tag If-Match expects on updates, so a client can echo the
+    ETag of a read straight back. As with the weak digest, counters such
+    as views_count are not covered. Returns None for unversioned documents.
+    """
+    version = document.get("version")
+    return f'"{version}"' if isinstance(version, int) else None
+
+
+def cache_headers(etag: Optional[str], last_modified: Optional[datetime], cache_control: Optional[str]) -> dict:
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def _opaque(etag: str) -> str:
+    """Entity tag without its weak prefix, for weak comparison"""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(request: Request, etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """
+    Whether the client's cached copy is current (RFC 9110 section 13.1)
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    when it is absent, at the one-second resolution of HTTP dates.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if not etag:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since is None:
+            return False
+        return last_modified.replace(microsecond=0) <= _utc(since)
+    return False
+
+
+def not_modified_response(headers: dict) -> Response:
+    """304 carrying the validators and caching policy, without a body"""
+    return Response(status_code=304, headers=headers)
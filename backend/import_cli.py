@@ -0,0 +1,52 @@
+"""
+Bulk import players, clubs or vacancies from an NDJSON or CSV file
+
+Runs the same pipeline as POST /api/import/{kind}, against the database
+configured in backend/.env.
+
+Usage:
+    python import_cli.py players league_players.csv
+    python import_cli.py vacancies vacancies.ndjson --no-send-verification
+"""
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from bulk_import import detect_format, iter_records, shutdown_hash_pool
+from server import IMPORT_LIST_FIELDS, ImportFormat, ImportKind, import_records, send_verification_emails
+
+cli = typer.Typer(add_completion=False)
+
+
+@cli.command()
+def main(
+    kind: ImportKind = typer.Argument(..., help="What the file contains"),
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, readable=True),
+    format: Optional[ImportFormat] = typer.Option(None, help="File format, detected from the extension by default"),
+    send_verification: bool = typer.Option(True, help="Email verification links to imported accounts")
+):
+    try:
+        file_format = detect_format(path.name, format.value if format else None)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+
+    with path.open("rb") as stream:
+        records = iter_records(stream, file_format, IMPORT_LIST_FIELDS.get(kind, ()))
+        try:
+            report, recipients = asyncio.run(import_records(kind, records, send_verification))
+        finally:
+            shutdown_hash_pool()
+
+    if recipients:
+        typer.echo(f"Sending {len(recipients)} verification emails...", err=True)
+        send_verification_emails(recipients)
+
+    typer.echo(report.model_dump_json(indent=2))
+    if report.failed:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,366 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EXPERIENCE_LEVELS = {"beginner": 0, "intermediate": 1, "advanced": 2, "professional": 3}
+
+MATCH_WEIGHTS = {
+    "position": 0.35,
+    "experience": 0.25,
+    "location": 0.20,
+    "age": 0.10,
+    "benefits": 0.10
+}
+
+# Known vacancy benefits, one bit each; anything else is ignored for scoring
+BENEFIT_BITS = {"visa": 1, "accommodation": 2, "transport": 4, "insurance": 8, "coaching": 16, "education": 32}
+RELOCATION_MASK = BENEFIT_BITS["visa"] | BENEFIT_BITS["accommodation"]
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.float32)
+
+# Preferred player ages by club type, (min, max)
+AGE_BANDS = {"youth": (0, 21), "university": (17, 26)}
+DEFAULT_AGE_BAND = (16, 40)
+
+# Re-read documents changed slightly before the last sync, to cover writes
+# that committed with an earlier timestamp while the previous sync ran
+SYNC_OVERLAP = timedelta(seconds=5)
+SYNC_BATCH_SIZE = 500
+
+PLAYER_PROJECTION = {
+    "_id": 0, "id": 1, "position": 1, "experience_level": 1,
+    "location": 1, "country": 1, "age": 1, "is_verified": 1
+}
+VACANCY_PROJECTION = {
+    "_id": 0, "id": 1, "club_id": 1, "position": 1, "experience_level": 1,
+    "location": 1, "benefits": 1, "status": 1, "application_deadline": 1
+}
+
+PLAYER_COLUMNS = {
+    "position": (np.int32, -1),
+    "experience": (np.int8, -1),
+    "city": (np.int32, -1),
+    "country": (np.int32, -1),
+    "age": (np.float32, np.nan),
+    "verified": (np.bool_, False)
+}
+VACANCY_COLUMNS = {
+    "club": (np.int32, -1),
+    "position": (np.int32, -1),
+    "experience": (np.int8, -1),
+    "city": (np.int32, -1),
+    "country": (np.int32, -1),
+    "age_min": (np.float32, DEFAULT_AGE_BAND[0]),
+    "age_max": (np.float32, DEFAULT_AGE_BAND[1]),
+    "benefits": (np.uint8, 0),
+    "deadline": (np.float64, np.inf)
+}
+
+
+def _normalize(value) -> str:
+    return value.strip().lower() if isinstance(value, str) else ""
+
+
+def utc_timestamp(value: Optional[datetime], default: float = np.inf) -> float:
+    """POSIX timestamp of a stored datetime; Mongo returns naive UTC values"""
+    if not isinstance(value, datetime):
+        return default
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def split_place(location: Optional[str], country: Optional[str] = None) -> Tuple[str, str]:
+    """(city, country) from a free-text location like 'Amsterdam, Netherlands'"""
+    parts = [part for part in (_normalize(part) for part in (location or "").split(",")) if part]
+    city = parts[0] if parts else ""
+    country = _normalize(country) or (parts[-1] if len(parts) > 1 else "")
+    return city, country
+
+
+class Vocabulary:
+    """Stable integer codes for categorical values; -1 means unknown"""
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value) -> int:
+        value = _normalize(value)
+        if not value:
+            return -1
+        return self._codes.setdefault(value, len(self._codes))
+
+    def lookup(self, value) -> int:
+        return self._codes.get(_normalize(value), -1)
+
+
+class FeatureTable:
+    """
+    Column-oriented feature matrix with stable rows per document id
+
+    Rows freed by removals are reused. Columns grow by doubling, so
+    upserts are amortised O(1) and scoring works on contiguous arrays.
+    """
+
+    def __init__(self, columns: Dict[str, tuple]):
+        self._spec = columns
+        self.columns = {name: np.full(0, fill, dtype=dtype) for name, (dtype, fill) in columns.items()}
+        self.active = np.zeros(0, dtype=np.bool_)
+        self.ids: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    def _grow(self):
+        capacity = max(1024, 2 * len(self.active))
+        for name, (dtype, fill) in self._spec.items():
+            column = np.full(capacity, fill, dtype=dtype)
+            column[:self.size] = self.columns[name][:self.size]
+            self.columns[name] = column
+        active = np.zeros(capacity, dtype=np.bool_)
+        active[:self.size] = self.active[:self.size]
+        self.active = active
+
+    def upsert(self, doc_id: str, values: dict) -> int:
+        row = self.rows.get(doc_id)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+                self.ids[row] = doc_id
+            else:
+                if self.size == len(self.active):
+                    self._grow()
+                row = self.size
+                self.ids.append(doc_id)
+            self.rows[doc_id] = row
+        for name, value in values.items():
+            self.columns[name][row] = value
+        self.active[row] = True
+        return row
+
+    def remove(self, doc_id: str):
+        row = self.rows.pop(doc_id, None)
+        if row is None:
+            return
+        self.active[row] = False
+        self.ids[row] = None
+        for name, (dtype, fill) in self._spec.items():
+            self.columns[name][row] = fill
+        self._free.append(row)
+
+    def view(self, rows=None) -> Dict[str, np.ndarray]:
+        """Feature columns for the given rows (default: all rows in use)"""
+        if rows is None:
+            return {name: column[:self.size] for name, column in self.columns.items()}
+        return {name: column[rows] for name, column in self.columns.items()}
+
+
+def match_scores(player: Dict[str, np.ndarray], vacancy: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Score player/vacancy pairs in [0, 1]
+
+    Player and vacancy features are arrays (or scalars) that broadcast
+    against each other, so one call scores a player against every vacancy,
+    a vacancy against every player, or a (vacancies x players) grid.
+    """
+    position = ((player["position"] == vacancy["position"]) & (vacancy["position"] >= 0)).astype(np.float32)
+
+    # Being under-qualified costs more than being over-qualified
+    gap = player["experience"].astype(np.float32) - vacancy["experience"]
+    known = (player["experience"] >= 0) & (vacancy["experience"] >= 0)
+    experience = np.where(known, np.clip(1 - np.where(gap < 0, -gap / 2, gap / 6), 0, 1), 0.5)
+
+    same_city = (player["city"] == vacancy["city"]) & (vacancy["city"] >= 0)
+    same_country = (player["country"] == vacancy["country"]) & (vacancy["country"] >= 0)
+    location = np.where(same_city, 1.0, np.where(same_country, 0.6, 0.0))
+
+    age = player["age"]
+    distance = np.maximum(np.maximum(vacancy["age_min"] - age, age - vacancy["age_max"]), 0)
+    age_fit = np.where(np.isnan(age), 0.5, np.clip(1 - distance / 5, 0, 1))
+
+    # Players from abroad care mostly about visa and accommodation
+    general = _POPCOUNT[vacancy["benefits"]] / len(BENEFIT_BITS)
+    relocation = _POPCOUNT[vacancy["benefits"] & RELOCATION_MASK] / _POPCOUNT[RELOCATION_MASK]
+    relocating = (player["country"] >= 0) & (vacancy["country"] >= 0) & ~same_country
+    benefits = np.where(relocating, 0.5 * general + 0.5 * relocation, general)
+
+    return (
+        MATCH_WEIGHTS["position"] * position
+        + MATCH_WEIGHTS["experience"] * experience
+        + MATCH_WEIGHTS["location"] * location
+        + MATCH_WEIGHTS["age"] * age_fit
+        + MATCH_WEIGHTS["benefits"] * benefits
+    ).astype(np.float32)
+
+
+def top_k(scores: np.ndarray, ids: List[Optional[str]], limit: int) -> List[Tuple[str, float]]:
+    """Highest-scoring ids, best first; -inf scores are never returned"""
+    candidates = np.flatnonzero(np.isfinite(scores))
+    if limit <= 0 or len(candidates) == 0:
+        return []
+    if len(candidates) > limit:
+        best = np.argpartition(-scores[candidates], limit - 1)[:limit]
+        candidates = candidates[best]
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(ids[row], round(float(scores[row]), 4)) for row in candidates]
+
+
+class MatchIndex:
+    """
+    In-memory feature matrices for players and vacancies
+
+    The first query loads both collections; later queries re-read only
+    documents whose updated_at moved since the last sync, at most every
+    refresh_seconds. Writes made through this process can be applied
+    immediately with upsert_player / upsert_vacancy / remove_vacancy.
+    Deletes made by other processes are not seen by the delta sync, so
+    callers drop ids that no longer resolve when hydrating results.
+    """
+
+    def __init__(self, db, refresh_seconds: float = 30):
+        self.db = db
+        self.refresh_seconds = refresh_seconds
+        self.players = FeatureTable(PLAYER_COLUMNS)
+        self.vacancies = FeatureTable(VACANCY_COLUMNS)
+        self.positions = Vocabulary()
+        self.places = Vocabulary()
+        self.clubs = Vocabulary()
+        self._synced_at: Optional[datetime] = None
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def upsert_player(self, player: dict):
+        city, country = split_place(player.get("location"), player.get("country"))
+        age = player.get("age")
+        self.players.upsert(player["id"], {
+            "position": self.positions.code(player.get("position")),
+            "experience": EXPERIENCE_LEVELS.get(_normalize(player.get("experience_level")), -1),
+            "city": self.places.code(city),
+            "country": self.places.code(country),
+            "age": float(age) if age is not None else np.nan,
+            "verified": bool(player.get("is_verified"))
+        })
+
+    def remove_player(self, player_id: str):
+        self.players.remove(player_id)
+
+    def upsert_vacancy(self, vacancy: dict, club_type: Optional[str] = None):
+        if vacancy.get("status", "active") != "active":
+            self.vacancies.remove(vacancy["id"])
+            return
+        city, country = split_place(vacancy.get("location"))
+        age_min, age_max = AGE_BANDS.get(_normalize(club_type), DEFAULT_AGE_BAND)
+        benefits = 0
+        for benefit in vacancy.get("benefits") or []:
+            benefits |= BENEFIT_BITS.get(_normalize(benefit), 0)
+        self.vacancies.upsert(vacancy["id"], {
+            "club": self.clubs.code(vacancy.get("club_id")),
+            "position": self.positions.code(vacancy.get("position")),
+            "experience": EXPERIENCE_LEVELS.get(_normalize(vacancy.get("experience_level")), -1),
+            "city": self.places.code(city),
+            "country": self.places.code(country),
+            "age_min": age_min,
+            "age_max": age_max,
+            "benefits": benefits,
+            "deadline": utc_timestamp(vacancy.get("application_deadline"))
+        })
+
+    def remove_vacancy(self, vacancy_id: str):
+        self.vacancies.remove(vacancy_id)
+
+    async def ensure_fresh(self):
+        if time.monotonic() - self._checked_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self.refresh_seconds:
+                return
+            await self.sync()
+
+    async def sync(self):
+        """Load documents changed since the last sync (everything on the first call)"""
+        started = datetime.utcnow()
+        changed = {} if self._synced_at is None else {"updated_at": {"$gte": self._synced_at - SYNC_OVERLAP}}
+
+        async for player in self.db.players.find(changed, PLAYER_PROJECTION).batch_size(SYNC_BATCH_SIZE):
+            self.upsert_player(player)
+
+        batch = []
+        async for vacancy in self.db.vacancies.find(changed, VACANCY_PROJECTION).batch_size(SYNC_BATCH_SIZE):
+            batch.append(vacancy)
+            if len(batch) >= SYNC_BATCH_SIZE:
+                await self._load_vacancies(batch)
+                batch = []
+        if batch:
+            await self._load_vacancies(batch)
+
+        self._synced_at = started
+        self._checked_at = time.monotonic()
+        logger.info(f"Match index synced: {len(self.players)} players, {len(self.vacancies)} vacancies")
+
+    async def _load_vacancies(self, vacancies: List[dict]):
+        club_ids = list({vacancy["club_id"] for vacancy in vacancies})
+        club_types = {}
+        async for club in self.db.clubs.find({"id": {"$in": club_ids}}, {"_id": 0, "id": 1, "club_type": 1}):
+            club_types[club["id"]] = club.get("club_type")
+        for vacancy in vacancies:
+            self.upsert_vacancy(vacancy, club_types.get(vacancy["club_id"]))
+
+    def _open_vacancies(self) -> np.ndarray:
+        table = self.vacancies
+        return table.active[:table.size] & (table.columns["deadline"][:table.size] >= time.time())
+
+    def _exclude(self, scores: np.ndarray, table: FeatureTable, ids: Iterable[str]):
+        for doc_id in ids:
+            row = table.rows.get(doc_id)
+            if row is not None:
+                scores[row] = -np.inf
+
+    def vacancies_for_player(self, player_id: str, limit: int, exclude: Iterable[str] = ()) -> Optional[List[Tuple[str, float]]]:
+        """Best open vacancies for a player, or None if the player is unknown"""
+        row = self.players.rows.get(player_id)
+        if row is None:
+            return None
+        scores = match_scores(self.players.view(row), self.vacancies.view())
+        scores = np.where(self._open_vacancies(), scores, -np.inf)
+        self._exclude(scores, self.vacancies, exclude)
+        return top_k(scores, self.vacancies.ids, limit)
+
+    def players_for_vacancy(self, vacancy_id: str, limit: int, exclude: Iterable[str] = ()) -> Optional[List[Tuple[str, float]]]:
+        """Best verified players for an active vacancy, or None if it is unknown or closed"""
+        row = self.vacancies.rows.get(vacancy_id)
+        if row is None:
+            return None
+        return self._rank_players(self.vacancies.view(row), limit, exclude)
+
+    def players_for_club(self, club_id: str, limit: int, exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """Best verified players for any of a club's open vacancies"""
+        club = self.clubs.lookup(club_id)
+        if club < 0:
+            return []
+        rows = np.flatnonzero(self._open_vacancies() & (self.vacancies.columns["club"][:self.vacancies.size] == club))
+        if len(rows) == 0:
+            return []
+        # (vacancies x 1) against (players,) gives a grid; keep each player's best vacancy
+        vacancy = {name: column[:, None] for name, column in self.vacancies.view(rows).items()}
+        return self._rank_players(vacancy, limit, exclude)
+
+    def _rank_players(self, vacancy: Dict[str, np.ndarray], limit: int, exclude: Iterable[str]) -> List[Tuple[str, float]]:
+        players = self.players.view()
+        scores = match_scores(players, vacancy)
+        if scores.ndim > 1:
+            scores = scores.max(axis=0)
+        eligible = self.players.active[:self.players.size] & players["verified"]
+        scores = np.where(eligible, scores, -np.inf)
+        self._exclude(scores, self.players, exclude)
+        return top_k(scores, self.players.ids, limit)
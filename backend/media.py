@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from pymongo import ReplaceOne
+
+logger = logging.getLogger(__name__)
+
+# Media lists of each owner type; their entries live in the `media` collection
+MEDIA_LISTS = {"player": ("photos", "videos"), "club": ("gallery_images", "videos")}
+# An entry as kept for an owner's cover, without the ownership keys
+ENTRY_PROJECTION = {"_id": 0, "owner_type": 0, "owner_id": 0, "kind": 0}
+NEWEST_FIRST = [("uploaded_at", -1), ("id", -1)]
+
+
+def media_query(owner_type: str, owner_id: str, kind: str) -> dict:
+    return {"owner_type": owner_type, "owner_id": owner_id, "kind": kind}
+
+
+class MediaLibrary:
+    """
+    Photos, videos and gallery images, one document each in `media`
+
+    An owner's document keeps only a summary per list under `media.<kind>`:
+    how many entries there are and a cover, the newest entry. Listings are
+    paged from the (owner_type, owner_id, kind, uploaded_at, id) index, so
+    profile reads and uploads stay the same size however much an owner
+    has uploaded. `kind` is the list name: photos, videos or gallery_images.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def _owners(self, owner_type: str):
+        return self.db.players if owner_type == "player" else self.db.clubs
+
+    async def ensure_indexes(self):
+        await self.db.media.create_index("id", unique=True)
+        await self.db.media.create_index([("owner_type", 1), ("owner_id", 1), ("kind", 1), ("uploaded_at", -1), ("id", -1)])
+
+    async def add(self, owner_type: str, owner_id: str, kind: str, entry: dict) -> bool:
+        """Store an entry and count it on its owner; False, storing nothing, if the owner does not exist"""
+        await self.db.media.insert_one({**entry, **media_query(owner_type, owner_id, kind)})
+        result = await self._owners(owner_type).update_one(
+            {"id": owner_id},
+            {
+                "$inc": {f"media.{kind}.count": 1},
+                "$set": {f"media.{kind}.cover": entry, "updated_at": datetime.utcnow()}
+            }
+        )
+        if result.matched_count == 0:
+            await self.db.media.delete_one({"id": entry["id"]})
+            return False
+        return True
+
+    async def remove(self, owner_type: str, owner_id: str, kind: str, media_id: str) -> Optional[dict]:
+        """Delete an entry and uncount it; returns the entry, or None if the owner has no such entry"""
+        removed = await self.db.media.find_one_and_delete(
+            {"id": media_id, **media_query(owner_type, owner_id, kind)}, projection=ENTRY_PROJECTION
+        )
+        if not removed:
+            return None
+        await self._owners(owner_type).update_one(
+            {"id": owner_id},
+            {"$inc": {f"media.{kind}.count": -1}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+        # The filter leaves the cover alone unless it was the removed entry. A
+        # concurrent remove of the newest remaining entry misses the cover while
+        # it is still this one, so choose again until the chosen cover still exists
+        cover_id = media_id
+        while True:
+            newest = await self.db.media.find_one(media_query(owner_type, owner_id, kind), ENTRY_PROJECTION, sort=NEWEST_FIRST)
+            result = await self._owners(owner_type).update_one(
+                {"id": owner_id, f"media.{kind}.cover.id": cover_id},
+                {"$set": {f"media.{kind}.cover": newest}}
+            )
+            if result.matched_count == 0 or newest is None:
+                return removed
+            if await self.db.media.find_one({"id": newest["id"]}, {"_id": 0, "id": 1}):
+                return removed
+            cover_id = newest["id"]
+
+    async def update(self, owner_type: str, owner_id: str, kind: str, media_id: str, fields: dict) -> bool:
+        """Set fields on an entry, and on its owner's cover if it is the cover; False if the entry is gone"""
+        result = await self.db.media.update_one({"id": media_id, **media_query(owner_type, owner_id, kind)}, {"$set": fields})
+        if result.matched_count == 0:
+            return False
+        await self._owners(owner_type).update_one(
+            {"id": owner_id, f"media.{kind}.cover.id": media_id},
+            {"$set": {**{f"media.{kind}.cover.{field}": value for field, value in fields.items()}, "updated_at": datetime.utcnow()}}
+        )
+        return True
+
+    async def migrate_embedded(self) -> int:
+        """Move media arrays embedded in player and club documents into `media`; returns the owners migrated"""
+        migrated = 0
+        for owner_type, kinds in MEDIA_LISTS.items():
+            owners = self._owners(owner_type)
+            embedded = {"$or": [{kind: {"$exists": True}} for kind in kinds]}
+            async for document in owners.find(embedded, {"_id": 0, "id": 1, **{kind: 1 for kind in kinds}}):
+                operations = []
+                summary = {}
+                for kind in kinds:
+                    entries = document.get(kind) or []
+                    # Upserts by id, so an interrupted migration can simply run again
+                    operations.extend(
+                        ReplaceOne({"id": entry["id"]}, {**entry, **media_query(owner_type, document["id"], kind)}, upsert=True)
+                        for entry in entries
+                    )
+                    newest = max(entries, key=lambda entry: (entry["uploaded_at"], entry["id"])) if entries else None
+                    summary[f"media.{kind}"] = {"count": len(entries), "cover": newest}
+                if operations:
+                    await self.db.media.bulk_write(operations, ordered=False)
+                await owners.update_one({"id": document["id"]}, {"$set": summary, "$unset": {kind: "" for kind in kinds}})
+                migrated += 1
+        if migrated:
+            logger.info(f"Moved embedded media of {migrated} players and clubs into the media collection")
+        return migrated
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+
+from fast_json import ndjson_line
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    # Optional, only needed for PROFILE_CACHE_SHARED=redis
+    redis = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    """Per-process LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+
+    def get(self, key: str) -> Tuple[bool, object]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class InMemorySharedCache:
+    """
+    Local stand-in for a shared cache, with the same async API as RedisSharedCache
+
+    Values live in this process only. Useful in development and tests to
+    exercise the two-tier path without running Redis.
+    """
+
+    def __init__(self):
+        self._values = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._values.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self._values[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._values.pop(key, None)
+
+
+class RedisSharedCache:
+    """Cache shared by all workers through Redis"""
+
+    def __init__(self, url: str, prefix: str = "profile_cache:"):
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+
+class ProfileCache:
+    """
+    Read-through cache for profile documents
+
+    Lookups check the local LRU first, then the optional shared cache, and
+    only then call the loader. Concurrent misses for the same key share a
+    single load. Loads racing an invalidation are returned to their callers
+    but not cached. Other workers' local entries are only dropped by their
+    TTL, so keep the local TTL short when a shared cache is used.
+    """
+
+    def __init__(self, local: LocalCache, shared=None, shared_ttl: float = 300, enabled: bool = True):
+        self.local = local
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self.enabled = enabled
+        self._loading = {}  # key -> [future, invalidated]
+        self.metrics = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+            "shared_errors": 0
+        }
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        """
+        Cached document for `key`, loading it on a miss
+
+        Returned documents are shared between callers and must not be
+        mutated. A loader returning None (not found) is not cached.
+        """
+        if not self.enabled:
+            return await loader()
+
+        hit, value = self.local.get(key)
+        if hit:
+            self.metrics["local_hits"] += 1
+            return value
+
+        loading = self._loading.get(key)
+        if loading:
+            self.metrics["coalesced"] += 1
+            return await asyncio.shield(loading[0])
+
+        loading = [asyncio.get_running_loop().create_future(), False]
+        self._loading[key] = loading
+        try:
+            value = await self._load(key, loader, loading)
+        except BaseException as e:
+            loading[0].set_exception(e)
+            # Mark retrieved, so a load nobody was waiting on is not logged as unhandled
+            loading[0].exception()
+            raise
+        finally:
+            self._loading.pop(key, None)
+        loading[0].set_result(value)
+        return value
+
+    async def _load(self, key: str, loader, loading: list) -> Optional[dict]:
+        if self.shared is not None:
+            try:
+                raw = await self.shared.get(key)
+            except Exception as e:
+                self.metrics["shared_errors"] += 1
+                logger.error(f"Shared profile cache read error: {str(e)}")
+                raw = None
+            if raw is not None:
+                self.metrics["shared_hits"] += 1
+                value = json.loads(raw)
+                if not loading[1]:
+                    self.local.set(key, value)
+                return value
+
+        self.metrics["misses"] += 1
+        value = await loader()
+        if value is None or loading[1]:
+            return value
+
+        self.local.set(key, value)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, ndjson_line(value), self.shared_ttl)
+            except Exception as e:
+                self.metrics["shared_errors"] += 1
+                logger.error(f"Shared profile cache write error: {str(e)}")
+        return value
+
+    async def invalidate(self, *keys: str):
+        """Drop keys from both tiers, and keep in-flight loads of them out of the cache"""
+        self.metrics["invalidations"] += 1
+        for key in keys:
+            self.local.delete(key)
+            loading = self._loading.get(key)
+            if loading:
+                loading[1] = True
+        if self.shared is not None:
+            try:
+                await self.shared.delete(*keys)
+            except Exception as e:
+                self.metrics["shared_errors"] += 1
+                logger.error(f"Shared profile cache delete error: {str(e)}")
+
+    def get_metrics(self) -> dict:
+        lookups = self.metrics["local_hits"] + self.metrics["shared_hits"] + self.metrics["misses"] + self.metrics["coalesced"]
+        hits = lookups - self.metrics["misses"]
+        return {
+            **self.metrics,
+            "enabled": self.enabled,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            "local_entries": len(self.local),
+            "local_ttl": self.local.ttl,
+            "shared": type(self.shared).__name__ if self.shared is not None else None,
+            "shared_ttl": self.shared_ttl
+        }
+
+
+def create_profile_cache() -> ProfileCache:
+    """
+    Build the profile cache from environment configuration
+
+    PROFILE_CACHE_SHARED selects 'none' (default), 'memory' (local stand-in)
+    or 'redis' (requires the redis package and REDIS_URL).
+    """
+    local = LocalCache(
+        max_entries=int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "10000")),
+        ttl=float(os.getenv("PROFILE_CACHE_TTL", "30"))
+    )
+
+    shared_name = os.getenv("PROFILE_CACHE_SHARED", "none").lower()
+    shared = None
+    if shared_name == "redis" and redis is not None and os.getenv("REDIS_URL"):
+        shared = RedisSharedCache(os.getenv("REDIS_URL"))
+    elif shared_name == "memory":
+        shared = InMemorySharedCache()
+    elif shared_name != "none":
+        logger.warning(f"Unknown or unavailable shared profile cache '{shared_name}', using local cache only")
+
+    enabled = os.getenv("PROFILE_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+    return ProfileCache(local, shared, shared_ttl=float(os.getenv("PROFILE_CACHE_SHARED_TTL", "300")), enabled=enabled)
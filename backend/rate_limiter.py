@@ -0,0 +1,192 @@
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+from pymongo import ReturnDocument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Longest wait reported to a rejected client; a bucket with no refill would otherwise say forever
+MAX_RETRY_AFTER = 3600.0
+
+
+class BucketPolicy:
+    """Token bucket shape: burst capacity and steady refill rate"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+
+    def retry_after(self, tokens: float) -> float:
+        """Seconds until one token is available again"""
+        if self.refill_per_second <= 0:
+            return float("inf")
+        return max(0.0, (1 - tokens) / self.refill_per_second)
+
+
+class InMemoryBucketStore:
+    """Per-process token buckets, evicting the least recently used keys"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, policy: BucketPolicy) -> Tuple[bool, float]:
+        """
+        Take one token from a bucket
+
+        Returns:
+            tuple: (allowed, retry_after_seconds)
+        """
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (policy.capacity, now))
+        tokens = min(policy.capacity, tokens + (now - updated_at) * policy.refill_per_second)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return allowed, 0.0 if allowed else policy.retry_after(tokens)
+
+
+class MongoBucketStore:
+    """
+    Token buckets shared by all workers through a MongoDB collection
+
+    Each take is a single atomic upsert that refills and debits the bucket
+    server-side, so concurrent workers never race on the token count.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self, idle_seconds: int = 3600):
+        # Idle buckets are full again long before this, so expiring them is safe
+        await self.collection.create_index("updated_at", expireAfterSeconds=idle_seconds)
+
+    async def take(self, key: str, policy: BucketPolicy) -> Tuple[bool, float]:
+        refilled = {
+            "$min": [
+                policy.capacity,
+                {"$add": [
+                    {"$ifNull": ["$tokens", policy.capacity]},
+                    {"$multiply": [
+                        {"$divide": [{"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]}, 1000]},
+                        policy.refill_per_second
+                    ]}
+                ]}
+            ]
+        }
+        bucket = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": "$$NOW"}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]}
+                }}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        allowed = bucket["allowed"]
+        return allowed, 0.0 if allowed else policy.retry_after(bucket["tokens"])
+
+
+class LoginRateLimiter:
+    """Admission control for credential checks, keyed by account email and client IP"""
+
+    def __init__(self, store, email_policy: BucketPolicy, ip_policy: BucketPolicy, enabled: bool = True):
+        self.store = store
+        self.email_policy = email_policy
+        self.ip_policy = ip_policy
+        self.enabled = enabled
+        self.metrics = {
+            "allowed": 0,
+            "rejected_ip": 0,
+            "rejected_email": 0,
+            "store_errors": 0
+        }
+
+    async def check(self, user_type: str, email: str, client_ip: Optional[str]) -> Tuple[bool, float]:
+        """
+        Admit or reject a login attempt before any password hashing happens
+
+        Args:
+            user_type: 'player' or 'club'
+            email: Email address the attempt is for
+            client_ip: Address of the client making the attempt
+
+        Returns:
+            tuple: (allowed, retry_after_seconds), the wait capped at MAX_RETRY_AFTER
+        """
+        if not self.enabled:
+            return True, 0.0
+
+        try:
+            # IP first, so a single client spraying many accounts is stopped
+            # without draining the buckets of the accounts it targets
+            allowed, retry_after = await self.store.take(f"login:ip:{client_ip or 'unknown'}", self.ip_policy)
+            if not allowed:
+                self.metrics["rejected_ip"] += 1
+                return False, min(retry_after, MAX_RETRY_AFTER)
+
+            allowed, retry_after = await self.store.take(f"login:{user_type}:{email.strip().lower()}", self.email_policy)
+            if not allowed:
+                self.metrics["rejected_email"] += 1
+                return False, min(retry_after, MAX_RETRY_AFTER)
+        except Exception as e:
+            # Fail open: a broken limiter store must not lock everybody out
+            self.metrics["store_errors"] += 1
+            logger.error(f"Login rate limiter store error: {str(e)}")
+            return True, 0.0
+
+        self.metrics["allowed"] += 1
+        return True, 0.0
+
+    def get_metrics(self) -> dict:
+        return {
+            **self.metrics,
+            "enabled": self.enabled,
+            "store": type(self.store).__name__,
+            "email_policy": {"capacity": self.email_policy.capacity, "refill_per_second": self.email_policy.refill_per_second},
+            "ip_policy": {"capacity": self.ip_policy.capacity, "refill_per_second": self.ip_policy.refill_per_second}
+        }
+
+
+def create_login_rate_limiter(db=None) -> LoginRateLimiter:
+    """
+    Build the login limiter from environment configuration
+
+    LOGIN_RATE_LIMIT_STORE selects 'memory' (default, per process) or 'mongo'
+    (shared by all workers, requires db).
+    """
+    email_per_minute = float(os.getenv("LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE", "5"))
+    ip_per_minute = float(os.getenv("LOGIN_RATE_LIMIT_IP_PER_MINUTE", "30"))
+    email_policy = BucketPolicy(
+        capacity=float(os.getenv("LOGIN_RATE_LIMIT_EMAIL_BURST", "5")),
+        refill_per_second=email_per_minute / 60
+    )
+    ip_policy = BucketPolicy(
+        capacity=float(os.getenv("LOGIN_RATE_LIMIT_IP_BURST", "30")),
+        refill_per_second=ip_per_minute / 60
+    )
+
+    store_name = os.getenv("LOGIN_RATE_LIMIT_STORE", "memory").lower()
+    if store_name == "mongo" and db is not None:
+        store = MongoBucketStore(db.rate_limit_buckets)
+    else:
+        if store_name != "memory":
+            logger.warning(f"Unknown or unavailable login rate limit store '{store_name}', using memory")
+        store = InMemoryBucketStore(max_keys=int(os.getenv("LOGIN_RATE_LIMIT_MAX_KEYS", "100000")))
+
+    enabled = os.getenv("LOGIN_RATE_LIMIT_ENABLED", "true").lower() not in ("0", "false", "no")
+    return LoginRateLimiter(store, email_policy, ip_policy, enabled=enabled)
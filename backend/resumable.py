@@ -0,0 +1,296 @@
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Callable, List, Optional
+
+from upload_validation import read_head
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5 * 1024 * 1024
+MIN_CHUNK_SIZE = 1024
+MAX_CHUNK_SIZE = 32 * 1024 * 1024
+# Bounds the per-chunk receipts kept on the session document
+MAX_CHUNKS = 10000
+# Sessions not completed within this long are dropped with their chunks
+UPLOAD_SESSION_TTL = timedelta(hours=24)
+# How often staged chunks of expired sessions are looked for
+PURGE_INTERVAL = timedelta(hours=1)
+
+
+class ChunkRejected(Exception):
+    """A chunk that does not fit its session: wrong index, size or checksum"""
+
+
+class SessionClosed(Exception):
+    """The upload session is already being completed, or has been"""
+
+
+class ChunkReader:
+    """File-like concatenation of chunk files that hashes what it hands out"""
+
+    def __init__(self, paths: List[Path]):
+        self.paths = list(paths)
+        self.current: Optional[BinaryIO] = None
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        parts = []
+        wanted = size
+        while size < 0 or wanted > 0:
+            if self.current is None:
+                if not self.paths:
+                    break
+                self.current = open(self.paths.pop(0), "rb")
+            part = self.current.read(wanted if size >= 0 else -1)
+            if not part:
+                self.current.close()
+                self.current = None
+                continue
+            parts.append(part)
+            wanted -= len(part)
+        data = b"".join(parts)
+        self.sha256.update(data)
+        return data
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+
+
+def _file_head(path: Path) -> bytes:
+    with open(path, "rb") as source:
+        return read_head(source)
+
+
+class ResumableUploads:
+    """
+    Chunked uploads that survive dropped connections
+
+    A session fixes the file's size and chunk size up front. Chunks are
+    PUT by index, each with the SHA-256 of its bytes; the server streams
+    a chunk to its own file in the staging directory while hashing it,
+    and keeps it only if size and hash match. Receipts are recorded on
+    the session in `upload_sessions`, so a client that lost its
+    connection asks which chunks are missing and sends only those.
+    Chunks may arrive in any order and in parallel. `reader` streams
+    the chunks back in order as one file for storage. Chunk files are
+    written and removed on worker threads; `start` runs `purge_stale`
+    periodically, since the TTL index drops expired sessions but not
+    their chunks.
+    """
+
+    def __init__(self, db, staging_dir: Path, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 session_ttl: timedelta = UPLOAD_SESSION_TTL, purge_interval: timedelta = PURGE_INTERVAL):
+        self.db = db
+        self.staging_dir = Path(staging_dir)
+        self.chunk_size = chunk_size
+        self.session_ttl = session_ttl
+        self.purge_interval = purge_interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def ensure_indexes(self):
+        await self.db.upload_sessions.create_index("id", unique=True)
+        await self.db.upload_sessions.create_index("expires_at", expireAfterSeconds=0)
+
+    def start(self):
+        """Purge expired chunks now and then every `purge_interval`, on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._purge_periodically())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _purge_periodically(self):
+        while True:
+            try:
+                await self.purge_stale()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Purging staged upload chunks failed")
+            await asyncio.sleep(self.purge_interval.total_seconds())
+
+    def _chunk_path(self, upload_id: str, index: int) -> Path:
+        return self.staging_dir / upload_id / f"{index:06d}"
+
+    def chunk_length(self, session: dict, index: int) -> int:
+        """Exact size of chunk `index`; only the last one may be short"""
+        if index == session["total_chunks"] - 1:
+            return session["size"] - index * session["chunk_size"]
+        return session["chunk_size"]
+
+    async def create(self, owner_type: str, owner_id: str, kind: str, key: str, original_name: str,
+                     content_type: str, size: int, chunk_size: Optional[int] = None) -> dict:
+        """Open a session for a file of `size` bytes that will be stored under `key`"""
+        chunk_size = min(max(chunk_size or self.chunk_size, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+        chunk_size = max(chunk_size, math.ceil(size / MAX_CHUNKS))
+        now = datetime.utcnow()
+        session = {
+            "id": str(uuid.uuid4()),
+            "owner_type": owner_type,
+            "owner_id": owner_id,
+            "kind": kind,
+            "key": key,
+            "original_name": original_name,
+            "content_type": content_type,
+            "size": size,
+            "chunk_size": chunk_size,
+            "total_chunks": max(1, math.ceil(size / chunk_size)),
+            "chunks": {},
+            "status": "open",
+            "created_at": now,
+            "expires_at": now + self.session_ttl
+        }
+        await self.db.upload_sessions.insert_one(dict(session))
+        return session
+
+    async def get(self, upload_id: str) -> Optional[dict]:
+        """The session, or None if it does not exist or has expired"""
+        session = await self.db.upload_sessions.find_one({"id": upload_id}, {"_id": 0})
+        # The TTL monitor only runs once a minute
+        if session and session["status"] != "completed" and session["expires_at"] < datetime.utcnow():
+            return None
+        return session
+
+    def missing_chunks(self, session: dict) -> List[int]:
+        return [index for index in range(session["total_chunks"]) if str(index) not in session["chunks"]]
+
+    async def write_chunk(self, session: dict, index: int, body: AsyncIterator[bytes], sha256: str,
+                          validate_head: Optional[Callable[[bytes], bool]] = None) -> dict:
+        """
+        Store chunk `index` from `body` if it has the expected size and hash
+
+        `validate_head` is given the start of chunk 0, so a file of the
+        wrong type is turned away before the rest is sent. Re-sending a
+        chunk that was already received replaces it, so a client unsure
+        whether its last PUT arrived can simply repeat it.
+        """
+        if session["status"] != "open":
+            raise SessionClosed("Upload is already complete")
+        if not 0 <= index < session["total_chunks"]:
+            raise ChunkRejected(f"Chunk index must be between 0 and {session['total_chunks'] - 1}")
+        expected_length = self.chunk_length(session, index)
+        sha256 = sha256.strip().lower()
+
+        path = self._chunk_path(session["id"], index)
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        partial = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+        digest = hashlib.sha256()
+        received = 0
+        try:
+            target = await asyncio.to_thread(open, partial, "wb")
+            try:
+                async for data in body:
+                    received += len(data)
+                    if received > expected_length:
+                        raise ChunkRejected(f"Chunk {index} must be {expected_length} bytes")
+                    digest.update(data)
+                    await asyncio.to_thread(target.write, data)
+            finally:
+                await asyncio.to_thread(target.close)
+            if received != expected_length:
+                raise ChunkRejected(f"Chunk {index} must be {expected_length} bytes, received {received}")
+            if digest.hexdigest() != sha256:
+                raise ChunkRejected(f"Chunk {index} does not match its SHA-256 checksum")
+            if index == 0 and validate_head:
+                if not validate_head(await asyncio.to_thread(_file_head, partial)):
+                    raise ChunkRejected("File content is not an allowed type")
+            await asyncio.to_thread(os.replace, partial, path)
+        finally:
+            await asyncio.to_thread(partial.unlink, missing_ok=True)
+
+        receipt = {"sha256": sha256, "size": received}
+        result = await self.db.upload_sessions.update_one(
+            {"id": session["id"], "status": "open"},
+            {"$set": {f"chunks.{index}": receipt}}
+        )
+        if result.matched_count == 0:
+            raise SessionClosed("Upload is already complete")
+        session["chunks"][str(index)] = receipt
+        return receipt
+
+    async def begin_assembly(self, session: dict):
+        """Claim the session for completion, so only one request assembles it"""
+        result = await self.db.upload_sessions.update_one(
+            {"id": session["id"], "status": "open"},
+            {"$set": {"status": "assembling"}}
+        )
+        if result.modified_count == 0:
+            raise SessionClosed("Upload is already being completed")
+
+    async def reopen(self, session: dict):
+        """Hand a session back to the client after a failed assembly"""
+        await self.db.upload_sessions.update_one({"id": session["id"]}, {"$set": {"status": "open"}})
+
+    def reader(self, session: dict) -> ChunkReader:
+        """The assembled file, read from the chunks in order"""
+        return ChunkReader([self._chunk_path(session["id"], index) for index in range(session["total_chunks"])])
+
+    async def finish(self, session: dict, sha256: str):
+        await self.db.upload_sessions.update_one(
+            {"id": session["id"]},
+            {"$set": {"status": "completed", "sha256": sha256, "completed_at": datetime.utcnow()}}
+        )
+        await asyncio.to_thread(self.discard_chunks, session["id"])
+
+    async def abort(self, session: dict):
+        await self.db.upload_sessions.delete_one({"id": session["id"]})
+        await asyncio.to_thread(self.discard_chunks, session["id"])
+
+    def discard_chunks(self, upload_id: str):
+        """Remove an upload's staged chunks; blocking"""
+        shutil.rmtree(self.staging_dir / upload_id, ignore_errors=True)
+
+    def _staged_uploads(self) -> List[str]:
+        with os.scandir(self.staging_dir) as entries:
+            return [entry.name for entry in entries if entry.is_dir()]
+
+    async def purge_stale(self) -> int:
+        """Remove staged chunks whose session expired; returns how many sessions were purged"""
+        try:
+            upload_ids = await asyncio.to_thread(self._staged_uploads)
+        except FileNotFoundError:
+            return 0
+        live = {
+            session["id"] async for session in self.db.upload_sessions.find(
+                {"id": {"$in": upload_ids}, "status": {"$ne": "completed"}, "expires_at": {"$gt": datetime.utcnow()}},
+                {"_id": 0, "id": 1}
+            )
+        }
+        stale = [upload_id for upload_id in upload_ids if upload_id not in live]
+        for upload_id in stale:
+            await asyncio.to_thread(self.discard_chunks, upload_id)
+        purged = len(stale)
+        if purged:
+            logger.info(f"Purged staged chunks of {purged} expired uploads")
+        return purged
+
+
+def create_resumable_uploads(db, upload_dir: Path) -> ResumableUploads:
+    """
+    Build the resumable upload store from environment configuration
+
+    UPLOAD_STAGING_DIR defaults to a directory next to the upload root; it
+    must be shared by all API instances. RESUMABLE_CHUNK_SIZE and
+    RESUMABLE_SESSION_HOURS tune the default chunk size and session lifetime,
+    RESUMABLE_PURGE_MINUTES how often chunks of expired sessions are removed.
+    """
+    upload_dir = Path(upload_dir)
+    return ResumableUploads(
+        db,
+        Path(os.getenv("UPLOAD_STAGING_DIR", str(upload_dir.parent / "upload_staging"))),
+        chunk_size=int(os.getenv("RESUMABLE_CHUNK_SIZE", str(DEFAULT_CHUNK_SIZE))),
+        session_ttl=timedelta(hours=float(os.getenv("RESUMABLE_SESSION_HOURS", "24"))),
+        purge_interval=timedelta(minutes=float(os.getenv("RESUMABLE_PURGE_MINUTES", "60")))
+    )
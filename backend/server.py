@@ -1,20 +1,46 @@
-from fastapi import FastAPI, APIRouter, HTTPException, File, UploadFile, Form, Query
+from fastapi import FastAPI, APIRouter, HTTPException, File, UploadFile, Form, Query, Depends, Request, Header, BackgroundTasks
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import FileResponse, RedirectResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
+import asyncio
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, List, Optional, Tuple, Union
 import uuid
+import secrets
+import base64
+import json
+import csv
+import tempfile
+import importlib.util
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
+import jwt
 import shutil
-import magic
 from urllib.parse import quote
 from email_service import send_verification_email, send_welcome_email, send_password_reset_email
+from rate_limiter import MongoBucketStore, create_login_rate_limiter
+from profile_cache import create_profile_cache
+from deletion import DELETE_BATCH_SIZE, DeletionEngine, media_item_paths
+from storage import DeleteQueue, FileTooLarge, LocalStorage, create_storage
+from resumable import ChunkRejected, SessionClosed, create_resumable_uploads
+from transcoding import create_transcoder
+from media import MediaLibrary, media_query
+from upload_validation import SNIFF_BYTES, PrefixedReader, read_head, validate_file_type
+from http_cache import cache_headers, document_validators, is_not_modified, not_modified_response, version_etag
+from fast_json import FastJSONResponse, ndjson_rows, trusted_rows
+from applicant_export import csv_stream, iter_applicant_chunks, write_xlsx
+from matching import MatchIndex, PLAYER_PROJECTION as MATCH_PLAYER_PROJECTION, VACANCY_PROJECTION as MATCH_VACANCY_PROJECTION
+from geocoding import geo_point, get_gazetteer
+from bulk_import import IMPORT_BATCH_SIZE, batched, detect_format, hash_passwords, iter_records, shutdown_hash_pool
 from enum import Enum
 
 
@@ -30,15 +56,79 @@ MAX_DOCUMENT_SIZE = 10 * 1024 * 1024  # 10MB
 MAX_PHOTO_SIZE = 10 * 1024 * 1024  # 10MB
 MAX_VIDEO_SIZE = 100 * 1024 * 1024  # 100MB
 
+# Accepted extensions per upload directory
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif'}
+VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi'}
+UPLOAD_EXTENSIONS = {
+    "avatars": IMAGE_EXTENSIONS,
+    "logos": IMAGE_EXTENSIONS,
+    "photos": IMAGE_EXTENSIONS,
+    "club_gallery": IMAGE_EXTENSIONS,
+    "documents": {'.pdf', '.doc', '.docx'},
+    "videos": VIDEO_EXTENSIONS,
+    "club_videos": VIDEO_EXTENSIONS
+}
+
 # Allowed file types
 ALLOWED_IMAGE_TYPES = {'image/jpeg', 'image/png', 'image/gif'}
 ALLOWED_DOCUMENT_TYPES = {'application/pdf', 'application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'}
 ALLOWED_VIDEO_TYPES = {'video/mp4', 'video/quicktime', 'video/x-msvideo'}
+# Content types accepted per upload directory, checked against the sniffed file head
+UPLOAD_CONTENT_TYPES = {
+    "avatars": ALLOWED_IMAGE_TYPES,
+    "logos": ALLOWED_IMAGE_TYPES,
+    "photos": ALLOWED_IMAGE_TYPES,
+    "club_gallery": ALLOWED_IMAGE_TYPES,
+    "documents": ALLOWED_DOCUMENT_TYPES,
+    "videos": ALLOWED_VIDEO_TYPES,
+    "club_videos": ALLOWED_VIDEO_TYPES
+}
+
+# Auth token lifetimes
+VERIFICATION_TOKEN_TTL = timedelta(hours=24)
+PASSWORD_RESET_TOKEN_TTL = timedelta(hours=2)
+
+# Pagination limits
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# Rows returned when a list is requested without limit or cursor, as before these lists were paged
+UNPAGED_LIST_LIMIT = 1000
+STREAM_BATCH_SIZE = 500
+
+# Messaging limits
+MAX_BULK_RECIPIENTS = 500
+
+# Bulk import
+MAX_IMPORT_ERRORS = 100
+IMPORT_API_KEY = os.environ.get("IMPORT_API_KEY")
+
+# Cache-Control per conditional GET route; CACHE_CONTROL_<ROUTE> overrides.
+# Short max-age keeps edits visible quickly; after that clients and CDNs
+# revalidate with the ETag and usually get a bodiless 304.
+CACHE_CONTROL = {
+    route: os.environ.get(f"CACHE_CONTROL_{route.upper()}", default)
+    for route, default in {
+        "vacancy": "public, max-age=30",
+        "public_profile": "public, max-age=60",
+        "browse": "public, max-age=30"
+    }.items()
+}
 
 # MongoDB connection
 client = AsyncIOMotorClient(os.environ.get("MONGO_URL"))
 db = client[os.environ.get("DB_NAME")]
 
+# Player/vacancy matching, refreshed from the database in the background of requests
+MAX_RECOMMENDATIONS = 100
+match_index = MatchIndex(db, refresh_seconds=float(os.environ.get("MATCH_REFRESH_SECONDS", "30")))
+
+# Read-through cache for single profile reads
+profile_cache = create_profile_cache()
+
+# Login throttling, applied before any password hashing
+login_rate_limiter = create_login_rate_limiter(db)
+TRUST_FORWARDED_FOR = os.environ.get("TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes")
+
 # FastAPI app and router
 app = FastAPI()
 api_router = APIRouter()
@@ -46,11 +136,67 @@ api_router = APIRouter()
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Session tokens
+JWT_ALGORITHM = "HS256"
+SESSION_TOKEN_EXPIRE_HOURS = int(os.environ.get("SESSION_TOKEN_EXPIRE_HOURS", "24"))
+# Provided by the deployment environment, never committed with the code
+JWT_SECRET = os.environ.get("JWT_SECRET")
+if not JWT_SECRET:
+    # Tokens will not survive a restart or validate across workers
+    logging.warning("JWT_SECRET not set, using a random per-process session secret")
+    JWT_SECRET = secrets.token_urlsafe(32)
+
+# Upload storage, local files or an S3-compatible bucket; direct uploads are signed with the session secret
+storage = create_storage(UPLOAD_DIR, JWT_SECRET)
+# Files of removed media are deleted in background batches
+file_deleter = DeleteQueue(storage)
+# Chunked uploads for large videos, staged on local disk until complete
+resumable_uploads = create_resumable_uploads(db, UPLOAD_DIR)
+# Photos, videos and gallery images, one document each; profiles keep a count and cover per list
+media_library = MediaLibrary(db)
+
+session_bearer = HTTPBearer(auto_error=False)
+
 # User type enum for validation
 class UserType(str, Enum):
     player = "player"
     club = "club"
 
+# Response shape for list endpoints
+class ResponseView(str, Enum):
+    full = "full"
+    card = "card"  # compact listing for mobile clients
+
+# Wire format for list endpoints
+class ListFormat(str, Enum):
+    json = "json"
+    ndjson = "ndjson"  # streamed, one document per line, for bulk consumers
+
+# What a bulk import creates, and the file format it is read from
+class ImportKind(str, Enum):
+    players = "players"
+    clubs = "clubs"
+    vacancies = "vacancies"
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+# File format for applicant exports
+class ExportFormat(str, Enum):
+    csv = "csv"
+    xlsx = "xlsx"
+
+# Uploadable media, see UPLOAD_TARGETS
+class UploadKind(str, Enum):
+    avatar = "avatar"
+    cv = "cv"
+    photo = "photo"
+    video = "video"
+    logo = "logo"
+    gallery_image = "gallery_image"
+    club_video = "club_video"
+
 # Helper functions
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -58,61 +204,135 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
-def validate_file_type(file_content: bytes, allowed_types: set) -> bool:
-    """Validate file type using python-magic"""
+def create_session_token(user_id: str, user_type: str, name: str) -> str:
+    """Issue a signed session token carrying the user's id, type and display name"""
+    issued_at = datetime.utcnow()
+    payload = {
+        "sub": user_id,
+        "type": user_type,
+        "name": name,
+        "iat": issued_at,
+        "exp": issued_at + timedelta(hours=SESSION_TOKEN_EXPIRE_HOURS)
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def get_client_ip(request: Request) -> Optional[str]:
+    """Client address, honouring X-Forwarded-For only when running behind a trusted proxy"""
+    if TRUST_FORWARDED_FOR:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+async def enforce_login_rate_limit(request: Request, user_type: str, email: str):
+    """Reject excess login attempts with 429 before the credential check runs"""
+    allowed, retry_after = await login_rate_limiter.check(user_type, email, get_client_ip(request))
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts. Please try again later.",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+        )
+
+def encode_page_cursor(document: dict, sort_field: str) -> str:
+    """Opaque keyset cursor pointing just past `document` in (sort_field, id) order"""
+    position = [document[sort_field].isoformat(), document["id"]]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def apply_page_cursor(filter_query: dict, sort_field: str, cursor: Optional[str]) -> dict:
+    """Restrict a newest-first (sort_field, id) query to documents after the cursor"""
+    if not cursor:
+        return filter_query
     try:
-        # Try to determine MIME type using python-magic
-        mime = magic.from_buffer(file_content, mime=True)
-        return mime in allowed_types
-    except:
-        # If magic fails, return True to allow upload (basic validation)
-        # In production, you might want stricter validation
-        return True
-
-def save_uploaded_file(file: UploadFile, directory: str, max_size: int, allowed_types: set) -> str:
-    """Save uploaded file and return filename"""
-    # Read file content
-    file_content = file.file.read()
-    file.file.seek(0)  # Reset file pointer
-    
-    # Validate file size
-    if len(file_content) > max_size:
-        raise HTTPException(status_code=400, detail=f"File too large. Maximum size: {max_size // (1024*1024)}MB")
-    
-    # Basic file extension validation (more lenient approach)
-    file_extension = Path(file.filename).suffix.lower()
-    
-    # Check file extension instead of magic for more reliable validation
-    if directory == "avatars" or directory == "logos":
-        allowed_extensions = {'.jpg', '.jpeg', '.png', '.gif'}
-    elif directory == "documents":
-        allowed_extensions = {'.pdf', '.doc', '.docx'}
-    elif directory == "photos" or directory == "club_gallery":
-        allowed_extensions = {'.jpg', '.jpeg', '.png', '.gif'}
-    elif directory == "videos" or directory == "club_videos":
-        allowed_extensions = {'.mp4', '.mov', '.avi'}
+        sort_value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        sort_value = datetime.fromisoformat(sort_value)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    keyset = {"$or": [
+        {sort_field: {"$lt": sort_value}},
+        {sort_field: sort_value, "id": {"$lt": last_id}}
+    ]}
+    return {"$and": [filter_query, keyset]} if filter_query else keyset
+
+async def paginated_list(collection, filter_query: dict, projection: dict, model, sort_field: str,
+                         limit: Optional[int], cursor: Optional[str], list_format: "ListFormat"):
+    """
+    Serve a newest-first keyset page, or stream the whole result set as NDJSON.
+    JSON pages carry the cursor for the next page in the X-Next-Cursor header.
+    Without limit or cursor up to UNPAGED_LIST_LIMIT rows are returned, so
+    clients written before paging keep working.
+    """
+    filter_query = apply_page_cursor(filter_query, sort_field, cursor)
+    sort = [(sort_field, -1), ("id", -1)]
+    
+    if list_format == ListFormat.ndjson:
+        documents = collection.find(filter_query, projection).sort(sort).batch_size(STREAM_BATCH_SIZE)
+        return StreamingResponse(ndjson_rows(model, documents), media_type="application/x-ndjson")
+    
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE if cursor else UNPAGED_LIST_LIMIT
     else:
-        allowed_extensions = set()
-    
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+    # Page projections must carry the keyset fields
+    projection = {**projection, sort_field: 1, "id": 1}
+    documents = await collection.find(filter_query, projection).sort(sort).limit(limit).to_list(limit)
+    
+    headers = {}
+    if len(documents) == limit:
+        headers["X-Next-Cursor"] = encode_page_cursor(documents[-1], sort_field)
+    return FastJSONResponse(trusted_rows(model, documents), headers=headers)
+
+def invalid_content(allowed_types: set) -> HTTPException:
+    return HTTPException(status_code=400, detail=f"Invalid file content. Allowed types: {', '.join(sorted(allowed_types))}")
+
+def upload_extension(directory: str, filename: Optional[str]) -> str:
+    """Lowercased extension of an uploaded file name, if the directory accepts it"""
+    allowed_extensions = UPLOAD_EXTENSIONS.get(directory, set())
+    file_extension = Path(filename or "").suffix.lower()
     if file_extension not in allowed_extensions:
         raise HTTPException(status_code=400, detail=f"Invalid file type. Allowed types: {', '.join(allowed_extensions)}")
+    return file_extension
+
+def file_too_large(max_size: int) -> HTTPException:
+    return HTTPException(status_code=400, detail=f"File too large. Maximum size: {max_size // (1024*1024)}MB")
+
+async def save_uploaded_file(file: UploadFile, directory: str, max_size: int, allowed_types: set) -> Tuple[str, int, str]:
+    """Stream an uploaded file into storage and return its filename, size and sniffed content type"""
+    if file.size is not None and file.size > max_size:
+        raise file_too_large(max_size)
+    file_extension = upload_extension(directory, file.filename)
     
     # Generate unique filename
     unique_filename = f"{uuid.uuid4()}{file_extension}"
     
-    # Create directory if it doesn't exist
-    upload_path = UPLOAD_DIR / directory
-    upload_path.mkdir(parents=True, exist_ok=True)
-    
-    # Save file
-    file_path = upload_path / unique_filename
-    with open(file_path, "wb") as buffer:
-        buffer.write(file_content)
-    
-    return unique_filename
+    # Only the head is sniffed; it is replayed in front of the rest as the file streams into storage
+    file.file.seek(0)
+    head = await asyncio.to_thread(read_head, file.file)
+    content_type = validate_file_type(head, allowed_types)
+    if not content_type:
+        raise invalid_content(allowed_types)
+    try:
+        file_size = await asyncio.to_thread(
+            storage.save, f"{directory}/{unique_filename}", PrefixedReader(head, file.file), content_type, max_size
+        )
+    except FileTooLarge:
+        raise file_too_large(max_size)
+    return unique_filename, file_size, content_type
 
 
 # Define Models
+class SessionUser(BaseModel):
+    """Authenticated user as carried by a session token"""
+    id: str
+    type: str  # "player" or "club"
+    name: str
+
+class GeoPoint(BaseModel):
+    """GeoJSON point, coordinates are [longitude, latitude]"""
+    type: str = "Point"
+    coordinates: List[float]
+
 class MediaFile(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     filename: str
@@ -120,6 +340,26 @@ class MediaFile(BaseModel):
     file_type: str
     file_size: int
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
+    # Videos only, filled in by the transcoding worker
+    transcode_status: Optional[str] = None  # queued, running, completed or failed
+    transcode_job_id: Optional[str] = None
+    web_filename: Optional[str] = None  # faststart H.264/AAC MP4 for playback
+    web_file_size: Optional[int] = None
+    poster_filename: Optional[str] = None
+    duration: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+class MediaItem(MediaFile):
+    """A photo, video or gallery image as listed from the media collection"""
+    owner_type: str  # "player" or "club"
+    owner_id: str
+    kind: str  # "photos", "videos" or "gallery_images"
+
+class MediaSummary(BaseModel):
+    """What a profile embeds of one media list; the entries are paged from its listing endpoint"""
+    count: int = 0
+    cover: Optional[MediaFile] = None  # newest entry
 
 class PlayerProfile(BaseModel):
     """Player profile model without sensitive information"""
@@ -134,8 +374,7 @@ class PlayerProfile(BaseModel):
     age: Optional[int] = None
     avatar: Optional[str] = None
     cv_document: Optional[str] = None
-    photos: List[MediaFile] = []
-    videos: List[MediaFile] = []
+    media: Dict[str, MediaSummary] = {}  # "photos" and "videos"
     is_verified: bool = False
     created_at: datetime
     updated_at: datetime
@@ -158,12 +397,34 @@ class ClubProfile(BaseModel):
     club_story: Optional[str] = None
     facilities: Optional[str] = None
     social_media: Optional[dict] = None
-    gallery_images: List[MediaFile] = []
-    videos: List[MediaFile] = []
+    media: Dict[str, MediaSummary] = {}  # "gallery_images" and "videos"
     is_verified: bool = False
     created_at: datetime
     updated_at: datetime
 
+class PlayerCard(BaseModel):
+    """Compact player listing entry"""
+    id: str
+    name: str
+    position: str
+    experience_level: str
+    location: str
+    country: Optional[str] = None
+    age: Optional[int] = None
+    avatar: Optional[str] = None
+    is_verified: bool = False
+
+class ClubCard(BaseModel):
+    """Compact club listing entry"""
+    id: str
+    name: str
+    location: str
+    club_type: Optional[str] = None
+    league: Optional[str] = None
+    established_year: Optional[int] = None
+    logo: Optional[str] = None
+    is_verified: bool = False
+
 class Message(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     conversation_id: str
@@ -182,6 +443,14 @@ class Message(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class ConversationMember(BaseModel):
+    """Per-participant conversation state, indexed via the multikey `members` index"""
+    user_id: str
+    user_type: str  # "player" or "club"
+    name: str
+    unread_count: int = 0
+    is_deleted: bool = False
+
 class Conversation(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     participant_1_id: str
@@ -190,13 +459,10 @@ class Conversation(BaseModel):
     participant_2_id: str
     participant_2_type: str  # "player" or "club"
     participant_2_name: str
+    members: List[ConversationMember] = []
     last_message_content: Optional[str] = None
     last_message_at: Optional[datetime] = None
     last_message_sender_id: Optional[str] = None
-    unread_count_p1: int = 0  # Unread count for participant 1
-    unread_count_p2: int = 0  # Unread count for participant 2
-    is_deleted_by_p1: bool = False
-    is_deleted_by_p2: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -208,6 +474,18 @@ class SendMessageRequest(BaseModel):
     content: str
     reply_to_message_id: Optional[str] = None
 
+class BulkMessageRequest(BaseModel):
+    receiver_ids: List[str]
+    receiver_type: str  # "player" or "club"
+    subject: Optional[str] = None
+    content: str
+
+class BulkMessageResult(BaseModel):
+    receiver_id: str
+    status: str  # "sent", "not_found" or "skipped"
+    message_id: Optional[str] = None
+    conversation_id: Optional[str] = None
+
 class ConversationSummary(BaseModel):
     conversation: Conversation
     last_message: Optional[Message] = None
@@ -225,14 +503,17 @@ class Player(BaseModel):
     age: Optional[int] = None
     avatar: Optional[str] = None  # filename
     cv_document: Optional[str] = None  # filename
-    photos: List[MediaFile] = []
-    videos: List[MediaFile] = []
-    # Email verification fields
+    media: Dict[str, MediaSummary] = {}  # count and cover of "photos" and "videos"
+    geo: Optional[GeoPoint] = None  # geocoded from location/country
+    # Email verification state (tokens live in the auth_tokens collection)
     is_verified: bool = False
-    verification_token: Optional[str] = None
-    verification_token_expires: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 1  # bumped on every edit, checked against If-Match
+
+class PlayerLoginResponse(Player):
+    access_token: str
+    token_type: str = "bearer"
 
 class PlayerCreate(BaseModel):
     name: str
@@ -276,14 +557,17 @@ class Club(BaseModel):
     club_story: Optional[str] = None
     facilities: Optional[str] = None
     social_media: Optional[dict] = None  # {"instagram": "", "facebook": "", "twitter": ""}
-    gallery_images: List[MediaFile] = []
-    videos: List[MediaFile] = []
-    # Email verification fields
+    media: Dict[str, MediaSummary] = {}  # count and cover of "gallery_images" and "videos"
+    geo: Optional[GeoPoint] = None  # geocoded from location
+    # Email verification state (tokens live in the auth_tokens collection)
     is_verified: bool = False
-    verification_token: Optional[str] = None
-    verification_token_expires: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 1  # bumped on every edit, checked against If-Match
+
+class ClubLoginResponse(Club):
+    access_token: str
+    token_type: str = "bearer"
 
 class ClubCreate(BaseModel):
     name: str
@@ -317,6 +601,15 @@ class ClubLogin(BaseModel):
     email: str
     password: str
 
+class AuthToken(BaseModel):
+    """Single-use email verification or password reset token"""
+    token: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    purpose: str  # "email_verification" or "password_reset"
+    user_id: str
+    user_type: str  # "player" or "club"
+    expires_at: datetime
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
 # Email verification models
 class EmailVerificationRequest(BaseModel):
     token: str
@@ -346,6 +639,7 @@ class Vacancy(BaseModel):
     requirements: Optional[str] = None
     experience_level: str  # "Beginner", "Intermediate", "Advanced", "Professional"
     location: str
+    geo: Optional[GeoPoint] = None  # geocoded from location
     # Enhanced fields
     salary_range: Optional[str] = None  # "25000-35000", "Negotiable", etc.
     contract_type: Optional[str] = None  # "Full-time", "Part-time", "Seasonal", "Contract"
@@ -360,8 +654,24 @@ class Vacancy(BaseModel):
     # Metadata
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 1  # bumped on every edit, checked against If-Match
     published_at: Optional[datetime] = None
 
+class VacancyCard(BaseModel):
+    """Compact vacancy listing entry"""
+    id: str
+    club_id: str
+    club_name: str
+    position: str
+    title: str
+    experience_level: str
+    location: str
+    salary_range: Optional[str] = None
+    contract_type: Optional[str] = None
+    application_deadline: Optional[datetime] = None
+    status: str = "active"
+    created_at: datetime
+
 class VacancyCreate(BaseModel):
     club_id: str
     position: str
@@ -378,6 +688,11 @@ class VacancyCreate(BaseModel):
     status: str = "active"
     priority: str = "normal"
 
+class VacancyImport(VacancyCreate):
+    """Imported vacancy, owned by a club given either by id or by email"""
+    club_id: Optional[str] = None
+    club_email: Optional[str] = None
+
 class VacancyUpdate(BaseModel):
     position: Optional[str] = None
     title: Optional[str] = None
@@ -393,6 +708,108 @@ class VacancyUpdate(BaseModel):
     status: Optional[str] = None
     priority: Optional[str] = None
 
+class VacancyMatch(BaseModel):
+    score: float
+    vacancy: VacancyCard
+
+class PlayerMatch(BaseModel):
+    score: float
+    player: PlayerCard
+
+class PlayerDigest(BaseModel):
+    """Precomputed vacancy recommendations, see digests.DigestJob"""
+    generated_at: Optional[datetime] = None
+    since: Optional[datetime] = None
+    vacancies: List[VacancyMatch] = []
+
+class ClubDigest(BaseModel):
+    """Precomputed player recommendations, see digests.DigestJob"""
+    generated_at: Optional[datetime] = None
+    since: Optional[datetime] = None
+    players: List[PlayerMatch] = []
+
+class DeletionStatus(BaseModel):
+    """Progress of a cascading delete, see deletion.DeletionEngine"""
+    id: str
+    entity_type: str  # "player", "club" or "vacancy"
+    entity_id: str
+    status: str  # "running", "completed", "failed"
+    steps_done: List[str] = []
+    progress: Dict[str, int] = {}  # documents/files removed so far, per kind
+    requested_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+class TranscodeJob(BaseModel):
+    """Progress of a video transcode, see transcoding.TranscodeWorker"""
+    id: str
+    owner_type: str  # "player" or "club"
+    owner_id: str
+    media_id: str
+    status: str  # "queued", "running", "completed", "failed", "cancelled"
+    attempts: int = 0
+    error: Optional[str] = None
+    result: Optional[Dict[str, Union[str, int, float, None]]] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class PresignUploadRequest(BaseModel):
+    owner_id: str
+    kind: UploadKind
+    filename: str
+    content_type: str
+    size: int
+
+class PresignedUpload(BaseModel):
+    """Where to send the file: PUT with headers, or POST a form with fields plus the file"""
+    key: str
+    method: str
+    url: str
+    fields: Dict[str, str] = {}
+    headers: Dict[str, str] = {}
+    expires_in: int
+    upload_token: str  # pass to POST /uploads/complete
+
+class CompleteUploadRequest(BaseModel):
+    owner_id: str
+    kind: UploadKind
+    key: str
+    upload_token: str  # from the presign response
+    original_name: str
+
+class ResumableUploadRequest(BaseModel):
+    owner_id: str
+    kind: UploadKind
+    filename: str
+    content_type: str
+    size: int
+    chunk_size: Optional[int] = None  # suggestion; the server clamps it
+
+class ResumableUpload(BaseModel):
+    """Upload session; PUT each missing chunk, then complete it"""
+    id: str
+    key: str
+    size: int
+    chunk_size: int
+    total_chunks: int
+    received: List[int]
+    missing: List[int]
+    status: str
+    expires_at: datetime
+
+class ImportRecordError(BaseModel):
+    line: int
+    error: str
+
+class ImportReport(BaseModel):
+    kind: str
+    total: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRecordError] = []  # first MAX_IMPORT_ERRORS only
+
 class Application(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     player_id: str
@@ -415,6 +832,7 @@ class Application(BaseModel):
     # Metadata
     applied_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 1  # bumped on every edit, checked against If-Match
 
 class ApplicationCreate(BaseModel):
     player_id: str
@@ -428,6 +846,269 @@ class ApplicationUpdate(BaseModel):
     notes: Optional[str] = None
     reviewed_by: Optional[str] = None
 
+# Conditional GET
+def conditional_json(request: Request, route: str, documents: List[dict], render, variant: str = "",
+                     etag: Optional[str] = None):
+    """
+    304 if the client's copy of `documents` is current, otherwise a JSON
+    response of `render()`. Validators are checked before rendering, so a
+    304 skips serialization entirely. `etag` replaces the weak digest, e.g.
+    with a single document's version tag.
+    """
+    digest, last_modified = document_validators(documents, variant)
+    etag = etag or digest
+    headers = cache_headers(etag, last_modified, CACHE_CONTROL[route])
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(headers)
+    return FastJSONResponse(render(), headers=headers)
+
+# Optimistic concurrency
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """
+    Expected document version from an If-Match header, e.g. `"3"`
+
+    Returns None when the header is absent or `*`, meaning any existing
+    version may be updated.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith('"') and value.endswith('"') and len(value) >= 2:
+        value = value[1:-1]
+    if not value.isdigit():
+        raise HTTPException(status_code=400, detail="If-Match must be a document version, e.g. \"3\"")
+    return int(value)
+
+async def update_versioned(collection, document_id: str, expected_version: Optional[int], update_data: dict,
+                           projection: dict, label: str, first_transition: Optional[tuple] = None) -> dict:
+    """
+    Set `update_data` and bump `version` in one round trip, returning the updated document
+
+    `first_transition` is an optional (filter, extra_fields) pair: when the
+    document also matches the filter, the extra fields are set as part of
+    the same atomic update, e.g. stamping published_at only when a vacancy
+    actually becomes active. A missing document is a 404; a version other
+    than `expected_version` is a 412.
+    """
+    query = {"id": document_id}
+    if expected_version is not None:
+        query["version"] = expected_version
+    
+    document = None
+    if first_transition:
+        condition, extra_fields = first_transition
+        document = await collection.find_one_and_update(
+            {**query, **condition},
+            {"$set": {**update_data, **extra_fields}, "$inc": {"version": 1}},
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+        )
+    if document is None:
+        document = await collection.find_one_and_update(
+            query,
+            {"$set": update_data, "$inc": {"version": 1}},
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+        )
+    if document is None:
+        if expected_version is not None and await collection.find_one({"id": document_id}, EXISTS_PROJECTION):
+            raise HTTPException(status_code=412, detail=f"{label} was changed by another request, reload it and retry")
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    return document
+
+# Cached profile reads
+CACHED_PROFILE_VIEWS = ("owner", "public_profile")
+
+async def read_profile(user_type: str, view: str, user_id: str) -> Optional[dict]:
+    """Player or club document in one of the cached projection views"""
+    collection = db.players if user_type == "player" else db.clubs
+    return await profile_cache.get_or_load(
+        f"{user_type}:{view}:{user_id}",
+        lambda: collection.find_one({"id": user_id}, PROJECTIONS[user_type][view])
+    )
+
+async def invalidate_profile(user_type: str, user_id: str):
+    """Call after any write to a player or club document"""
+    await profile_cache.invalidate(*(f"{user_type}:{view}:{user_id}" for view in CACHED_PROFILE_VIEWS))
+
+# Cascading deletes
+async def on_entity_removed(entity_type: str, entity_ids: List[str]):
+    """Drop removed entities from in-process indexes and caches"""
+    for entity_id in entity_ids:
+        if entity_type == "vacancy":
+            match_index.remove_vacancy(entity_id)
+            continue
+        if entity_type == "player":
+            match_index.remove_player(entity_id)
+        await invalidate_profile(entity_type, entity_id)
+
+deletion_engine = DeletionEngine(
+    db, storage,
+    batch_size=int(os.environ.get("DELETE_BATCH_SIZE", DELETE_BATCH_SIZE)),
+    on_removed=on_entity_removed
+)
+
+# Video transcoding, results are written to the video's media entry
+transcoder = create_transcoder(db, storage, media_library, on_updated=invalidate_profile)
+
+async def queue_transcode(owner_type: str, owner_id: str, directory: str, media_file: MediaFile):
+    """Queue an attached video for its web rendition and poster"""
+    if not transcoder.enabled:
+        return
+    job_id = str(uuid.uuid4())
+    # Marked queued before the job exists, so a fast worker's status is never overwritten
+    await media_library.update(
+        owner_type, owner_id, "videos", media_file.id, {"transcode_status": "queued", "transcode_job_id": job_id}
+    )
+    await transcoder.enqueue(owner_type, owner_id, directory, media_file.id, media_file.filename, job_id=job_id)
+    await invalidate_profile(owner_type, owner_id)
+
+async def start_deletion(entity_type: str, entity_id: str, label: str) -> dict:
+    deletion = await deletion_engine.delete(entity_type, entity_id)
+    if not deletion:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    return {
+        "message": f"{label} deleted successfully",
+        "deletion_id": deletion["id"],
+        "status": deletion["status"]
+    }
+
+# Geocoding, offline against the bundled gazetteer
+def locate(location: Optional[str], country: Optional[str] = None) -> Optional[dict]:
+    return get_gazetteer().geocode(location, country)
+
+def near_filter(near: Optional[str], lat: Optional[float], lng: Optional[float], radius_km: Optional[float]) -> Optional[dict]:
+    """$nearSphere condition on `geo` around a place name or coordinates, nearest first"""
+    if near:
+        point = locate(near)
+        if not point:
+            raise HTTPException(status_code=400, detail=f"Unknown location: {near}")
+    elif (lat is None) != (lng is None):
+        raise HTTPException(status_code=400, detail="lat and lng must be given together")
+    elif lat is not None:
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise HTTPException(status_code=400, detail="Invalid coordinates")
+        point = geo_point(lng, lat)
+    elif radius_km is not None:
+        raise HTTPException(status_code=400, detail="radius_km requires near or lat/lng")
+    else:
+        return None
+    
+    condition = {"$geometry": point}
+    if radius_km is not None:
+        if radius_km <= 0:
+            raise HTTPException(status_code=400, detail="radius_km must be positive")
+        condition["$maxDistance"] = radius_km * 1000
+    return {"$nearSphere": condition}
+
+# New document builders, shared by the create endpoints and bulk import
+def build_player(player: PlayerCreate) -> Player:
+    """Unverified player from registration data, without the password"""
+    player_dict = player.dict()
+    player_dict.pop("password")  # Remove plain password
+    player_dict["is_verified"] = False
+    player_dict["geo"] = locate(player.location, player.country)
+    return Player(**player_dict)
+
+def build_club(club: ClubCreate) -> Club:
+    """Unverified club from registration data, without the password"""
+    club_dict = club.dict()
+    club_dict.pop("password")  # Remove plain password
+    club_dict["social_media"] = {}
+    club_dict["is_verified"] = False
+    club_dict["geo"] = locate(club.location)
+    return Club(**club_dict)
+
+def build_vacancy(vacancy: VacancyCreate, club_id: str, club_name: str) -> Vacancy:
+    vacancy_dict = vacancy.dict(exclude={"club_id", "club_email"})
+    vacancy_dict["club_id"] = club_id
+    vacancy_dict["club_name"] = club_name
+    vacancy_dict["geo"] = locate(vacancy.location)
+    
+    # Set published_at if status is active
+    if vacancy_dict.get("status") == "active":
+        vacancy_dict["published_at"] = datetime.utcnow()
+    
+    return Vacancy(**vacancy_dict)
+
+# Projection registry
+# Every profile read names the view it serves, so Mongo only sends those fields
+# and credentials never reach the app server unless a view asks for them
+def model_projection(model, *extra_fields) -> dict:
+    """Inclusion projection covering a model's fields"""
+    return {"_id": 0, **{field: 1 for field in model.model_fields}, **{field: 1 for field in extra_fields}}
+
+PROJECTIONS = {
+    "player": {
+        "owner": model_projection(Player),
+        "public_profile": model_projection(PlayerProfile),
+        "card": model_projection(PlayerCard),
+        "credentials": model_projection(Player, "password_hash"),
+        "application_snapshot": {"_id": 0, "name": 1, "position": 1, "location": 1, "experience_level": 1}
+    },
+    "club": {
+        "owner": model_projection(Club),
+        "public_profile": model_projection(ClubProfile),
+        "card": model_projection(ClubCard),
+        "credentials": model_projection(Club, "password_hash"),
+        "name": {"_id": 0, "name": 1}
+    },
+    "vacancy": {
+        "full": {"_id": 0},
+        "card": model_projection(VacancyCard)
+    },
+    "media": {
+        "item": model_projection(MediaItem)
+    }
+}
+
+EXISTS_PROJECTION = {"_id": 1}
+DOCUMENT_PROJECTION = {"_id": 0}
+
+# Session dependencies
+async def get_optional_session(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(session_bearer)
+) -> Optional[SessionUser]:
+    """Verify the bearer session token, if one was sent, without touching the database"""
+    if credentials is None:
+        return None
+    try:
+        payload = jwt.decode(
+            credentials.credentials,
+            JWT_SECRET,
+            algorithms=[JWT_ALGORITHM],
+            options={"require": ["exp", "sub"]}
+        )
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired session token")
+    
+    if payload.get("type") not in ["player", "club"]:
+        raise HTTPException(status_code=401, detail="Invalid or expired session token")
+    
+    return SessionUser(id=payload["sub"], type=payload["type"], name=payload.get("name", ""))
+
+async def get_current_session(session: Optional[SessionUser] = Depends(get_optional_session)) -> SessionUser:
+    """Require a valid session token"""
+    if session is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return session
+
+def resolve_acting_user(session: Optional[SessionUser], user_id: Optional[str], user_type: Optional[str]) -> tuple:
+    """Return (user_id, user_type) from the session, falling back to explicit parameters"""
+    if session:
+        if (user_id and user_id != session.id) or (user_type and user_type != session.type):
+            raise HTTPException(status_code=403, detail="Access denied")
+        return session.id, session.type
+    
+    if not user_id or not user_type:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return user_id, user_type
+
+def require_account_owner(session: SessionUser, user_type: str, user_id: str):
+    """Only the signed-in player or club may act on their own account"""
+    if session.type != user_type or session.id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
 # Basic routes
 @api_router.get("/")
 async def root():
@@ -455,10 +1136,12 @@ async def test_query_params(user_id: str = Query(...), user_type: str = Query(..
     }
 
 # Authentication routes
-@api_router.post("/players/login", response_model=Player)
-async def login_player(credentials: PlayerLogin):
+@api_router.post("/players/login", response_model=PlayerLoginResponse)
+async def login_player(credentials: PlayerLogin, request: Request):
+    await enforce_login_rate_limit(request, "player", credentials.email)
+    
     # Find player by email
-    player_data = await db.players.find_one({"email": credentials.email})
+    player_data = await db.players.find_one({"email": credentials.email}, PROJECTIONS["player"]["credentials"])
     if not player_data:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
@@ -472,12 +1155,15 @@ async def login_player(credentials: PlayerLogin):
     
     # Remove password_hash from response
     player_data.pop("password_hash", None)
-    return Player(**player_data)
+    access_token = create_session_token(player_data["id"], "player", player_data["name"])
+    return PlayerLoginResponse(**player_data, access_token=access_token)
 
-@api_router.post("/clubs/login", response_model=Club)
-async def login_club(credentials: ClubLogin):
+@api_router.post("/clubs/login", response_model=ClubLoginResponse)
+async def login_club(credentials: ClubLogin, request: Request):
+    await enforce_login_rate_limit(request, "club", credentials.email)
+    
     # Find club by email
-    club_data = await db.clubs.find_one({"email": credentials.email})
+    club_data = await db.clubs.find_one({"email": credentials.email}, PROJECTIONS["club"]["credentials"])
     if not club_data:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
@@ -491,37 +1177,44 @@ async def login_club(credentials: ClubLogin):
     
     # Remove password_hash from response
     club_data.pop("password_hash", None)
-    return Club(**club_data)
+    access_token = create_session_token(club_data["id"], "club", club_data["name"])
+    return ClubLoginResponse(**club_data, access_token=access_token)
+
+@api_router.get("/metrics/login-throttle")
+async def get_login_throttle_metrics():
+    """Login rate limiter counters and configuration"""
+    return login_rate_limiter.get_metrics()
+
+@api_router.get("/metrics/profile-cache")
+async def get_profile_cache_metrics():
+    """Profile cache hit/miss counters and configuration"""
+    return profile_cache.get_metrics()
+
+@api_router.get("/session", response_model=SessionUser)
+async def get_session(session: SessionUser = Depends(get_current_session)):
+    """Return the user carried by the current session token"""
+    return session
 
 # Player routes
 @api_router.post("/players")
 async def create_player(player: PlayerCreate):
     # Check if email already exists
-    existing_player = await db.players.find_one({"email": player.email})
+    existing_player = await db.players.find_one({"email": player.email}, EXISTS_PROJECTION)
     if existing_player:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password
     password_hash = get_password_hash(player.password)
     
-    # Generate verification token
-    verification_token = str(uuid.uuid4())
-    verification_expires = datetime.utcnow() + timedelta(hours=24)
-    
     # Create player data
-    player_dict = player.dict()
-    player_dict.pop("password")  # Remove plain password
-    player_dict["password_hash"] = password_hash
-    player_dict["photos"] = []
-    player_dict["videos"] = []
-    player_dict["is_verified"] = False
-    player_dict["verification_token"] = verification_token
-    player_dict["verification_token_expires"] = verification_expires
-    
-    player_obj = Player(**{k: v for k, v in player_dict.items() if k != "password_hash"})
+    player_obj = build_player(player)
     
     # Save to database with password hash
     await db.players.insert_one({**player_obj.dict(), "password_hash": password_hash})
+    match_index.upsert_player(player_obj.dict())
+    
+    # Generate verification token
+    verification_token = await issue_auth_token("email_verification", player_obj.id, "player", VERIFICATION_TOKEN_TTL)
     
     # Send verification email
     email_sent = send_verification_email(player.email, verification_token, "player", player.name)
@@ -533,233 +1226,211 @@ async def create_player(player: PlayerCreate):
     
     return {"message": "Account created successfully! Please check your email to verify your account."}
 
-@api_router.get("/players", response_model=List[Player])
-async def get_players():
-    players = await db.players.find().to_list(1000)
-    # Remove password_hash from all players
-    for player in players:
-        player.pop("password_hash", None)
-    return [Player(**player) for player in players]
+@api_router.get("/players", response_model=Union[List[Player], List[PlayerCard]])
+async def get_players(
+    view: ResponseView = ResponseView.full,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: ListFormat = ListFormat.json
+):
+    if view == ResponseView.card:
+        model, projection = PlayerCard, PROJECTIONS["player"]["card"]
+    else:
+        model, projection = Player, PROJECTIONS["player"]["owner"]
+    
+    return await paginated_list(db.players, {}, projection, model, "created_at", limit, cursor, format)
 
 @api_router.get("/players/{player_id}", response_model=Player)
 async def get_player(player_id: str):
-    player = await db.players.find_one({"id": player_id})
+    player = await read_profile("player", "owner", player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
-    player.pop("password_hash", None)
     return Player(**player)
 
 @api_router.put("/players/{player_id}", response_model=Player)
-async def update_player(player_id: str, player_update: PlayerUpdate):
-    player = await db.players.find_one({"id": player_id})
-    if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
-    
+async def update_player(player_id: str, player_update: PlayerUpdate, response: Response,
+                        if_match: Optional[str] = Header(None)):
     # Update only provided fields
     update_data = {k: v for k, v in player_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
+    if "location" in update_data and "country" in update_data:
+        update_data["geo"] = locate(update_data["location"], update_data["country"])
     
-    await db.players.update_one({"id": player_id}, {"$set": update_data})
-    
-    # Return updated player
-    updated_player = await db.players.find_one({"id": player_id})
-    updated_player.pop("password_hash", None)
+    updated_player = await update_versioned(
+        db.players, player_id, parse_if_match(if_match), update_data,
+        PROJECTIONS["player"]["owner"], "Player"
+    )
+    if ("location" in update_data or "country" in update_data) and "geo" not in update_data:
+        # Geocoding needs the stored half of location/country, known only now
+        geo = locate(updated_player.get("location"), updated_player.get("country"))
+        if geo != updated_player.get("geo"):
+            await db.players.update_one({"id": player_id}, {"$set": {"geo": geo}})
+            updated_player["geo"] = geo
+    await invalidate_profile("player", player_id)
+    
+    match_index.upsert_player(updated_player)
+    response.headers["ETag"] = version_etag(updated_player)
     return Player(**updated_player)
 
+@api_router.delete("/players/{player_id}")
+async def delete_player(player_id: str, session: SessionUser = Depends(get_current_session)):
+    """
+    Delete the signed-in player's account now; applications, conversations,
+    messages, digests and uploaded files are removed in the background.
+    Track it with GET /deletions/{deletion_id}.
+    """
+    require_account_owner(session, "player", player_id)
+    return await start_deletion("player", player_id, "Player")
+
 # File upload routes
 @api_router.post("/players/{player_id}/avatar")
 async def upload_avatar(player_id: str, file: UploadFile = File(...)):
-    player = await db.players.find_one({"id": player_id})
+    player = await db.players.find_one({"id": player_id}, EXISTS_PROJECTION)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
     # Save file
-    filename = save_uploaded_file(file, "avatars", MAX_AVATAR_SIZE, ALLOWED_IMAGE_TYPES)
+    filename, _, _ = await save_uploaded_file(file, "avatars", MAX_AVATAR_SIZE, ALLOWED_IMAGE_TYPES)
     
     # Update player with new avatar
     await db.players.update_one(
         {"id": player_id}, 
         {"$set": {"avatar": filename, "updated_at": datetime.utcnow()}}
     )
+    await invalidate_profile("player", player_id)
     
     return {"filename": filename, "message": "Avatar uploaded successfully"}
 
 @api_router.post("/players/{player_id}/cv")
 async def upload_cv(player_id: str, file: UploadFile = File(...)):
-    player = await db.players.find_one({"id": player_id})
+    player = await db.players.find_one({"id": player_id}, EXISTS_PROJECTION)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
     # Save file
-    filename = save_uploaded_file(file, "documents", MAX_DOCUMENT_SIZE, ALLOWED_DOCUMENT_TYPES)
+    filename, _, _ = await save_uploaded_file(file, "documents", MAX_DOCUMENT_SIZE, ALLOWED_DOCUMENT_TYPES)
     
     # Update player with new CV
     await db.players.update_one(
         {"id": player_id}, 
         {"$set": {"cv_document": filename, "updated_at": datetime.utcnow()}}
     )
+    await invalidate_profile("player", player_id)
     
     return {"filename": filename, "message": "CV uploaded successfully"}
 
 @api_router.post("/players/{player_id}/photos")
 async def upload_photo(player_id: str, file: UploadFile = File(...)):
-    player = await db.players.find_one({"id": player_id})
+    player = await db.players.find_one({"id": player_id}, EXISTS_PROJECTION)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
     # Save file
-    filename = save_uploaded_file(file, "photos", MAX_PHOTO_SIZE, ALLOWED_IMAGE_TYPES)
-    
-    # Get file size
-    file.file.seek(0)
-    file_content = file.file.read()
-    file_size = len(file_content)
+    filename, file_size, content_type = await save_uploaded_file(file, "photos", MAX_PHOTO_SIZE, ALLOWED_IMAGE_TYPES)
     
     # Create media file object
     media_file = MediaFile(
         filename=filename,
         original_name=file.filename,
-        file_type=file.content_type or "image/jpeg",
+        file_type=content_type,
         file_size=file_size
     )
     
     # Add to player's photos
-    await db.players.update_one(
-        {"id": player_id}, 
-        {"$push": {"photos": media_file.dict()}, "$set": {"updated_at": datetime.utcnow()}}
-    )
+    await media_library.add("player", player_id, "photos", media_file.dict())
+    await invalidate_profile("player", player_id)
     
     return {"filename": filename, "message": "Photo uploaded successfully"}
 
 @api_router.post("/players/{player_id}/videos")
 async def upload_video(player_id: str, file: UploadFile = File(...)):
-    player = await db.players.find_one({"id": player_id})
+    player = await db.players.find_one({"id": player_id}, EXISTS_PROJECTION)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
     # Save file
-    filename = save_uploaded_file(file, "videos", MAX_VIDEO_SIZE, ALLOWED_VIDEO_TYPES)
-    
-    # Determine file type based on extension
-    file_extension = Path(file.filename).suffix.lower()
-    if file_extension == '.mp4':
-        file_type = 'video/mp4'
-    elif file_extension == '.mov':
-        file_type = 'video/quicktime'
-    elif file_extension == '.avi':
-        file_type = 'video/x-msvideo'
-    else:
-        file_type = file.content_type or "video/mp4"
-    
-    # Get file size
-    file.file.seek(0)
-    file_content = file.file.read()
-    file_size = len(file_content)
+    filename, file_size, content_type = await save_uploaded_file(file, "videos", MAX_VIDEO_SIZE, ALLOWED_VIDEO_TYPES)
     
     # Create media file object
     media_file = MediaFile(
         filename=filename,
         original_name=file.filename,
-        file_type=file_type,
+        file_type=content_type,
         file_size=file_size
     )
     
     # Add to player's videos
-    await db.players.update_one(
-        {"id": player_id}, 
-        {"$push": {"videos": media_file.dict()}, "$set": {"updated_at": datetime.utcnow()}}
-    )
+    await media_library.add("player", player_id, "videos", media_file.dict())
+    await invalidate_profile("player", player_id)
+    await queue_transcode("player", player_id, "videos", media_file)
     
     return {"filename": filename, "message": "Video uploaded successfully"}
 
+# Media list entries
+async def remove_media_item(owner_type: str, owner_id: str, kind: str, directory: str, item_id: str, label: str):
+    """
+    Delete a photo, video or gallery image and uncount it on its owner
+
+    The entry comes back from the same atomic delete, and its files are
+    handed to the background deleter rather than unlinked in the request.
+    """
+    removed = await media_library.remove(owner_type, owner_id, kind, item_id)
+    if not removed:
+        # Only a miss pays for telling a missing owner from a missing entry
+        collection = db.players if owner_type == "player" else db.clubs
+        if not await collection.find_one({"id": owner_id}, EXISTS_PROJECTION):
+            raise HTTPException(status_code=404, detail=f"{owner_type.capitalize()} not found")
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    await invalidate_profile(owner_type, owner_id)
+    file_deleter.submit(media_item_paths(directory, removed))
+
+async def list_media(owner_type: str, owner_id: str, kind: str, limit: int, cursor: Optional[str], list_format: ListFormat):
+    """Newest-first page of an owner's photos, videos or gallery images"""
+    collection = db.players if owner_type == "player" else db.clubs
+    if not await collection.find_one({"id": owner_id}, EXISTS_PROJECTION):
+        raise HTTPException(status_code=404, detail=f"{owner_type.capitalize()} not found")
+    return await paginated_list(
+        db.media, media_query(owner_type, owner_id, kind), PROJECTIONS["media"]["item"], MediaItem,
+        "uploaded_at", limit, cursor, list_format
+    )
+
+@api_router.get("/players/{player_id}/photos", response_model=List[MediaItem])
+async def list_photos(player_id: str, limit: int = 50, cursor: Optional[str] = None, format: ListFormat = ListFormat.json):
+    return await list_media("player", player_id, "photos", limit, cursor, format)
+
+@api_router.get("/players/{player_id}/videos", response_model=List[MediaItem])
+async def list_videos(player_id: str, limit: int = 50, cursor: Optional[str] = None, format: ListFormat = ListFormat.json):
+    return await list_media("player", player_id, "videos", limit, cursor, format)
+
 @api_router.delete("/players/{player_id}/photos/{photo_id}")
 async def delete_photo(player_id: str, photo_id: str):
-    player = await db.players.find_one({"id": player_id})
-    if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
-    
-    # Find and remove photo
-    photo_to_remove = None
-    for photo in player.get("photos", []):
-        if photo["id"] == photo_id:
-            photo_to_remove = photo
-            break
-    
-    if not photo_to_remove:
-        raise HTTPException(status_code=404, detail="Photo not found")
-    
-    # Remove file from filesystem
-    file_path = UPLOAD_DIR / "photos" / photo_to_remove["filename"]
-    if file_path.exists():
-        file_path.unlink()
-    
-    # Remove from database
-    await db.players.update_one(
-        {"id": player_id}, 
-        {"$pull": {"photos": {"id": photo_id}}, "$set": {"updated_at": datetime.utcnow()}}
-    )
-    
+    await remove_media_item("player", player_id, "photos", "photos", photo_id, "Photo")
     return {"message": "Photo deleted successfully"}
 
 @api_router.delete("/players/{player_id}/videos/{video_id}")
 async def delete_video(player_id: str, video_id: str):
-    player = await db.players.find_one({"id": player_id})
-    if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
-    
-    # Find and remove video
-    video_to_remove = None
-    for video in player.get("videos", []):
-        if video["id"] == video_id:
-            video_to_remove = video
-            break
-    
-    if not video_to_remove:
-        raise HTTPException(status_code=404, detail="Video not found")
-    
-    # Remove file from filesystem
-    file_path = UPLOAD_DIR / "videos" / video_to_remove["filename"]
-    if file_path.exists():
-        file_path.unlink()
-    
-    # Remove from database
-    await db.players.update_one(
-        {"id": player_id}, 
-        {"$pull": {"videos": {"id": video_id}}, "$set": {"updated_at": datetime.utcnow()}}
-    )
-    
+    await remove_media_item("player", player_id, "videos", "videos", video_id, "Video")
     return {"message": "Video deleted successfully"}
 
 @api_router.post("/clubs")
 async def create_club(club: ClubCreate):
     # Check if email already exists
-    existing_club = await db.clubs.find_one({"email": club.email})
+    existing_club = await db.clubs.find_one({"email": club.email}, EXISTS_PROJECTION)
     if existing_club:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password
     password_hash = get_password_hash(club.password)
     
-    # Generate verification token
-    verification_token = str(uuid.uuid4())
-    verification_expires = datetime.utcnow() + timedelta(hours=24)
-    
     # Create club data
-    club_dict = club.dict()
-    club_dict.pop("password")  # Remove plain password
-    club_dict["password_hash"] = password_hash
-    club_dict["gallery_images"] = []
-    club_dict["videos"] = []
-    club_dict["social_media"] = {}
-    club_dict["is_verified"] = False
-    club_dict["verification_token"] = verification_token
-    club_dict["verification_token_expires"] = verification_expires
-    
-    club_obj = Club(**{k: v for k, v in club_dict.items() if k != "password_hash"})
+    club_obj = build_club(club)
     
     # Save to database with password hash
     await db.clubs.insert_one({**club_obj.dict(), "password_hash": password_hash})
     
+    # Generate verification token
+    verification_token = await issue_auth_token("email_verification", club_obj.id, "club", VERIFICATION_TOKEN_TTL)
+    
     # Send verification email
     email_sent = send_verification_email(club.email, verification_token, "club", club.name)
     
@@ -770,215 +1441,486 @@ async def create_club(club: ClubCreate):
     
     return {"message": "Account created successfully! Please check your email to verify your account."}
 
-@api_router.get("/clubs", response_model=List[Club])
-async def get_clubs():
-    clubs = await db.clubs.find().to_list(1000)
-    # Remove password_hash from all clubs
-    for club in clubs:
-        club.pop("password_hash", None)
-    return [Club(**club) for club in clubs]
+@api_router.get("/clubs", response_model=Union[List[Club], List[ClubCard]])
+async def get_clubs(
+    view: ResponseView = ResponseView.full,
+    ids: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: ListFormat = ListFormat.json
+):
+    """All clubs, or with `ids` (comma-separated) only those clubs"""
+    if view == ResponseView.card:
+        model, projection = ClubCard, PROJECTIONS["club"]["card"]
+    else:
+        model, projection = Club, PROJECTIONS["club"]["owner"]
+    
+    filter_query = {}
+    if ids:
+        filter_query["id"] = {"$in": [club_id.strip() for club_id in ids.split(",") if club_id.strip()]}
+    return await paginated_list(db.clubs, filter_query, projection, model, "created_at", limit, cursor, format)
 
 @api_router.get("/clubs/{club_id}", response_model=Club)
 async def get_club(club_id: str):
-    club = await db.clubs.find_one({"id": club_id})
+    club = await read_profile("club", "owner", club_id)
     if not club:
         raise HTTPException(status_code=404, detail="Club not found")
-    club.pop("password_hash", None)
     return Club(**club)
 
 @api_router.put("/clubs/{club_id}", response_model=Club)
-async def update_club(club_id: str, club_update: ClubUpdate):
-    club = await db.clubs.find_one({"id": club_id})
-    if not club:
-        raise HTTPException(status_code=404, detail="Club not found")
-    
+async def update_club(club_id: str, club_update: ClubUpdate, response: Response,
+                      if_match: Optional[str] = Header(None)):
     # Update only provided fields
     update_data = {k: v for k, v in club_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
+    if "location" in update_data:
+        update_data["geo"] = locate(update_data["location"])
     
-    await db.clubs.update_one({"id": club_id}, {"$set": update_data})
-    
-    # Return updated club
-    updated_club = await db.clubs.find_one({"id": club_id})
-    updated_club.pop("password_hash", None)
+    updated_club = await update_versioned(
+        db.clubs, club_id, parse_if_match(if_match), update_data,
+        PROJECTIONS["club"]["owner"], "Club"
+    )
+    await invalidate_profile("club", club_id)
+    response.headers["ETag"] = version_etag(updated_club)
     return Club(**updated_club)
 
+@api_router.delete("/clubs/{club_id}")
+async def delete_club(club_id: str, session: SessionUser = Depends(get_current_session)):
+    """
+    Delete the signed-in club's account now; vacancies with their
+    applications, conversations, messages, digests and uploaded files are
+    removed in the background. Track it with GET /deletions/{deletion_id}.
+    """
+    require_account_owner(session, "club", club_id)
+    return await start_deletion("club", club_id, "Club")
+
+@api_router.get("/deletions/{deletion_id}", response_model=DeletionStatus)
+async def get_deletion(deletion_id: str):
+    """Progress of a player, club or vacancy deletion"""
+    deletion = await deletion_engine.get(deletion_id)
+    if not deletion:
+        raise HTTPException(status_code=404, detail="Deletion not found")
+    return DeletionStatus(**deletion)
+
+@api_router.get("/transcode-jobs/{job_id}", response_model=TranscodeJob)
+async def get_transcode_job(job_id: str):
+    """Status of a video's transcode; the job id is on the video's transcode_job_id"""
+    job = await transcoder.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Transcode job not found")
+    return TranscodeJob(**job)
+
 # Club file upload routes
 @api_router.post("/clubs/{club_id}/logo")
 async def upload_club_logo(club_id: str, file: UploadFile = File(...)):
-    club = await db.clubs.find_one({"id": club_id})
+    club = await db.clubs.find_one({"id": club_id}, EXISTS_PROJECTION)
     if not club:
         raise HTTPException(status_code=404, detail="Club not found")
     
     # Save file
-    filename = save_uploaded_file(file, "logos", MAX_AVATAR_SIZE, ALLOWED_IMAGE_TYPES)
+    filename, _, _ = await save_uploaded_file(file, "logos", MAX_AVATAR_SIZE, ALLOWED_IMAGE_TYPES)
     
     # Update club with new logo
     await db.clubs.update_one(
         {"id": club_id}, 
         {"$set": {"logo": filename, "updated_at": datetime.utcnow()}}
     )
+    await invalidate_profile("club", club_id)
     
     return {"filename": filename, "message": "Logo uploaded successfully"}
 
 @api_router.post("/clubs/{club_id}/gallery")
 async def upload_club_gallery_image(club_id: str, file: UploadFile = File(...)):
-    club = await db.clubs.find_one({"id": club_id})
+    club = await db.clubs.find_one({"id": club_id}, EXISTS_PROJECTION)
     if not club:
         raise HTTPException(status_code=404, detail="Club not found")
     
     # Save file
-    filename = save_uploaded_file(file, "club_gallery", MAX_PHOTO_SIZE, ALLOWED_IMAGE_TYPES)
-    
-    # Get file size
-    file.file.seek(0)
-    file_content = file.file.read()
-    file_size = len(file_content)
+    filename, file_size, content_type = await save_uploaded_file(file, "club_gallery", MAX_PHOTO_SIZE, ALLOWED_IMAGE_TYPES)
     
     # Create media file object
     media_file = MediaFile(
         filename=filename,
         original_name=file.filename,
-        file_type=file.content_type or "image/jpeg",
+        file_type=content_type,
         file_size=file_size
     )
     
     # Add to club's gallery
-    await db.clubs.update_one(
-        {"id": club_id}, 
-        {"$push": {"gallery_images": media_file.dict()}, "$set": {"updated_at": datetime.utcnow()}}
-    )
+    await media_library.add("club", club_id, "gallery_images", media_file.dict())
+    await invalidate_profile("club", club_id)
     
     return {"filename": filename, "message": "Gallery image uploaded successfully"}
 
 @api_router.post("/clubs/{club_id}/videos")
 async def upload_club_video(club_id: str, file: UploadFile = File(...)):
-    club = await db.clubs.find_one({"id": club_id})
+    club = await db.clubs.find_one({"id": club_id}, EXISTS_PROJECTION)
     if not club:
         raise HTTPException(status_code=404, detail="Club not found")
     
     # Save file
-    filename = save_uploaded_file(file, "club_videos", MAX_VIDEO_SIZE, ALLOWED_VIDEO_TYPES)
-    
-    # Determine file type based on extension
-    file_extension = Path(file.filename).suffix.lower()
-    if file_extension == '.mp4':
-        file_type = 'video/mp4'
-    elif file_extension == '.mov':
-        file_type = 'video/quicktime'
-    elif file_extension == '.avi':
-        file_type = 'video/x-msvideo'
-    else:
-        file_type = file.content_type or "video/mp4"
-    
-    # Get file size
-    file.file.seek(0)
-    file_content = file.file.read()
-    file_size = len(file_content)
+    filename, file_size, content_type = await save_uploaded_file(file, "club_videos", MAX_VIDEO_SIZE, ALLOWED_VIDEO_TYPES)
     
     # Create media file object
     media_file = MediaFile(
         filename=filename,
         original_name=file.filename,
-        file_type=file_type,
+        file_type=content_type,
         file_size=file_size
     )
     
     # Add to club's videos
-    await db.clubs.update_one(
-        {"id": club_id}, 
-        {"$push": {"videos": media_file.dict()}, "$set": {"updated_at": datetime.utcnow()}}
-    )
+    await media_library.add("club", club_id, "videos", media_file.dict())
+    await invalidate_profile("club", club_id)
+    await queue_transcode("club", club_id, "club_videos", media_file)
     
     return {"filename": filename, "message": "Video uploaded successfully"}
 
+@api_router.get("/clubs/{club_id}/gallery", response_model=List[MediaItem])
+async def list_club_gallery(club_id: str, limit: int = 50, cursor: Optional[str] = None, format: ListFormat = ListFormat.json):
+    return await list_media("club", club_id, "gallery_images", limit, cursor, format)
+
+@api_router.get("/clubs/{club_id}/videos", response_model=List[MediaItem])
+async def list_club_videos(club_id: str, limit: int = 50, cursor: Optional[str] = None, format: ListFormat = ListFormat.json):
+    return await list_media("club", club_id, "videos", limit, cursor, format)
+
 @api_router.delete("/clubs/{club_id}/gallery/{image_id}")
 async def delete_club_gallery_image(club_id: str, image_id: str):
-    club = await db.clubs.find_one({"id": club_id})
-    if not club:
-        raise HTTPException(status_code=404, detail="Club not found")
-    
-    # Find and remove image
-    image_to_remove = None
-    for image in club.get("gallery_images", []):
-        if image["id"] == image_id:
-            image_to_remove = image
-            break
-    
-    if not image_to_remove:
-        raise HTTPException(status_code=404, detail="Image not found")
-    
-    # Remove file from filesystem
-    file_path = UPLOAD_DIR / "club_gallery" / image_to_remove["filename"]
-    if file_path.exists():
-        file_path.unlink()
-    
-    # Remove from database
-    await db.clubs.update_one(
-        {"id": club_id}, 
-        {"$pull": {"gallery_images": {"id": image_id}}, "$set": {"updated_at": datetime.utcnow()}}
-    )
-    
+    await remove_media_item("club", club_id, "gallery_images", "club_gallery", image_id, "Image")
     return {"message": "Gallery image deleted successfully"}
 
 @api_router.delete("/clubs/{club_id}/videos/{video_id}")
 async def delete_club_video(club_id: str, video_id: str):
-    club = await db.clubs.find_one({"id": club_id})
-    if not club:
-        raise HTTPException(status_code=404, detail="Club not found")
-    
-    # Find and remove video
-    video_to_remove = None
-    for video in club.get("videos", []):
-        if video["id"] == video_id:
-            video_to_remove = video
-            break
-    
-    if not video_to_remove:
-        raise HTTPException(status_code=404, detail="Video not found")
-    
-    # Remove file from filesystem
-    file_path = UPLOAD_DIR / "club_videos" / video_to_remove["filename"]
-    if file_path.exists():
-        file_path.unlink()
-    
-    # Remove from database
-    await db.clubs.update_one(
-        {"id": club_id}, 
-        {"$pull": {"videos": {"id": video_id}}, "$set": {"updated_at": datetime.utcnow()}}
+    await remove_media_item("club", club_id, "videos", "club_videos", video_id, "Video")
+    return {"message": "Club video deleted successfully"}
+
+# Direct uploads and downloads
+# kind -> (owner type, storage directory, profile field, max size); list fields are media kinds
+UPLOAD_TARGETS = {
+    UploadKind.avatar: ("player", "avatars", "avatar", MAX_AVATAR_SIZE),
+    UploadKind.cv: ("player", "documents", "cv_document", MAX_DOCUMENT_SIZE),
+    UploadKind.photo: ("player", "photos", "photos", MAX_PHOTO_SIZE),
+    UploadKind.video: ("player", "videos", "videos", MAX_VIDEO_SIZE),
+    UploadKind.logo: ("club", "logos", "logo", MAX_AVATAR_SIZE),
+    UploadKind.gallery_image: ("club", "club_gallery", "gallery_images", MAX_PHOTO_SIZE),
+    UploadKind.club_video: ("club", "club_videos", "videos", MAX_VIDEO_SIZE)
+}
+MEDIA_LIST_FIELDS = {"photos", "videos", "gallery_images"}
+VIDEO_KINDS = {UploadKind.video, UploadKind.club_video}
+PRESIGN_TTL = int(os.environ.get("PRESIGN_TTL_SECONDS", "900"))
+# An upload started just before its target expires still has this long to be completed
+UPLOAD_COMPLETE_GRACE = timedelta(hours=1)
+
+def create_upload_token(owner_id: str, kind: UploadKind, key: str) -> str:
+    """Signed claim that `key` was handed out for this owner and kind"""
+    payload = {
+        "sub": owner_id,
+        "type": "upload",
+        "kind": kind.value,
+        "key": key,
+        "exp": datetime.utcnow() + timedelta(seconds=PRESIGN_TTL) + UPLOAD_COMPLETE_GRACE
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def verify_upload_token(request: "CompleteUploadRequest") -> datetime:
+    """Check a completion against its presign step; returns when the token expires"""
+    try:
+        payload = jwt.decode(
+            request.upload_token,
+            JWT_SECRET,
+            algorithms=[JWT_ALGORITHM],
+            options={"require": ["exp", "sub"]}
+        )
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=403, detail="Invalid or expired upload token")
+    if (payload.get("type"), payload["sub"], payload.get("kind"), payload.get("key")) != (
+        "upload", request.owner_id, request.kind.value, request.key
+    ):
+        raise HTTPException(status_code=403, detail="Upload token does not match this upload")
+    return datetime.utcfromtimestamp(payload["exp"])
+
+async def attach_upload(kind: UploadKind, owner_id: str, media_file: MediaFile) -> bool:
+    """Record a stored upload on its owner's profile; False if the owner does not exist"""
+    owner_type, _, field, _ = UPLOAD_TARGETS[kind]
+    if field in MEDIA_LIST_FIELDS:
+        attached = await media_library.add(owner_type, owner_id, field, media_file.dict())
+    else:
+        collection = db.players if owner_type == "player" else db.clubs
+        result = await collection.update_one(
+            {"id": owner_id}, {"$set": {field: media_file.filename, "updated_at": datetime.utcnow()}}
+        )
+        attached = result.matched_count > 0
+    await invalidate_profile(owner_type, owner_id)
+    return attached
+
+@api_router.post("/uploads/presign", response_model=PresignedUpload)
+async def presign_upload(request: PresignUploadRequest):
+    """
+    Upload target for sending a file straight to storage, bypassing the API.
+    Register the file with POST /uploads/complete once it is uploaded.
+    """
+    owner_type, directory, _, max_size = UPLOAD_TARGETS[request.kind]
+    collection = db.players if owner_type == "player" else db.clubs
+    if not await collection.find_one({"id": request.owner_id}, EXISTS_PROJECTION):
+        raise HTTPException(status_code=404, detail=f"{owner_type.capitalize()} not found")
+    if request.size > max_size:
+        raise file_too_large(max_size)
+    
+    key = f"{directory}/{uuid.uuid4()}{upload_extension(directory, request.filename)}"
+    target = storage.presigned_upload(key, request.content_type, max_size, expires_in=PRESIGN_TTL)
+    return PresignedUpload(
+        key=key,
+        expires_in=PRESIGN_TTL,
+        upload_token=create_upload_token(request.owner_id, request.kind, key),
+        **target
     )
+
+@api_router.post("/uploads/complete")
+async def complete_upload(request: CompleteUploadRequest):
+    """Register a file uploaded through a presigned target on its owner's profile"""
+    token_expires_at = verify_upload_token(request)
+    owner_type, directory, _, max_size = UPLOAD_TARGETS[request.kind]
+    key_directory, _, filename = request.key.partition("/")
+    if key_directory != directory or "/" in filename:
+        raise HTTPException(status_code=400, detail="Upload key does not match the upload kind")
+    upload_extension(directory, filename)
+    
+    file_size = await asyncio.to_thread(storage.size, request.key)
+    if file_size is None:
+        raise HTTPException(status_code=400, detail="Upload not found, send the file before completing it")
+    if file_size > max_size:
+        await asyncio.to_thread(storage.delete, request.key)
+        raise file_too_large(max_size)
+    # Object storage takes whatever the client sends, so the content is checked here
+    allowed_types = UPLOAD_CONTENT_TYPES[directory]
+    content_type = validate_file_type(await asyncio.to_thread(storage.read_head, request.key, SNIFF_BYTES), allowed_types)
+    if not content_type:
+        await asyncio.to_thread(storage.delete, request.key)
+        raise invalid_content(allowed_types)
+    # Each key is attached once; the record only needs to outlive the token
+    try:
+        await db.completed_uploads.insert_one({"key": request.key, "expires_at": token_expires_at})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Upload has already been completed")
     
-    return {"message": "Club video deleted successfully"}
+    media_file = MediaFile(
+        filename=filename,
+        original_name=request.original_name,
+        file_type=content_type,
+        file_size=file_size
+    )
+    if not await attach_upload(request.kind, request.owner_id, media_file):
+        await asyncio.to_thread(storage.delete, request.key)
+        raise HTTPException(status_code=404, detail=f"{owner_type.capitalize()} not found")
+    if request.kind in VIDEO_KINDS:
+        await queue_transcode(owner_type, request.owner_id, directory, media_file)
+    
+    return {"filename": filename, "message": "Upload completed successfully"}
+
+@api_router.put("/storage/{key:path}")
+async def put_storage_object(key: str, request: Request, expires: int, max_size: int, signature: str):
+    """Receive a presigned direct upload when files are stored locally"""
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not found")
+    content_type = request.headers.get("content-type", "")
+    if not storage.verify_upload(key, expires, max_size, content_type, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired upload signature")
+    
+    allowed_types = UPLOAD_CONTENT_TYPES.get(key.partition("/")[0], set())
+    
+    # Spooled to a temporary file, then streamed into place like any other upload
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as body:
+        received = 0
+        head = b""
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_size:
+                raise file_too_large(max_size)
+            if head is not None:
+                # Rejected as soon as the head is in, not after the whole body
+                head += chunk
+                if len(head) >= SNIFF_BYTES:
+                    if not validate_file_type(head, allowed_types):
+                        raise invalid_content(allowed_types)
+                    head = None
+            body.write(chunk)
+        if head is not None and not validate_file_type(head, allowed_types):
+            raise invalid_content(allowed_types)
+        body.seek(0)
+        file_size = await asyncio.to_thread(storage.save, key, body, content_type, max_size)
+    
+    return {"key": key, "size": file_size}
+
+# Resumable uploads: large videos sent as hash-checked chunks
+def upload_session_status(session: dict) -> ResumableUpload:
+    return ResumableUpload(
+        received=sorted(int(index) for index in session["chunks"]),
+        missing=resumable_uploads.missing_chunks(session),
+        **session
+    )
+
+async def get_upload_session(upload_id: str) -> dict:
+    session = await resumable_uploads.get(upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+    return session
+
+@api_router.post("/uploads/resumable", response_model=ResumableUpload)
+async def create_resumable_upload(request: ResumableUploadRequest):
+    """
+    Start a chunked upload. PUT each chunk to /uploads/resumable/{id}/chunks/{index}
+    with its SHA-256 in the Chunk-SHA256 header; after a dropped connection,
+    GET the upload to see which chunks are missing and send only those.
+    """
+    if request.kind not in VIDEO_KINDS:
+        raise HTTPException(status_code=400, detail="Resumable uploads are only available for videos")
+    owner_type, directory, _, max_size = UPLOAD_TARGETS[request.kind]
+    collection = db.players if owner_type == "player" else db.clubs
+    if not await collection.find_one({"id": request.owner_id}, EXISTS_PROJECTION):
+        raise HTTPException(status_code=404, detail=f"{owner_type.capitalize()} not found")
+    if request.size > max_size:
+        raise file_too_large(max_size)
+    if request.size <= 0:
+        raise HTTPException(status_code=400, detail="File is empty")
+    
+    key = f"{directory}/{uuid.uuid4()}{upload_extension(directory, request.filename)}"
+    session = await resumable_uploads.create(
+        owner_type, request.owner_id, request.kind.value, key, request.filename,
+        request.content_type, request.size, chunk_size=request.chunk_size
+    )
+    return upload_session_status(session)
+
+@api_router.get("/uploads/resumable/{upload_id}", response_model=ResumableUpload)
+async def get_resumable_upload(upload_id: str):
+    return upload_session_status(await get_upload_session(upload_id))
+
+@api_router.put("/uploads/resumable/{upload_id}/chunks/{index}")
+async def put_upload_chunk(upload_id: str, index: int, request: Request, chunk_sha256: str = Header(...)):
+    """Receive one chunk; it is kept only if its size and SHA-256 match"""
+    session = await get_upload_session(upload_id)
+    try:
+        receipt = await resumable_uploads.write_chunk(
+            session, index, request.stream(), chunk_sha256,
+            validate_head=lambda head: validate_file_type(head, ALLOWED_VIDEO_TYPES) is not None
+        )
+    except ChunkRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SessionClosed as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"index": index, **receipt}
+
+@api_router.post("/uploads/resumable/{upload_id}/complete")
+async def complete_resumable_upload(upload_id: str, sha256: Optional[str] = None):
+    """Assemble the chunks into storage and add the video to its owner's profile"""
+    session = await get_upload_session(upload_id)
+    if session["status"] == "completed":
+        raise HTTPException(status_code=409, detail="Upload is already complete")
+    missing = resumable_uploads.missing_chunks(session)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"{len(missing)} chunks missing, first is {missing[0]}")
+    try:
+        await resumable_uploads.begin_assembly(session)
+    except SessionClosed as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    kind = UploadKind(session["kind"])
+    owner_type, directory, _, max_size = UPLOAD_TARGETS[kind]
+    allowed_types = UPLOAD_CONTENT_TYPES[directory]
+    reader = resumable_uploads.reader(session)
+    try:
+        # Stored with the type sniffed from the first chunk, not the one the client declared
+        head = await asyncio.to_thread(read_head, reader)
+        content_type = validate_file_type(head, allowed_types)
+        if not content_type:
+            raise invalid_content(allowed_types)
+        file_size = await asyncio.to_thread(storage.save, session["key"], PrefixedReader(head, reader), content_type, max_size)
+    except BaseException:
+        await resumable_uploads.reopen(session)
+        raise
+    finally:
+        reader.close()
+    
+    file_sha256 = reader.sha256.hexdigest()
+    if sha256 and sha256.strip().lower() != file_sha256:
+        # Every chunk matched its own hash, so the client hashed different bytes; let it resend
+        await asyncio.to_thread(storage.delete, session["key"])
+        await resumable_uploads.reopen(session)
+        raise HTTPException(status_code=400, detail="Assembled file does not match its SHA-256 checksum")
+    
+    filename = session["key"].partition("/")[2]
+    media_file = MediaFile(
+        filename=filename,
+        original_name=session["original_name"],
+        file_type=content_type,
+        file_size=file_size
+    )
+    if not await attach_upload(kind, session["owner_id"], media_file):
+        await asyncio.to_thread(storage.delete, session["key"])
+        await resumable_uploads.abort(session)
+        raise HTTPException(status_code=404, detail=f"{owner_type.capitalize()} not found")
+    await resumable_uploads.finish(session, file_sha256)
+    await queue_transcode(owner_type, session["owner_id"], directory, media_file)
+    
+    return {"filename": filename, "sha256": file_sha256, "message": "Video uploaded successfully"}
+
+@api_router.delete("/uploads/resumable/{upload_id}")
+async def abort_resumable_upload(upload_id: str):
+    session = await get_upload_session(upload_id)
+    if session["status"] != "open":
+        raise HTTPException(status_code=409, detail="Upload is already being completed")
+    await resumable_uploads.abort(session)
+    return {"message": "Upload aborted"}
+
+# After the resumable routes, which share its path shape
+@api_router.get("/uploads/{directory}/{filename}")
+async def get_upload(directory: str, filename: str):
+    """Uploaded file, or a redirect to a presigned URL when uploads live in object storage"""
+    if directory not in UPLOAD_EXTENSIONS:
+        raise HTTPException(status_code=404, detail="File not found")
+    key = f"{directory}/{filename}"
+    
+    url = storage.download_url(key, expires_in=PRESIGN_TTL)
+    if url:
+        return RedirectResponse(url, status_code=307)
+    try:
+        path = storage.path(key)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(path)
 
 # Vacancy routes
 @api_router.post("/vacancies", response_model=Vacancy)
 async def create_vacancy(vacancy: VacancyCreate):
     # Get club information
-    club = await db.clubs.find_one({"id": vacancy.club_id})
+    club = await db.clubs.find_one({"id": vacancy.club_id}, {"_id": 0, "name": 1, "club_type": 1})
     if not club:
         raise HTTPException(status_code=404, detail="Club not found")
     
-    vacancy_dict = vacancy.dict()
-    vacancy_dict["club_name"] = club["name"]
-    
-    # Set published_at if status is active
-    if vacancy_dict.get("status") == "active":
-        vacancy_dict["published_at"] = datetime.utcnow()
-    
-    vacancy_obj = Vacancy(**vacancy_dict)
+    vacancy_obj = build_vacancy(vacancy, vacancy.club_id, club["name"])
     await db.vacancies.insert_one(vacancy_obj.dict())
+    match_index.upsert_vacancy(vacancy_obj.dict(), club.get("club_type"))
     return vacancy_obj
 
-@api_router.get("/vacancies", response_model=List[Vacancy])
+@api_router.get("/vacancies", response_model=Union[List[Vacancy], List[VacancyCard]])
 async def get_vacancies(
     status: Optional[str] = None,
     position: Optional[str] = None,
     experience_level: Optional[str] = None,
     location: Optional[str] = None,
-    limit: int = 100
+    near: Optional[str] = None,
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
+    radius_km: Optional[float] = None,
+    limit: int = 100,
+    view: ResponseView = ResponseView.full
 ):
     # Build filter query
     filter_query = {}
+    geo = near_filter(near, lat, lng, radius_km)
+    if geo:
+        filter_query["geo"] = geo
     if status:
         filter_query["status"] = status
     if position:
@@ -992,7 +1934,11 @@ async def get_vacancies(
     if not status:
         filter_query["status"] = "active"
     
-    vacancies = await db.vacancies.find(filter_query).sort("created_at", -1).limit(limit).to_list(limit)
+    cursor = db.vacancies.find(filter_query, PROJECTIONS["vacancy"][view.value])
+    if not geo:
+        # $nearSphere already returns nearest first
+        cursor = cursor.sort("created_at", -1)
+    vacancies = await cursor.limit(limit).to_list(limit)
     
     # Increment view count for active vacancies
     for vacancy in vacancies:
@@ -1002,55 +1948,52 @@ async def get_vacancies(
                 {"$inc": {"views_count": 1}}
             )
     
-    return [Vacancy(**vacancy) for vacancy in vacancies]
+    if view == ResponseView.card:
+        return FastJSONResponse(trusted_rows(VacancyCard, vacancies))
+    return FastJSONResponse(trusted_rows(Vacancy, vacancies))
 
 @api_router.get("/vacancies/{vacancy_id}", response_model=Vacancy)
-async def get_vacancy(vacancy_id: str):
-    vacancy = await db.vacancies.find_one({"id": vacancy_id})
+async def get_vacancy(vacancy_id: str, request: Request):
+    vacancy = await db.vacancies.find_one({"id": vacancy_id}, PROJECTIONS["vacancy"]["full"])
     if not vacancy:
         raise HTTPException(status_code=404, detail="Vacancy not found")
     
-    # Increment view count
+    # Increment view count; a revalidation answered with 304 is a view too
     await db.vacancies.update_one(
         {"id": vacancy_id}, 
         {"$inc": {"views_count": 1}}
     )
     
-    return Vacancy(**vacancy)
+    return conditional_json(request, "vacancy", [vacancy], lambda: trusted_rows(Vacancy, [vacancy])[0],
+                            etag=version_etag(vacancy))
 
 @api_router.put("/vacancies/{vacancy_id}", response_model=Vacancy)
-async def update_vacancy(vacancy_id: str, vacancy_update: VacancyUpdate):
-    vacancy = await db.vacancies.find_one({"id": vacancy_id})
-    if not vacancy:
-        raise HTTPException(status_code=404, detail="Vacancy not found")
-    
+async def update_vacancy(vacancy_id: str, vacancy_update: VacancyUpdate, response: Response,
+                         if_match: Optional[str] = Header(None)):
     # Update only provided fields
     update_data = {k: v for k, v in vacancy_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
+    if "location" in update_data:
+        update_data["geo"] = locate(update_data["location"])
     
     # Set published_at if status changes to active
-    if update_data.get("status") == "active" and vacancy.get("status") != "active":
-        update_data["published_at"] = datetime.utcnow()
+    publish = None
+    if update_data.get("status") == "active":
+        publish = ({"status": {"$ne": "active"}}, {"published_at": update_data["updated_at"]})
     
-    await db.vacancies.update_one({"id": vacancy_id}, {"$set": update_data})
-    
-    # Return updated vacancy
-    updated_vacancy = await db.vacancies.find_one({"id": vacancy_id})
+    updated_vacancy = await update_versioned(
+        db.vacancies, vacancy_id, parse_if_match(if_match), update_data,
+        PROJECTIONS["vacancy"]["full"], "Vacancy", first_transition=publish
+    )
+    club = await db.clubs.find_one({"id": updated_vacancy["club_id"]}, {"_id": 0, "club_type": 1})
+    match_index.upsert_vacancy(updated_vacancy, (club or {}).get("club_type"))
+    response.headers["ETag"] = version_etag(updated_vacancy)
     return Vacancy(**updated_vacancy)
 
 @api_router.delete("/vacancies/{vacancy_id}")
-async def delete_vacancy(vacancy_id: str):
-    vacancy = await db.vacancies.find_one({"id": vacancy_id})
-    if not vacancy:
-        raise HTTPException(status_code=404, detail="Vacancy not found")
-    
-    # Delete all applications for this vacancy
-    await db.applications.delete_many({"vacancy_id": vacancy_id})
-    
-    # Delete the vacancy
-    await db.vacancies.delete_one({"id": vacancy_id})
-    
-    return {"message": "Vacancy deleted successfully"}
+async def delete_vacancy(vacancy_id: str):
+    """Delete a vacancy now; its applications are removed in the background"""
+    return await start_deletion("vacancy", vacancy_id, "Vacancy")
 
 @api_router.get("/clubs/{club_id}/vacancies", response_model=List[Vacancy])
 async def get_club_vacancies(
@@ -1063,7 +2006,7 @@ async def get_club_vacancies(
         filter_query["status"] = status
     
     vacancies = await db.vacancies.find(filter_query).sort("created_at", -1).limit(limit).to_list(limit)
-    return [Vacancy(**vacancy) for vacancy in vacancies]
+    return FastJSONResponse(trusted_rows(Vacancy, vacancies))
 
 @api_router.get("/clubs/{club_id}/analytics")
 async def get_club_analytics(club_id: str):
@@ -1072,8 +2015,7 @@ async def get_club_analytics(club_id: str):
     active_vacancies = await db.vacancies.count_documents({"club_id": club_id, "status": "active"})
     
     # Get application stats
-    club_vacancies = await db.vacancies.find({"club_id": club_id}).to_list(1000)
-    vacancy_ids = [v["id"] for v in club_vacancies]
+    vacancy_ids = await db.vacancies.distinct("id", {"club_id": club_id})
     
     total_applications = await db.applications.count_documents({"vacancy_id": {"$in": vacancy_ids}})
     pending_applications = await db.applications.count_documents({
@@ -1082,7 +2024,11 @@ async def get_club_analytics(club_id: str):
     })
     
     # Calculate total views
-    total_views = sum(vacancy.get("views_count", 0) for vacancy in club_vacancies)
+    views = await db.vacancies.aggregate([
+        {"$match": {"club_id": club_id}},
+        {"$group": {"_id": None, "total_views": {"$sum": "$views_count"}}}
+    ]).to_list(1)
+    total_views = views[0]["total_views"] if views else 0
     
     return {
         "total_vacancies": total_vacancies,
@@ -1093,11 +2039,334 @@ async def get_club_analytics(club_id: str):
         "avg_applications_per_vacancy": round(total_applications / max(total_vacancies, 1), 2)
     }
 
+# Recommendations
+async def hydrate_matches(collection, matches: List[tuple], projection: dict, remove) -> List[tuple]:
+    """Load documents for ranked (id, score) pairs, keeping rank order"""
+    if not matches:
+        return []
+    documents = {}
+    async for document in collection.find({"id": {"$in": [doc_id for doc_id, _ in matches]}}, projection):
+        documents[document["id"]] = document
+    hydrated = []
+    for doc_id, score in matches:
+        if doc_id in documents:
+            hydrated.append((documents[doc_id], score))
+        else:
+            # Deleted by another worker since the index last synced
+            remove(doc_id)
+    return hydrated
+
+@api_router.get("/players/{player_id}/recommended-vacancies", response_model=List[VacancyMatch])
+async def get_recommended_vacancies(player_id: str, limit: int = 10):
+    """Open vacancies that best match a player, excluding ones already applied to"""
+    limit = max(1, min(limit, MAX_RECOMMENDATIONS))
+    await match_index.ensure_fresh()
+    if player_id not in match_index.players.rows:
+        # Registered through another worker since the last sync
+        player = await db.players.find_one({"id": player_id}, MATCH_PLAYER_PROJECTION)
+        if not player:
+            raise HTTPException(status_code=404, detail="Player not found")
+        match_index.upsert_player(player)
+    
+    applied = await db.applications.distinct("vacancy_id", {"player_id": player_id})
+    matches = match_index.vacancies_for_player(player_id, limit, exclude=applied)
+    vacancies = await hydrate_matches(db.vacancies, matches, PROJECTIONS["vacancy"]["card"], match_index.remove_vacancy)
+    return FastJSONResponse([
+        {"score": score, "vacancy": VacancyCard.model_construct(**vacancy).__dict__}
+        for vacancy, score in vacancies
+    ])
+
+@api_router.get("/vacancies/{vacancy_id}/recommended-players", response_model=List[PlayerMatch])
+async def get_recommended_players_for_vacancy(vacancy_id: str, limit: int = 10):
+    """Verified players that best match a vacancy, excluding its applicants"""
+    limit = max(1, min(limit, MAX_RECOMMENDATIONS))
+    await match_index.ensure_fresh()
+    if vacancy_id not in match_index.vacancies.rows:
+        vacancy = await db.vacancies.find_one({"id": vacancy_id}, MATCH_VACANCY_PROJECTION)
+        if not vacancy:
+            raise HTTPException(status_code=404, detail="Vacancy not found")
+        club = await db.clubs.find_one({"id": vacancy["club_id"]}, {"_id": 0, "club_type": 1})
+        match_index.upsert_vacancy(vacancy, (club or {}).get("club_type"))
+    
+    applicants = await db.applications.distinct("player_id", {"vacancy_id": vacancy_id})
+    matches = match_index.players_for_vacancy(vacancy_id, limit, exclude=applicants) or []
+    players = await hydrate_matches(db.players, matches, PROJECTIONS["player"]["card"], match_index.remove_player)
+    return FastJSONResponse([
+        {"score": score, "player": PlayerCard.model_construct(**player).__dict__}
+        for player, score in players
+    ])
+
+@api_router.get("/clubs/{club_id}/recommended-players", response_model=List[PlayerMatch])
+async def get_recommended_players_for_club(club_id: str, limit: int = 10):
+    """Verified players that best match any of a club's open vacancies, excluding its applicants"""
+    limit = max(1, min(limit, MAX_RECOMMENDATIONS))
+    club = await db.clubs.find_one({"id": club_id}, EXISTS_PROJECTION)
+    if not club:
+        raise HTTPException(status_code=404, detail="Club not found")
+    await match_index.ensure_fresh()
+    
+    vacancy_ids = await db.vacancies.distinct("id", {"club_id": club_id})
+    applicants = await db.applications.distinct("player_id", {"vacancy_id": {"$in": vacancy_ids}})
+    matches = match_index.players_for_club(club_id, limit, exclude=applicants)
+    players = await hydrate_matches(db.players, matches, PROJECTIONS["player"]["card"], match_index.remove_player)
+    return FastJSONResponse([
+        {"score": score, "player": PlayerCard.model_construct(**player).__dict__}
+        for player, score in players
+    ])
+
+@api_router.get("/players/{player_id}/digest", response_model=PlayerDigest)
+async def get_player_digest(player_id: str):
+    """Latest precomputed digest of new vacancies for a player"""
+    digest = await db.recommendations.find_one({"user_type": "player", "user_id": player_id}, {"_id": 0})
+    if not digest:
+        return PlayerDigest()
+    
+    matches = [(item["id"], item["score"]) for item in digest["items"]]
+    vacancies = await hydrate_matches(db.vacancies, matches, PROJECTIONS["vacancy"]["card"], match_index.remove_vacancy)
+    return FastJSONResponse({
+        "generated_at": digest["generated_at"],
+        "since": digest.get("since"),
+        "vacancies": [
+            {"score": score, "vacancy": VacancyCard.model_construct(**vacancy).__dict__}
+            for vacancy, score in vacancies
+        ]
+    })
+
+@api_router.get("/clubs/{club_id}/digest", response_model=ClubDigest)
+async def get_club_digest(club_id: str):
+    """Latest precomputed digest of new matching players for a club"""
+    digest = await db.recommendations.find_one({"user_type": "club", "user_id": club_id}, {"_id": 0})
+    if not digest:
+        return ClubDigest()
+    
+    matches = [(item["id"], item["score"]) for item in digest["items"]]
+    players = await hydrate_matches(db.players, matches, PROJECTIONS["player"]["card"], match_index.remove_player)
+    return FastJSONResponse({
+        "generated_at": digest["generated_at"],
+        "since": digest.get("since"),
+        "players": [
+            {"score": score, "player": PlayerCard.model_construct(**player).__dict__}
+            for player, score in players
+        ]
+    })
+
+# Bulk import
+IMPORT_MODELS = {
+    ImportKind.players: PlayerCreate,
+    ImportKind.clubs: ClubCreate,
+    ImportKind.vacancies: VacancyImport
+}
+
+# CSV columns holding ';'-separated lists
+IMPORT_LIST_FIELDS = {
+    ImportKind.vacancies: ("benefits",)
+}
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors())
+
+def parse_import_batch(kind: ImportKind, batches) -> Optional[tuple]:
+    """
+    Read and validate the next batch of records; blocking, run it on a worker thread
+    
+    Returns:
+        tuple: (records read, [(line, model)], [(line, error)]), or None when the file is exhausted
+    """
+    batch = next(batches, None)
+    if batch is None:
+        return None
+    entries, rejected = [], []
+    for line, record in batch:
+        if isinstance(record, Exception):
+            rejected.append((line, str(record)))
+            continue
+        try:
+            entries.append((line, IMPORT_MODELS[kind](**record)))
+        except ValidationError as e:
+            rejected.append((line, validation_message(e)))
+    return len(batch), entries, rejected
+
+async def import_records(kind: ImportKind, records, send_verification: bool = True) -> tuple:
+    """
+    Validate and insert parsed import records, one batch at a time
+    
+    Args:
+        kind: What the records describe
+        records: Iterable of (line_number, record) pairs, see bulk_import.iter_records
+        send_verification: Issue verification tokens for imported accounts
+    
+    Returns:
+        tuple: (ImportReport, verification emails to send as (email, token, user_type, name))
+    """
+    report = ImportReport(kind=kind.value)
+    recipients = []
+    seen_emails = set()
+    
+    def reject(line: int, error: str):
+        report.failed += 1
+        if len(report.errors) < MAX_IMPORT_ERRORS:
+            report.errors.append(ImportRecordError(line=line, error=error))
+    
+    # Decoding, parsing and validation are CPU work on a blocking file, kept off the event loop
+    batches = batched(records, IMPORT_BATCH_SIZE)
+    while True:
+        parsed = await asyncio.to_thread(parse_import_batch, kind, batches)
+        if parsed is None:
+            break
+        total, entries, rejected = parsed
+        report.total += total
+        for line, error in rejected:
+            reject(line, error)
+        if not entries:
+            continue
+        
+        if kind == ImportKind.vacancies:
+            report.inserted += await import_vacancy_batch(entries, reject)
+        else:
+            inserted, batch_recipients = await import_account_batch(kind, entries, seen_emails, reject, send_verification)
+            report.inserted += inserted
+            recipients.extend(batch_recipients)
+    
+    return report, recipients
+
+async def insert_import_batch(collection, documents: List[dict], entries: list, reject) -> List[int]:
+    """Insert a batch unordered and return the indexes that were written"""
+    try:
+        await collection.insert_many(documents, ordered=False)
+        return list(range(len(documents)))
+    except BulkWriteError as e:
+        failed = {}
+        for write_error in e.details.get("writeErrors", []):
+            failed[write_error["index"]] = write_error.get("errmsg", "Write failed")
+        for index, error in failed.items():
+            reject(entries[index][0], error)
+        return [index for index in range(len(documents)) if index not in failed]
+
+async def import_account_batch(kind: ImportKind, entries: list, seen_emails: set, reject, send_verification: bool) -> tuple:
+    user_type = "player" if kind == ImportKind.players else "club"
+    collection = db.players if kind == ImportKind.players else db.clubs
+    
+    candidates = []
+    for line, account in entries:
+        if account.email in seen_emails:
+            reject(line, "Duplicate email in import")
+            continue
+        seen_emails.add(account.email)
+        candidates.append((line, account))
+    if not candidates:
+        return 0, []
+    
+    # One lookup for the whole batch instead of one per record
+    registered = set(await collection.distinct("email", {"email": {"$in": [account.email for _, account in candidates]}}))
+    fresh = []
+    for line, account in candidates:
+        if account.email in registered:
+            reject(line, "Email already registered")
+        else:
+            fresh.append((line, account))
+    if not fresh:
+        return 0, []
+    
+    password_hashes = await hash_passwords([account.password for _, account in fresh])
+    build = build_player if kind == ImportKind.players else build_club
+    users = [build(account) for _, account in fresh]
+    documents = [{**user.dict(), "password_hash": password_hash} for user, password_hash in zip(users, password_hashes)]
+    
+    written = [users[index] for index in await insert_import_batch(collection, documents, fresh, reject)]
+    if kind == ImportKind.players:
+        for user in written:
+            match_index.upsert_player(user.dict())
+    if not written or not send_verification:
+        return len(written), []
+    
+    expires_at = datetime.utcnow() + VERIFICATION_TOKEN_TTL
+    auth_tokens = [
+        AuthToken(purpose="email_verification", user_id=user.id, user_type=user_type, expires_at=expires_at)
+        for user in written
+    ]
+    await db.auth_tokens.insert_many([auth_token.dict() for auth_token in auth_tokens])
+    recipients = [
+        (user.email, auth_token.token, user_type, user.name)
+        for user, auth_token in zip(written, auth_tokens)
+    ]
+    return len(written), recipients
+
+async def import_vacancy_batch(entries: list, reject) -> int:
+    club_ids = list({vacancy.club_id for _, vacancy in entries if vacancy.club_id})
+    club_emails = list({vacancy.club_email for _, vacancy in entries if vacancy.club_email})
+    clubs_by_id, clubs_by_email = {}, {}
+    async for club in db.clubs.find(
+        {"$or": [{"id": {"$in": club_ids}}, {"email": {"$in": club_emails}}]},
+        {"_id": 0, "id": 1, "email": 1, "name": 1, "club_type": 1}
+    ):
+        clubs_by_id[club["id"]] = club
+        clubs_by_email[club["email"]] = club
+    
+    resolved = []
+    for line, vacancy in entries:
+        club = clubs_by_id.get(vacancy.club_id) if vacancy.club_id else clubs_by_email.get(vacancy.club_email)
+        if not club:
+            reject(line, "Club not found" if vacancy.club_id or vacancy.club_email else "club_id or club_email is required")
+            continue
+        resolved.append((line, build_vacancy(vacancy, club["id"], club["name"])))
+    if not resolved:
+        return 0
+    
+    documents = [vacancy.dict() for _, vacancy in resolved]
+    written = await insert_import_batch(db.vacancies, documents, resolved, reject)
+    for index in written:
+        match_index.upsert_vacancy(documents[index], clubs_by_id[documents[index]["club_id"]].get("club_type"))
+    return len(written)
+
+def send_verification_emails(recipients: List[tuple]):
+    """Send queued verification emails, logging how many could not be sent"""
+    failed = 0
+    for email, token, user_type, name in recipients:
+        if not send_verification_email(email, token, user_type, name):
+            failed += 1
+    if failed:
+        logging.warning(f"Failed to send {failed} of {len(recipients)} verification emails")
+
+@api_router.post("/import/{kind}", response_model=ImportReport)
+async def bulk_import(
+    kind: ImportKind,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[ImportFormat] = None,
+    send_verification: bool = True,
+    x_import_key: Optional[str] = Header(None)
+):
+    """
+    Import players, clubs or vacancies from an NDJSON or CSV upload
+    
+    Requires the X-Import-Key header to match IMPORT_API_KEY. Invalid records
+    are reported by line and skipped, the rest are inserted. Verification
+    emails for imported accounts are sent after the response.
+    """
+    if not IMPORT_API_KEY or not secrets.compare_digest(x_import_key or "", IMPORT_API_KEY):
+        raise HTTPException(status_code=403, detail="Import not permitted")
+    
+    try:
+        file_format = detect_format(file.filename, format.value if format else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    records = iter_records(file.file, file_format, IMPORT_LIST_FIELDS.get(kind, ()))
+    try:
+        report, recipients = await import_records(kind, records, send_verification)
+    except (ValueError, csv.Error) as e:
+        # Unreadable file (bad encoding, broken CSV quoting); earlier batches stay imported
+        raise HTTPException(status_code=400, detail=f"Could not read import file: {str(e)}")
+    
+    if recipients:
+        background_tasks.add_task(send_verification_emails, recipients)
+    return report
+
 # Application routes
 @api_router.post("/applications", response_model=Application)
 async def create_application(application: ApplicationCreate):
     # Check if player exists
-    player = await db.players.find_one({"id": application.player_id})
+    player = await db.players.find_one({"id": application.player_id}, PROJECTIONS["player"]["application_snapshot"])
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
@@ -1110,7 +2379,7 @@ async def create_application(application: ApplicationCreate):
     existing_app = await db.applications.find_one({
         "player_id": application.player_id,
         "vacancy_id": application.vacancy_id
-    })
+    }, EXISTS_PROJECTION)
     if existing_app:
         raise HTTPException(status_code=400, detail="Already applied to this vacancy")
     
@@ -1153,7 +2422,7 @@ async def get_applications(
         filter_query["vacancy_id"] = vacancy_id
     
     applications = await db.applications.find(filter_query).sort("applied_at", -1).limit(limit).to_list(limit)
-    return [Application(**application) for application in applications]
+    return FastJSONResponse(trusted_rows(Application, applications))
 
 @api_router.get("/applications/{application_id}", response_model=Application)
 async def get_application(application_id: str):
@@ -1163,33 +2432,39 @@ async def get_application(application_id: str):
     return Application(**application)
 
 @api_router.put("/applications/{application_id}", response_model=Application)
-async def update_application(application_id: str, application_update: ApplicationUpdate):
-    application = await db.applications.find_one({"id": application_id})
-    if not application:
-        raise HTTPException(status_code=404, detail="Application not found")
-    
+async def update_application(application_id: str, application_update: ApplicationUpdate, response: Response,
+                             if_match: Optional[str] = Header(None)):
     # Update only provided fields
     update_data = {k: v for k, v in application_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
     
     # Set reviewed_at if status changes from pending
-    if update_data.get("status") and application.get("status") == "pending":
-        update_data["reviewed_at"] = datetime.utcnow()
+    review = None
+    if update_data.get("status"):
+        review = ({"status": "pending"}, {"reviewed_at": update_data["updated_at"]})
     
-    await db.applications.update_one({"id": application_id}, {"$set": update_data})
-    
-    # Return updated application
-    updated_application = await db.applications.find_one({"id": application_id})
+    updated_application = await update_versioned(
+        db.applications, application_id, parse_if_match(if_match), update_data,
+        DOCUMENT_PROJECTION, "Application", first_transition=review
+    )
+    response.headers["ETag"] = version_etag(updated_application)
     return Application(**updated_application)
 
 @api_router.get("/players/{player_id}/applications", response_model=List[Application])
-async def get_player_applications(player_id: str, status: Optional[str] = None):
+async def get_player_applications(
+    player_id: str,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: ListFormat = ListFormat.json
+):
     filter_query = {"player_id": player_id}
     if status:
         filter_query["status"] = status
     
-    applications = await db.applications.find(filter_query).sort("applied_at", -1).to_list(1000)
-    return [Application(**application) for application in applications]
+    return await paginated_list(
+        db.applications, filter_query, DOCUMENT_PROJECTION, Application, "applied_at", limit, cursor, format
+    )
 
 @api_router.get("/clubs/{club_id}/applications", response_model=List[Application])
 async def get_club_applications(
@@ -1197,15 +2472,16 @@ async def get_club_applications(
     status: Optional[str] = None,
     priority: Optional[str] = None,
     vacancy_id: Optional[str] = None,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    format: ListFormat = ListFormat.json
 ):
-    # Get all vacancies for this club
+    # Get all vacancy ids for this club
     filter_query = {"club_id": club_id}
     if vacancy_id:
         filter_query["id"] = vacancy_id
     
-    vacancies = await db.vacancies.find(filter_query).to_list(1000)
-    vacancy_ids = [vacancy["id"] for vacancy in vacancies]
+    vacancy_ids = await db.vacancies.distinct("id", filter_query)
     
     # Get all applications for these vacancies
     app_filter = {"vacancy_id": {"$in": vacancy_ids}}
@@ -1214,8 +2490,50 @@ async def get_club_applications(
     if priority:
         app_filter["priority"] = priority
     
-    applications = await db.applications.find(app_filter).sort("applied_at", -1).limit(limit).to_list(limit)
-    return [Application(**application) for application in applications]
+    return await paginated_list(
+        db.applications, app_filter, DOCUMENT_PROJECTION, Application, "applied_at", limit, cursor, format
+    )
+
+@api_router.get("/clubs/{club_id}/applications/export")
+async def export_club_applications(
+    club_id: str,
+    format: ExportFormat = ExportFormat.csv,
+    status: Optional[str] = None,
+    vacancy_id: Optional[str] = None
+):
+    """Export a club's applicants with player and vacancy details as CSV or XLSX"""
+    club = await db.clubs.find_one({"id": club_id}, EXISTS_PROJECTION)
+    if not club:
+        raise HTTPException(status_code=404, detail="Club not found")
+    
+    row_chunks = iter_applicant_chunks(db, club_id, status=status, vacancy_id=vacancy_id)
+    filename = f"applicants-{club_id}.{format.value}"
+    
+    if format == ExportFormat.csv:
+        return StreamingResponse(
+            csv_stream(row_chunks),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    
+    if importlib.util.find_spec("xlsxwriter") is None:
+        raise HTTPException(status_code=501, detail="XLSX export is not available on this server")
+    
+    # XLSX needs a finished workbook, so it is spooled to disk rather than held in memory
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        await write_xlsx(row_chunks, path)
+    except Exception:
+        os.unlink(path)
+        raise
+    
+    return FileResponse(
+        path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename=filename,
+        background=BackgroundTask(os.unlink, path)
+    )
 
 @api_router.post("/applications/{application_id}/shortlist")
 async def shortlist_application(application_id: str):
@@ -1231,7 +2549,7 @@ async def shortlist_application(application_id: str):
             "priority": "high",
             "updated_at": datetime.utcnow(),
             "reviewed_at": datetime.utcnow()
-        }}
+        }, "$inc": {"version": 1}}
     )
     
     return {"message": "Application shortlisted successfully"}
@@ -1250,81 +2568,33 @@ async def bulk_update_applications(
     
     result = await db.applications.update_many(
         {"id": {"$in": application_ids}},
-        {"$set": update_dict}
+        {"$set": update_dict, "$inc": {"version": 1}}
     )
     
     return {"message": f"Updated {result.modified_count} applications successfully"}
 
 # Public Profile endpoints
-@api_router.get("/public/players/{player_id}", response_model=PlayerProfile)
-async def get_public_player_profile(player_id: str):
-    """Get public player profile - accessible to everyone"""
-    player = await db.players.find_one({"id": player_id})
-    if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
-    
-    # Check if player profile is verified (only show verified public profiles)
-    if not player.get("is_verified", False):
-        raise HTTPException(status_code=404, detail="Player profile not available")
-    
-    # Remove MongoDB _id field and sensitive information completely
-    player.pop("_id", None)
-    sensitive_fields = ["password_hash", "verification_token", "verification_token_expires", "password_reset_token", "password_reset_expires"]
-    for field in sensitive_fields:
-        player.pop(field, None)
-    
-    return PlayerProfile(**player)
-
-@api_router.get("/public/clubs/{club_id}", response_model=ClubProfile)
-async def get_public_club_profile(club_id: str):
-    """Get public club profile - accessible to everyone"""
-    club = await db.clubs.find_one({"id": club_id})
-    if not club:
-        raise HTTPException(status_code=404, detail="Club not found")
-    
-    # Check if club profile is verified (only show verified public profiles)
-    if not club.get("is_verified", False):
-        raise HTTPException(status_code=404, detail="Club profile not available")
-    
-    # Remove MongoDB _id field and sensitive information completely
-    club.pop("_id", None)
-    sensitive_fields = ["password_hash", "verification_token", "verification_token_expires", "password_reset_token", "password_reset_expires"]
-    for field in sensitive_fields:
-        club.pop(field, None)
-    
-    return ClubProfile(**club)
-
-@api_router.get("/public/clubs/{club_id}/vacancies")
-async def get_public_club_vacancies(club_id: str):
-    """Get public vacancies for a club - accessible to everyone"""
-    # Verify club exists and is verified
-    club = await db.clubs.find_one({"id": club_id})
-    if not club or not club.get("is_verified", False):
-        raise HTTPException(status_code=404, detail="Club not found")
-    
-    # Get active vacancies for this club
-    vacancies = await db.vacancies.find({
-        "club_id": club_id,
-        "status": "active"
-    }).sort("created_at", -1).to_list(100)
-    
-    # Remove MongoDB _id field from each vacancy
-    for vacancy in vacancies:
-        vacancy.pop("_id", None)
-    
-    return vacancies
-
+# Browse routes are registered first so "browse" is not captured as a profile id
 @api_router.get("/public/players/browse")
 async def browse_public_players(
+    request: Request,
     position: Optional[str] = None,
     experience_level: Optional[str] = None,
     location: Optional[str] = None,
     country: Optional[str] = None,
+    near: Optional[str] = None,
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
+    radius_km: Optional[float] = None,
     limit: int = 20,
-    offset: int = 0
+    offset: int = 0,
+    view: ResponseView = ResponseView.full
 ):
-    """Browse public player profiles with filters"""
+    """Browse public player profiles with filters, optionally by distance"""
     filter_query = {"is_verified": True}
+    geo = near_filter(near, lat, lng, radius_km)
+    if geo:
+        filter_query["geo"] = geo
     
     if position:
         filter_query["position"] = position
@@ -1335,29 +2605,35 @@ async def browse_public_players(
     if country:
         filter_query["country"] = {"$regex": country, "$options": "i"}
     
-    players = await db.players.find(filter_query).sort("created_at", -1).skip(offset).limit(limit).to_list(limit)
-    
-    # Remove sensitive information from each player
-    public_players = []
-    for player in players:
-        player.pop("_id", None)
-        sensitive_fields = ["password_hash", "verification_token", "verification_token_expires", "password_reset_token", "password_reset_expires"]
-        for field in sensitive_fields:
-            player.pop(field, None)
-        public_players.append(PlayerProfile(**player))
+    # Cards carry updated_at only for the validators
+    projection = {**PROJECTIONS["player"]["card" if view == ResponseView.card else "public_profile"], "updated_at": 1}
+    cursor = db.players.find(filter_query, projection)
+    if not geo:
+        cursor = cursor.sort("created_at", -1)
+    players = await cursor.skip(offset).limit(limit).to_list(limit)
     
-    return public_players
+    model = PlayerCard if view == ResponseView.card else PlayerProfile
+    return conditional_json(request, "browse", players, lambda: trusted_rows(model, players), variant=view.value)
 
 @api_router.get("/public/clubs/browse")
 async def browse_public_clubs(
+    request: Request,
     location: Optional[str] = None,
     club_type: Optional[str] = None,
     league: Optional[str] = None,
+    near: Optional[str] = None,
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
+    radius_km: Optional[float] = None,
     limit: int = 20,
-    offset: int = 0
+    offset: int = 0,
+    view: ResponseView = ResponseView.full
 ):
-    """Browse public club profiles with filters"""
+    """Browse public club profiles with filters, optionally by distance"""
     filter_query = {"is_verified": True}
+    geo = near_filter(near, lat, lng, radius_km)
+    if geo:
+        filter_query["geo"] = geo
     
     if location:
         filter_query["location"] = {"$regex": location, "$options": "i"}
@@ -1366,18 +2642,57 @@ async def browse_public_clubs(
     if league:
         filter_query["league"] = {"$regex": league, "$options": "i"}
     
-    clubs = await db.clubs.find(filter_query).sort("created_at", -1).skip(offset).limit(limit).to_list(limit)
+    # Cards carry updated_at only for the validators
+    projection = {**PROJECTIONS["club"]["card" if view == ResponseView.card else "public_profile"], "updated_at": 1}
+    cursor = db.clubs.find(filter_query, projection)
+    if not geo:
+        cursor = cursor.sort("created_at", -1)
+    clubs = await cursor.skip(offset).limit(limit).to_list(limit)
     
-    # Remove sensitive information from each club
-    public_clubs = []
-    for club in clubs:
-        club.pop("_id", None)
-        sensitive_fields = ["password_hash", "verification_token", "verification_token_expires", "password_reset_token", "password_reset_expires"]
-        for field in sensitive_fields:
-            club.pop(field, None)
-        public_clubs.append(ClubProfile(**club))
+    model = ClubCard if view == ResponseView.card else ClubProfile
+    return conditional_json(request, "browse", clubs, lambda: trusted_rows(model, clubs), variant=view.value)
+
+@api_router.get("/public/players/{player_id}", response_model=PlayerProfile)
+async def get_public_player_profile(player_id: str, request: Request):
+    """Get public player profile - accessible to everyone"""
+    player = await read_profile("player", "public_profile", player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    
+    # Check if player profile is verified (only show verified public profiles)
+    if not player.get("is_verified", False):
+        raise HTTPException(status_code=404, detail="Player profile not available")
+    
+    return conditional_json(request, "public_profile", [player], lambda: PlayerProfile(**player).model_dump())
+
+@api_router.get("/public/clubs/{club_id}", response_model=ClubProfile)
+async def get_public_club_profile(club_id: str, request: Request):
+    """Get public club profile - accessible to everyone"""
+    club = await read_profile("club", "public_profile", club_id)
+    if not club:
+        raise HTTPException(status_code=404, detail="Club not found")
+    
+    # Check if club profile is verified (only show verified public profiles)
+    if not club.get("is_verified", False):
+        raise HTTPException(status_code=404, detail="Club profile not available")
+    
+    return conditional_json(request, "public_profile", [club], lambda: ClubProfile(**club).model_dump())
+
+@api_router.get("/public/clubs/{club_id}/vacancies")
+async def get_public_club_vacancies(club_id: str):
+    """Get public vacancies for a club - accessible to everyone"""
+    # Verify club exists and is verified
+    club = await db.clubs.find_one({"id": club_id}, {"_id": 0, "is_verified": 1})
+    if not club or not club.get("is_verified", False):
+        raise HTTPException(status_code=404, detail="Club not found")
+    
+    # Get active vacancies for this club
+    vacancies = await db.vacancies.find({
+        "club_id": club_id,
+        "status": "active"
+    }, DOCUMENT_PROJECTION).sort("created_at", -1).to_list(100)
     
-    return public_clubs
+    return vacancies
 
 @api_router.get("/public/stats")
 async def get_public_stats():
@@ -1406,34 +2721,20 @@ async def get_public_stats():
 @api_router.get("/players/{player_id}/profile", response_model=PlayerProfile)
 async def get_player_profile(player_id: str):
     """Get detailed player profile - accessible by clubs for reviewing applications"""
-    player = await db.players.find_one({"id": player_id})
+    player = await read_profile("player", "public_profile", player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    # Remove MongoDB _id field and sensitive information completely
-    player.pop("_id", None)
-    sensitive_fields = ["password_hash", "verification_token", "verification_token_expires", "password_reset_token", "password_reset_expires"]
-    for field in sensitive_fields:
-        player.pop(field, None)
-    
     return PlayerProfile(**player)
 
 @api_router.get("/clubs/{club_id}/profile", response_model=ClubProfile)
 async def get_club_profile(club_id: str):
     """Get detailed club profile - accessible by players for viewing club information"""
-    club = await db.clubs.find_one({"id": club_id})
+    club = await read_profile("club", "public_profile", club_id)
     if not club:
         raise HTTPException(status_code=404, detail="Club not found")
     
-    # Remove MongoDB _id field and sensitive information completely
-    club.pop("_id", None)
-    sensitive_fields = ["password_hash", "verification_token", "verification_token_expires", "password_reset_token", "password_reset_expires"]
-    for field in sensitive_fields:
-        club.pop(field, None)
-    
     return ClubProfile(**club)
-    
-    return Club(**club)
 
 @api_router.get("/clubs/{club_id}/applications-with-profiles")
 async def get_club_applications_with_profiles(
@@ -1462,30 +2763,20 @@ async def get_club_applications_with_profiles(
     if priority:
         app_filter["priority"] = priority
     
-    applications = await db.applications.find(app_filter).sort("applied_at", -1).limit(limit).to_list(limit)
+    applications = await db.applications.find(app_filter, DOCUMENT_PROJECTION).sort("applied_at", -1).limit(limit).to_list(limit)
     
     # Enrich applications with player profile data
     enriched_applications = []
     for app in applications:
-        # Remove MongoDB _id field from application
-        app.pop("_id", None)
-        
         # Get player profile
-        player = await db.players.find_one({"id": app["player_id"]})
+        player = await db.players.find_one({"id": app["player_id"]}, PROJECTIONS["player"]["public_profile"])
         if player:
-            # Remove MongoDB _id field and sensitive data completely
-            player.pop("_id", None)
-            sensitive_fields = ["password_hash", "verification_token", "verification_token_expires", "password_reset_token", "password_reset_expires"]
-            for field in sensitive_fields:
-                player.pop(field, None)
-            
             # Add player profile to application
             app["player_profile"] = player
         
         # Get vacancy details
-        vacancy = await db.vacancies.find_one({"id": app["vacancy_id"]})
+        vacancy = await db.vacancies.find_one({"id": app["vacancy_id"]}, DOCUMENT_PROJECTION)
         if vacancy:
-            vacancy.pop("_id", None)
             app["vacancy_details"] = vacancy
             
         enriched_applications.append(app)
@@ -1502,29 +2793,19 @@ async def get_player_applications_with_clubs(
     if status:
         filter_query["status"] = status
     
-    applications = await db.applications.find(filter_query).sort("applied_at", -1).to_list(1000)
+    applications = await db.applications.find(filter_query, DOCUMENT_PROJECTION).sort("applied_at", -1).to_list(1000)
     
     # Enrich applications with club profile data
     enriched_applications = []
     for app in applications:
-        # Remove MongoDB _id field from application
-        app.pop("_id", None)
-        
         # Get vacancy details
-        vacancy = await db.vacancies.find_one({"id": app["vacancy_id"]})
+        vacancy = await db.vacancies.find_one({"id": app["vacancy_id"]}, DOCUMENT_PROJECTION)
         if vacancy:
-            vacancy.pop("_id", None)
             app["vacancy_details"] = vacancy
             
             # Get club profile
-            club = await db.clubs.find_one({"id": vacancy["club_id"]})
+            club = await db.clubs.find_one({"id": vacancy["club_id"]}, PROJECTIONS["club"]["public_profile"])
             if club:
-                # Remove MongoDB _id field and sensitive data completely
-                club.pop("_id", None)
-                sensitive_fields = ["password_hash", "verification_token", "verification_token_expires", "password_reset_token", "password_reset_expires"]
-                for field in sensitive_fields:
-                    club.pop(field, None)
-                
                 # Add club profile to application
                 app["club_profile"] = club
             
@@ -1535,22 +2816,13 @@ async def get_player_applications_with_clubs(
 @api_router.get("/vacancies/{vacancy_id}/with-club-profile")
 async def get_vacancy_with_club_profile(vacancy_id: str):
     """Get vacancy details with full club profile information"""
-    vacancy = await db.vacancies.find_one({"id": vacancy_id})
+    vacancy = await db.vacancies.find_one({"id": vacancy_id}, DOCUMENT_PROJECTION)
     if not vacancy:
         raise HTTPException(status_code=404, detail="Vacancy not found")
     
-    # Remove MongoDB _id field
-    vacancy.pop("_id", None)
-    
     # Get club profile
-    club = await db.clubs.find_one({"id": vacancy["club_id"]})
+    club = await db.clubs.find_one({"id": vacancy["club_id"]}, PROJECTIONS["club"]["public_profile"])
     if club:
-        # Remove MongoDB _id field and sensitive data completely
-        club.pop("_id", None)
-        sensitive_fields = ["password_hash", "verification_token", "verification_token_expires", "password_reset_token", "password_reset_expires"]
-        for field in sensitive_fields:
-            club.pop(field, None)
-        
         vacancy["club_profile"] = club
     
     # Increment view count
@@ -1563,31 +2835,31 @@ async def get_vacancy_with_club_profile(vacancy_id: str):
 
 # Messaging endpoints
 @api_router.post("/messages/send")
-async def send_message(message_request: SendMessageRequest, sender_id: str, sender_type: str):
+async def send_message(
+    message_request: SendMessageRequest,
+    sender_id: Optional[str] = None,
+    sender_type: Optional[str] = None,
+    session: Optional[SessionUser] = Depends(get_optional_session)
+):
     """Send a message to another user"""
-    # Get sender information
-    if sender_type == "player":
-        sender = await db.players.find_one({"id": sender_id})
-        if not sender:
-            raise HTTPException(status_code=404, detail="Sender not found")
-        sender_name = sender["name"]
+    sender_id, sender_type = resolve_acting_user(session, sender_id, sender_type)
+    
+    # Get sender information, unless the session token already carries it
+    if session:
+        sender_name = session.name
     else:
-        sender = await db.clubs.find_one({"id": sender_id})
+        sender_collection = db.players if sender_type == "player" else db.clubs
+        sender = await sender_collection.find_one({"id": sender_id}, {"_id": 0, "name": 1})
         if not sender:
             raise HTTPException(status_code=404, detail="Sender not found")
         sender_name = sender["name"]
     
     # Get receiver information
-    if message_request.receiver_type == "player":
-        receiver = await db.players.find_one({"id": message_request.receiver_id})
-        if not receiver:
-            raise HTTPException(status_code=404, detail="Receiver not found")
-        receiver_name = receiver["name"]
-    else:
-        receiver = await db.clubs.find_one({"id": message_request.receiver_id})
-        if not receiver:
-            raise HTTPException(status_code=404, detail="Receiver not found")
-        receiver_name = receiver["name"]
+    receiver_collection = db.players if message_request.receiver_type == "player" else db.clubs
+    receiver = await receiver_collection.find_one({"id": message_request.receiver_id}, {"_id": 0, "name": 1})
+    if not receiver:
+        raise HTTPException(status_code=404, detail="Receiver not found")
+    receiver_name = receiver["name"]
     
     # Find or create conversation
     conversation = await find_or_create_conversation(
@@ -1617,19 +2889,124 @@ async def send_message(message_request: SendMessageRequest, sender_id: str, send
     
     return {"message": "Message sent successfully", "message_id": message.id}
 
+@api_router.post("/messages/bulk-send")
+async def bulk_send_message(
+    bulk_request: BulkMessageRequest,
+    sender_id: Optional[str] = None,
+    sender_type: Optional[str] = None,
+    session: Optional[SessionUser] = Depends(get_optional_session)
+):
+    """Send the same message to many users in a handful of round trips"""
+    sender_id, sender_type = resolve_acting_user(session, sender_id, sender_type)
+    if sender_type not in ["player", "club"] or bulk_request.receiver_type not in ["player", "club"]:
+        raise HTTPException(status_code=400, detail="Invalid user type")
+    
+    # Preserve request order while dropping duplicates
+    receiver_ids = list(dict.fromkeys(bulk_request.receiver_ids))
+    if not receiver_ids:
+        raise HTTPException(status_code=400, detail="No receiver IDs provided")
+    if len(receiver_ids) > MAX_BULK_RECIPIENTS:
+        raise HTTPException(status_code=400, detail=f"Too many recipients. Maximum: {MAX_BULK_RECIPIENTS}")
+    
+    # Get sender information, unless the session token already carries it
+    if session:
+        sender_name = session.name
+    else:
+        sender_collection = db.players if sender_type == "player" else db.clubs
+        sender = await sender_collection.find_one({"id": sender_id}, {"_id": 0, "name": 1})
+        if not sender:
+            raise HTTPException(status_code=404, detail="Sender not found")
+        sender_name = sender["name"]
+    
+    # Resolve all receivers in one query
+    receiver_collection = db.players if bulk_request.receiver_type == "player" else db.clubs
+    receivers = await receiver_collection.find(
+        {"id": {"$in": receiver_ids}},
+        {"_id": 0, "id": 1, "name": 1}
+    ).to_list(len(receiver_ids))
+    receiver_names = {receiver["id"]: receiver["name"] for receiver in receivers}
+    
+    # Find existing conversations between the sender and any receiver in one query
+    existing = await db.conversations.find({
+        "$and": [
+            conversation_member_filter(sender_id, sender_type),
+            conversation_member_filter_any(list(receiver_names), bulk_request.receiver_type)
+        ]
+    }).to_list(None)
+    conversation_ids = {}
+    for conversation in existing:
+        for member in conversation["members"]:
+            if member["user_type"] == bulk_request.receiver_type and member["user_id"] in receiver_names:
+                conversation_ids.setdefault(member["user_id"], conversation["id"])
+    
+    results = []
+    new_conversations = []
+    messages = []
+    for receiver_id in receiver_ids:
+        if receiver_id == sender_id and bulk_request.receiver_type == sender_type:
+            results.append(BulkMessageResult(receiver_id=receiver_id, status="skipped"))
+            continue
+        if receiver_id not in receiver_names:
+            results.append(BulkMessageResult(receiver_id=receiver_id, status="not_found"))
+            continue
+        
+        if receiver_id not in conversation_ids:
+            conversation = Conversation(
+                participant_1_id=sender_id,
+                participant_1_type=sender_type,
+                participant_1_name=sender_name,
+                participant_2_id=receiver_id,
+                participant_2_type=bulk_request.receiver_type,
+                participant_2_name=receiver_names[receiver_id],
+                members=[
+                    ConversationMember(user_id=sender_id, user_type=sender_type, name=sender_name),
+                    ConversationMember(user_id=receiver_id, user_type=bulk_request.receiver_type, name=receiver_names[receiver_id])
+                ]
+            )
+            new_conversations.append(conversation.dict())
+            conversation_ids[receiver_id] = conversation.id
+        
+        message = Message(
+            conversation_id=conversation_ids[receiver_id],
+            sender_id=sender_id,
+            sender_type=sender_type,
+            sender_name=sender_name,
+            receiver_id=receiver_id,
+            receiver_type=bulk_request.receiver_type,
+            receiver_name=receiver_names[receiver_id],
+            subject=bulk_request.subject,
+            content=bulk_request.content
+        )
+        messages.append(message)
+        results.append(BulkMessageResult(
+            receiver_id=receiver_id,
+            status="sent",
+            message_id=message.id,
+            conversation_id=message.conversation_id
+        ))
+    
+    if new_conversations:
+        await db.conversations.insert_many(new_conversations, ordered=False)
+    if messages:
+        await db.messages.insert_many([message.dict() for message in messages], ordered=False)
+        await db.conversations.bulk_write(
+            [UpdateOne(*conversation_last_message_update(message)) for message in messages],
+            ordered=False
+        )
+    
+    return {
+        "sent_count": len(messages),
+        "failed_count": len(results) - len(messages),
+        "results": results
+    }
+
 @api_router.get("/conversations/{user_id}/{user_type}/list")
 async def get_user_conversations(user_id: str, user_type: str, limit: int = 20, offset: int = 0):
     """Get all conversations for a user"""
     if user_type not in ["player", "club"]:
         raise HTTPException(status_code=400, detail="Invalid user type")
     
-    # Build query based on user type
-    query = {
-        "$or": [
-            {"participant_1_id": user_id, "participant_1_type": user_type, "is_deleted_by_p1": False},
-            {"participant_2_id": user_id, "participant_2_type": user_type, "is_deleted_by_p2": False}
-        ]
-    }
+    query = conversation_member_filter(user_id, user_type, is_deleted=False)
     
     conversations = await db.conversations.find(query).sort("last_message_at", -1).skip(offset).limit(limit).to_list(limit)
     
@@ -1645,12 +3022,9 @@ async def get_user_conversations(user_id: str, user_type: str, limit: int = 20,
         if last_message:
             last_message.pop("_id", None)
         
-        # Calculate unread count for this user
-        unread_count = 0
-        if conv["participant_1_id"] == user_id and conv["participant_1_type"] == user_type:
-            unread_count = conv["unread_count_p1"]
-        elif conv["participant_2_id"] == user_id and conv["participant_2_type"] == user_type:
-            unread_count = conv["unread_count_p2"]
+        # Unread count for this user lives on their member entry
+        member = get_conversation_member(conv, user_id, user_type)
+        unread_count = member["unread_count"] if member else 0
         
         conversation_summaries.append({
             "conversation": Conversation(**conv),
@@ -1661,8 +3035,17 @@ async def get_user_conversations(user_id: str, user_type: str, limit: int = 20,
     return conversation_summaries
 
 @api_router.get("/conversations/{conversation_id}/messages")
-async def get_conversation_messages(conversation_id: str, user_id: str = Query(...), user_type: str = Query(...), limit: int = Query(50), offset: int = Query(0)):
+async def get_conversation_messages(
+    conversation_id: str,
+    user_id: Optional[str] = Query(None),
+    user_type: Optional[str] = Query(None),
+    limit: int = Query(50),
+    offset: int = Query(0),
+    session: Optional[SessionUser] = Depends(get_optional_session)
+):
     """Get messages in a conversation"""
+    user_id, user_type = resolve_acting_user(session, user_id, user_type)
+    
     # Debug logging
     import logging
     logging.basicConfig(level=logging.INFO)
@@ -1686,12 +3069,7 @@ async def get_conversation_messages(conversation_id: str, user_id: str = Query(.
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    is_participant = (
-        (conversation["participant_1_id"] == user_id and conversation["participant_1_type"] == user_type) or
-        (conversation["participant_2_id"] == user_id and conversation["participant_2_type"] == user_type)
-    )
-    
-    if not is_participant:
+    if not get_conversation_member(conversation, user_id, user_type):
         raise HTTPException(status_code=403, detail="Access denied")
     
     # Get messages
@@ -1703,20 +3081,13 @@ async def get_conversation_messages(conversation_id: str, user_id: str = Query(.
         ]
     }
     
-    messages = await db.messages.find(query).sort("created_at", -1).skip(offset).limit(limit).to_list(limit)
+    messages = await db.messages.find(query, DOCUMENT_PROJECTION).sort("created_at", -1).skip(offset).limit(limit).to_list(limit)
     
-    # Remove MongoDB _id and mark messages as read
-    message_list = []
-    message_ids_to_mark_read = []
-    
-    for msg in messages:
-        msg.pop("_id", None)
-        
-        # Mark unread messages as read if user is the receiver
-        if msg["receiver_id"] == user_id and not msg["is_read"]:
-            message_ids_to_mark_read.append(msg["id"])
-        
-        message_list.append(Message(**msg))
+    # Mark unread messages as read if user is the receiver
+    message_ids_to_mark_read = [
+        msg["id"] for msg in messages
+        if msg["receiver_id"] == user_id and not msg["is_read"]
+    ]
     
     # Mark messages as read
     if message_ids_to_mark_read:
@@ -1729,11 +3100,17 @@ async def get_conversation_messages(conversation_id: str, user_id: str = Query(.
         await update_conversation_unread_count(conversation_id, user_id, user_type)
     
     # Return messages in chronological order (oldest first)
-    return list(reversed(message_list))
+    return FastJSONResponse(trusted_rows(Message, reversed(messages)))
 
 @api_router.put("/conversations/{conversation_id}/mark-read")
-async def mark_conversation_read(conversation_id: str, user_id: str = Query(...), user_type: str = Query(...)):
+async def mark_conversation_read(
+    conversation_id: str,
+    user_id: Optional[str] = Query(None),
+    user_type: Optional[str] = Query(None),
+    session: Optional[SessionUser] = Depends(get_optional_session)
+):
     """Mark all messages in a conversation as read"""
+    user_id, user_type = resolve_acting_user(session, user_id, user_type)
     if user_type not in ["player", "club"]:
         raise HTTPException(status_code=400, detail="Invalid user type")
     
@@ -1742,12 +3119,7 @@ async def mark_conversation_read(conversation_id: str, user_id: str = Query(...)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    is_participant = (
-        (conversation["participant_1_id"] == user_id and conversation["participant_1_type"] == user_type) or
-        (conversation["participant_2_id"] == user_id and conversation["participant_2_type"] == user_type)
-    )
-    
-    if not is_participant:
+    if not get_conversation_member(conversation, user_id, user_type):
         raise HTTPException(status_code=403, detail="Access denied")
     
     # Mark all unread messages as read
@@ -1766,27 +3138,26 @@ async def mark_conversation_read(conversation_id: str, user_id: str = Query(...)
     return {"message": "Conversation marked as read"}
 
 @api_router.delete("/conversations/{conversation_id}")
-async def delete_conversation(conversation_id: str, user_id: str = Query(...), user_type: str = Query(...)):
+async def delete_conversation(
+    conversation_id: str,
+    user_id: Optional[str] = Query(None),
+    user_type: Optional[str] = Query(None),
+    session: Optional[SessionUser] = Depends(get_optional_session)
+):
     """Delete a conversation for the current user"""
+    user_id, user_type = resolve_acting_user(session, user_id, user_type)
     if user_type not in ["player", "club"]:
         raise HTTPException(status_code=400, detail="Invalid user type")
     
-    conversation = await db.conversations.find_one({"id": conversation_id})
-    if not conversation:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-    
     # Mark conversation as deleted for this user
-    if conversation["participant_1_id"] == user_id and conversation["participant_1_type"] == user_type:
-        await db.conversations.update_one(
-            {"id": conversation_id},
-            {"$set": {"is_deleted_by_p1": True, "updated_at": datetime.utcnow()}}
-        )
-    elif conversation["participant_2_id"] == user_id and conversation["participant_2_type"] == user_type:
-        await db.conversations.update_one(
-            {"id": conversation_id},
-            {"$set": {"is_deleted_by_p2": True, "updated_at": datetime.utcnow()}}
-        )
-    else:
+    result = await db.conversations.update_one(
+        {"id": conversation_id, **conversation_member_filter(user_id, user_type)},
+        {"$set": {"members.$.is_deleted": True, "updated_at": datetime.utcnow()}}
+    )
+    
+    if result.matched_count == 0:
+        if not await db.conversations.find_one({"id": conversation_id}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="Conversation not found")
         raise HTTPException(status_code=403, detail="Access denied")
     
     return {"message": "Conversation deleted"}
@@ -1798,32 +3169,13 @@ async def get_unread_message_count(user_id: str, user_type: str):
         raise HTTPException(status_code=400, detail="Invalid user type")
     
     # Sum unread counts from all conversations
+    member_match = conversation_member_filter(user_id, user_type, is_deleted=False)
     pipeline = [
-        {
-            "$match": {
-                "$or": [
-                    {"participant_1_id": user_id, "participant_1_type": user_type, "is_deleted_by_p1": False},
-                    {"participant_2_id": user_id, "participant_2_type": user_type, "is_deleted_by_p2": False}
-                ]
-            }
-        },
-        {
-            "$group": {
-                "_id": None,
-                "total_unread": {
-                    "$sum": {
-                        "$cond": [
-                            {"$and": [
-                                {"$eq": ["$participant_1_id", user_id]},
-                                {"$eq": ["$participant_1_type", user_type]}
-                            ]},
-                            "$unread_count_p1",
-                            "$unread_count_p2"
-                        ]
-                    }
-                }
-            }
-        }
+        {"$match": member_match},
+        {"$project": {"_id": 0, "members": 1}},
+        {"$unwind": "$members"},
+        {"$match": {"members.user_id": user_id, "members.user_type": user_type}},
+        {"$group": {"_id": None, "total_unread": {"$sum": "$members.unread_count"}}}
     ]
     
     result = await db.conversations.aggregate(pipeline).to_list(1)
@@ -1832,20 +3184,31 @@ async def get_unread_message_count(user_id: str, user_type: str):
     return {"unread_count": total_unread}
 
 # Helper functions for messaging
+def conversation_member_filter(user_id: str, user_type: str, **member_state) -> dict:
+    """Build a `members` predicate served by the conversation members index"""
+    return {"members": {"$elemMatch": {"user_id": user_id, "user_type": user_type, **member_state}}}
+
+def conversation_member_filter_any(user_ids: List[str], user_type: str) -> dict:
+    """Build a `members` predicate matching any of several users of one type"""
+    return {"members": {"$elemMatch": {"user_id": {"$in": user_ids}, "user_type": user_type}}}
+
+def get_conversation_member(conversation: dict, user_id: str, user_type: str) -> Optional[dict]:
+    """Return the member entry for a user in a conversation document, if any"""
+    for member in conversation.get("members", []):
+        if member["user_id"] == user_id and member["user_type"] == user_type:
+            return member
+    return None
+
 async def find_or_create_conversation(p1_id: str, p1_type: str, p1_name: str, p2_id: str, p2_type: str, p2_name: str):
     """Find existing conversation or create new one"""
     # Try to find existing conversation
     conversation = await db.conversations.find_one({
-        "$or": [
-            {
-                "participant_1_id": p1_id, "participant_1_type": p1_type,
-                "participant_2_id": p2_id, "participant_2_type": p2_type
-            },
-            {
-                "participant_1_id": p2_id, "participant_1_type": p2_type,
-                "participant_2_id": p1_id, "participant_2_type": p1_type
-            }
-        ]
+        "members": {
+            "$all": [
+                conversation_member_filter(p1_id, p1_type)["members"],
+                conversation_member_filter(p2_id, p2_type)["members"]
+            ]
+        }
     })
     
     if conversation:
@@ -1858,19 +3221,18 @@ async def find_or_create_conversation(p1_id: str, p1_type: str, p1_name: str, p2
         participant_1_name=p1_name,
         participant_2_id=p2_id,
         participant_2_type=p2_type,
-        participant_2_name=p2_name
+        participant_2_name=p2_name,
+        members=[
+            ConversationMember(user_id=p1_id, user_type=p1_type, name=p1_name),
+            ConversationMember(user_id=p2_id, user_type=p2_type, name=p2_name)
+        ]
     )
     
     await db.conversations.insert_one(new_conversation.dict())
     return new_conversation.dict()
 
-async def update_conversation_last_message(conversation_id: str, message: Message):
-    """Update conversation with last message information"""
-    # Increment unread count for the receiver
-    conversation = await db.conversations.find_one({"id": conversation_id})
-    if not conversation:
-        return
-    
+def conversation_last_message_update(message: Message) -> tuple:
+    """Build the (filter, update) pair recording a new message on its conversation"""
     update_data = {
         "last_message_content": message.content[:100] + "..." if len(message.content) > 100 else message.content,
         "last_message_at": message.created_at,
@@ -1878,34 +3240,46 @@ async def update_conversation_last_message(conversation_id: str, message: Messag
         "updated_at": datetime.utcnow()
     }
     
-    # Increment unread count for receiver
-    if conversation["participant_1_id"] == message.receiver_id and conversation["participant_1_type"] == message.receiver_type:
-        update_data["unread_count_p1"] = conversation.get("unread_count_p1", 0) + 1
-    elif conversation["participant_2_id"] == message.receiver_id and conversation["participant_2_type"] == message.receiver_type:
-        update_data["unread_count_p2"] = conversation.get("unread_count_p2", 0) + 1
-    
-    await db.conversations.update_one(
-        {"id": conversation_id},
-        {"$set": update_data}
+    # Increment unread count for the receiver in place
+    return (
+        {"id": message.conversation_id, **conversation_member_filter(message.receiver_id, message.receiver_type)},
+        {"$set": update_data, "$inc": {"members.$.unread_count": 1}}
     )
 
+async def update_conversation_last_message(conversation_id: str, message: Message):
+    """Update conversation with last message information"""
+    await db.conversations.update_one(*conversation_last_message_update(message))
+
 async def update_conversation_unread_count(conversation_id: str, user_id: str, user_type: str):
     """Reset unread count for a user in a conversation"""
-    conversation = await db.conversations.find_one({"id": conversation_id})
-    if not conversation:
-        return
-    
-    update_data = {"updated_at": datetime.utcnow()}
-    
-    if conversation["participant_1_id"] == user_id and conversation["participant_1_type"] == user_type:
-        update_data["unread_count_p1"] = 0
-    elif conversation["participant_2_id"] == user_id and conversation["participant_2_type"] == user_type:
-        update_data["unread_count_p2"] = 0
-    
     await db.conversations.update_one(
-        {"id": conversation_id},
-        {"$set": update_data}
+        {"id": conversation_id, **conversation_member_filter(user_id, user_type)},
+        {"$set": {"members.$.unread_count": 0, "updated_at": datetime.utcnow()}}
+    )
+
+# Helper functions for auth tokens
+async def issue_auth_token(purpose: str, user_id: str, user_type: str, ttl: timedelta) -> str:
+    """Create a fresh token for a user, invalidating earlier tokens with the same purpose"""
+    await db.auth_tokens.delete_many({"user_id": user_id, "user_type": user_type, "purpose": purpose})
+    
+    auth_token = AuthToken(
+        purpose=purpose,
+        user_id=user_id,
+        user_type=user_type,
+        expires_at=datetime.utcnow() + ttl
     )
+    await db.auth_tokens.insert_one(auth_token.dict())
+    return auth_token.token
+
+async def consume_auth_token(token: str, purpose: str, user_type: str) -> Optional[dict]:
+    """Atomically look up and delete an unexpired token"""
+    # The TTL monitor only runs periodically, so expiry is still checked here
+    return await db.auth_tokens.find_one_and_delete({
+        "token": token,
+        "purpose": purpose,
+        "user_type": user_type,
+        "expires_at": {"$gt": datetime.utcnow()}
+    })
 
 # Email verification endpoints
 @api_router.post("/verify-email")
@@ -1919,23 +3293,21 @@ async def verify_email(verification: EmailVerificationRequest):
     # Determine collection
     collection = db.players if user_type == "player" else db.clubs
     
-    # Find user by verification token
-    user = await collection.find_one({
-        "verification_token": verification.token,
-        "verification_token_expires": {"$gt": datetime.utcnow()}
-    })
+    # Find and consume verification token
+    auth_token = await consume_auth_token(verification.token, "email_verification", user_type)
+    if not auth_token:
+        raise HTTPException(status_code=400, detail="Invalid or expired verification token")
     
+    user = await collection.find_one({"id": auth_token["user_id"]}, {"_id": 0, "email": 1, "name": 1})
     if not user:
         raise HTTPException(status_code=400, detail="Invalid or expired verification token")
     
-    # Update user as verified and remove token
+    # Update user as verified
     await collection.update_one(
-        {"id": user["id"]},
-        {
-            "$set": {"is_verified": True, "updated_at": datetime.utcnow()},
-            "$unset": {"verification_token": "", "verification_token_expires": ""}
-        }
+        {"id": auth_token["user_id"]},
+        {"$set": {"is_verified": True, "updated_at": datetime.utcnow()}}
     )
+    await invalidate_profile(user_type, auth_token["user_id"])
     
     # Send welcome email
     send_welcome_email(user["email"], user_type, user["name"])
@@ -1954,7 +3326,7 @@ async def resend_verification(request: ResendVerificationRequest):
     collection = db.players if user_type == "player" else db.clubs
     
     # Find user by email
-    user = await collection.find_one({"email": request.email})
+    user = await collection.find_one({"email": request.email}, {"_id": 0, "id": 1, "name": 1, "is_verified": 1})
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1963,20 +3335,7 @@ async def resend_verification(request: ResendVerificationRequest):
         raise HTTPException(status_code=400, detail="Email is already verified")
     
     # Generate new verification token
-    verification_token = str(uuid.uuid4())
-    verification_expires = datetime.utcnow() + timedelta(hours=24)
-    
-    # Update user with new token
-    await collection.update_one(
-        {"id": user["id"]},
-        {
-            "$set": {
-                "verification_token": verification_token,
-                "verification_token_expires": verification_expires,
-                "updated_at": datetime.utcnow()
-            }
-        }
-    )
+    verification_token = await issue_auth_token("email_verification", user["id"], user_type, VERIFICATION_TOKEN_TTL)
     
     # Send verification email
     email_sent = send_verification_email(request.email, verification_token, user_type, user["name"])
@@ -1998,27 +3357,14 @@ async def request_password_reset(request: PasswordResetRequest):
     collection = db.players if user_type == "player" else db.clubs
     
     # Find user by email
-    user = await collection.find_one({"email": request.email})
+    user = await collection.find_one({"email": request.email}, {"_id": 0, "id": 1, "name": 1})
     
     if not user:
         # Don't reveal if email exists or not for security
         return {"message": "If an account with this email exists, a password reset email has been sent"}
     
     # Generate password reset token
-    reset_token = str(uuid.uuid4())
-    reset_expires = datetime.utcnow() + timedelta(hours=2)  # 2 hour expiry
-    
-    # Update user with reset token
-    await collection.update_one(
-        {"id": user["id"]},
-        {
-            "$set": {
-                "password_reset_token": reset_token,
-                "password_reset_expires": reset_expires,
-                "updated_at": datetime.utcnow()
-            }
-        }
-    )
+    reset_token = await issue_auth_token("password_reset", user["id"], user_type, PASSWORD_RESET_TOKEN_TTL)
     
     # Send password reset email
     send_password_reset_email(request.email, reset_token, user_type, user["name"])
@@ -2036,33 +3382,23 @@ async def reset_password(request: PasswordResetConfirm):
     # Determine collection
     collection = db.players if user_type == "player" else db.clubs
     
-    # Find user by reset token
-    user = await collection.find_one({
-        "password_reset_token": request.token,
-        "password_reset_expires": {"$gt": datetime.utcnow()}
-    })
-    
-    if not user:
+    # Find and consume reset token
+    auth_token = await consume_auth_token(request.token, "password_reset", user_type)
+    if not auth_token:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
     
     # Hash new password
     new_password_hash = get_password_hash(request.new_password)
     
-    # Update user with new password and remove reset token
-    await collection.update_one(
-        {"id": user["id"]},
-        {
-            "$set": {
-                "password_hash": new_password_hash,
-                "updated_at": datetime.utcnow()
-            },
-            "$unset": {
-                "password_reset_token": "",
-                "password_reset_expires": ""
-            }
-        }
+    # Update user with new password
+    result = await collection.update_one(
+        {"id": auth_token["user_id"]},
+        {"$set": {"password_hash": new_password_hash, "updated_at": datetime.utcnow()}}
     )
     
+    if result.matched_count == 0:
+        raise HTTPException(status_code=400, detail="Invalid or expired reset token")
+    
     return {"message": "Password reset successfully"}
 
 @api_router.get("/check-verification-status")
@@ -2077,7 +3413,7 @@ async def check_verification_status(email: str, user_type: str):
     collection = db.players if user_type == "player" else db.clubs
     
     # Find user by email
-    user = await collection.find_one({"email": email})
+    user = await collection.find_one({"email": email}, {"_id": 0, "email": 1, "name": 1, "is_verified": 1})
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -2097,6 +3433,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Configure logging
@@ -2106,6 +3443,135 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def migrate_conversation_members():
+    """Backfill `members` on conversations created before the members index existed"""
+    legacy_fields = ["unread_count_p1", "unread_count_p2", "is_deleted_by_p1", "is_deleted_by_p2"]
+    await db.conversations.update_many(
+        {"members": {"$exists": False}},
+        [
+            {"$set": {"members": [
+                {
+                    "user_id": "$participant_1_id",
+                    "user_type": "$participant_1_type",
+                    "name": "$participant_1_name",
+                    "unread_count": {"$ifNull": ["$unread_count_p1", 0]},
+                    "is_deleted": {"$ifNull": ["$is_deleted_by_p1", False]}
+                },
+                {
+                    "user_id": "$participant_2_id",
+                    "user_type": "$participant_2_type",
+                    "name": "$participant_2_name",
+                    "unread_count": {"$ifNull": ["$unread_count_p2", 0]},
+                    "is_deleted": {"$ifNull": ["$is_deleted_by_p2", False]}
+                }
+            ]}},
+            {"$unset": legacy_fields}
+        ]
+    )
+
+async def migrate_profile_auth_tokens():
+    """Move tokens stored on profile documents into the auth_tokens collection"""
+    legacy_tokens = [
+        ("email_verification", "verification_token", "verification_token_expires"),
+        ("password_reset", "password_reset_token", "password_reset_expires")
+    ]
+    now = datetime.utcnow()
+    for user_type, collection in [("player", db.players), ("club", db.clubs)]:
+        for purpose, token_field, expires_field in legacy_tokens:
+            auth_tokens = []
+            async for user in collection.find(
+                {token_field: {"$exists": True}, expires_field: {"$gt": now}},
+                {"_id": 0, "id": 1, token_field: 1, expires_field: 1}
+            ):
+                auth_tokens.append(AuthToken(
+                    token=user[token_field],
+                    purpose=purpose,
+                    user_id=user["id"],
+                    user_type=user_type,
+                    expires_at=user[expires_field]
+                ).dict())
+            if auth_tokens:
+                try:
+                    await db.auth_tokens.insert_many(auth_tokens, ordered=False)
+                except BulkWriteError:
+                    # Tokens already copied by an interrupted earlier run
+                    pass
+            
+            await collection.update_many(
+                {token_field: {"$exists": True}},
+                {"$unset": {token_field: "", expires_field: ""}}
+            )
+
+async def migrate_geocode_locations():
+    """Geocode profiles and vacancies stored before they carried a `geo` point"""
+    sources = [
+        (db.players, {"_id": 0, "id": 1, "location": 1, "country": 1}),
+        (db.clubs, {"_id": 0, "id": 1, "location": 1}),
+        (db.vacancies, {"_id": 0, "id": 1, "location": 1})
+    ]
+    for collection, projection in sources:
+        operations = []
+        async for document in collection.find({"geo": {"$exists": False}}, projection):
+            # Unknown places are stored as null so they are not retried every startup
+            geo = locate(document.get("location"), document.get("country"))
+            operations.append(UpdateOne({"id": document["id"]}, {"$set": {"geo": geo}}))
+            if len(operations) >= STREAM_BATCH_SIZE:
+                await collection.bulk_write(operations, ordered=False)
+                operations = []
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+
+async def migrate_document_versions():
+    """Start documents stored before optimistic concurrency at version 1"""
+    for collection in (db.players, db.clubs, db.vacancies, db.applications):
+        await collection.update_many({"version": {"$exists": False}}, {"$set": {"version": 1}})
+
+@app.on_event("startup")
+async def ensure_indexes():
+    await migrate_conversation_members()
+    await db.auth_tokens.create_index("token", unique=True)
+    await db.auth_tokens.create_index("expires_at", expireAfterSeconds=0)
+    await db.auth_tokens.create_index([("user_id", 1), ("user_type", 1), ("purpose", 1)])
+    # Keyset pagination orders
+    await db.players.create_index([("created_at", -1), ("id", -1)])
+    await db.clubs.create_index([("created_at", -1), ("id", -1)])
+    await db.players.create_index("id")
+    await db.clubs.create_index("id")
+    await db.vacancies.create_index("club_id")
+    await migrate_geocode_locations()
+    await migrate_document_versions()
+    await media_library.ensure_indexes()
+    await media_library.migrate_embedded()
+    for collection in (db.players, db.clubs, db.vacancies):
+        await collection.create_index([("geo", "2dsphere")])
+    # Match index delta syncs
+    await db.players.create_index("updated_at")
+    await db.vacancies.create_index("updated_at")
+    await db.applications.create_index([("player_id", 1), ("applied_at", -1), ("id", -1)])
+    await db.applications.create_index([("vacancy_id", 1), ("applied_at", -1), ("id", -1)])
+    await migrate_profile_auth_tokens()
+    await deletion_engine.ensure_indexes()
+    await deletion_engine.resume()
+    await resumable_uploads.ensure_indexes()
+    await db.completed_uploads.create_index("key", unique=True)
+    await db.completed_uploads.create_index("expires_at", expireAfterSeconds=0)
+    await transcoder.ensure_indexes()
+    transcoder.start()
+    resumable_uploads.start()
+    await db.conversations.create_index("id", unique=True)
+    await db.conversations.create_index([
+        ("members.user_id", 1),
+        ("members.user_type", 1),
+        ("members.is_deleted", 1),
+        ("last_message_at", -1)
+    ])
+    if isinstance(login_rate_limiter.store, MongoBucketStore):
+        await login_rate_limiter.store.ensure_indexes()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    shutdown_hash_pool()
+    await transcoder.stop()
+    await resumable_uploads.stop()
+    await file_deleter.flush()
     client.close()
\ No newline at end of file
@@ -0,0 +1,305 @@
+import abc
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Optional
+from urllib.parse import quote, urlencode
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ImportError:
+    # Only needed for STORAGE_BACKEND=s3
+    boto3 = None
+
+logger = logging.getLogger(__name__)
+
+# Bytes moved per read/write when streaming uploads, and per S3 multipart part
+STREAM_CHUNK_SIZE = 8 * 1024 * 1024
+PRESIGN_TTL_SECONDS = 900
+# Background deletes: keys per delete_many call (S3 DeleteObjects takes 1000), and how long a batch waits to fill
+DELETE_QUEUE_BATCH_SIZE = 1000
+DELETE_QUEUE_LINGER = 0.05
+
+
+class FileTooLarge(Exception):
+    """Raised by Storage.save when a stream exceeds its size limit"""
+
+
+class LimitedReader:
+    """File-like wrapper that counts bytes read and stops at a size limit"""
+
+    def __init__(self, stream: BinaryIO, max_size: Optional[int]):
+        self.stream = stream
+        self.max_size = max_size
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.stream.read(size)
+        self.bytes_read += len(chunk)
+        if self.max_size is not None and self.bytes_read > self.max_size:
+            raise FileTooLarge(f"Upload exceeds {self.max_size} bytes")
+        return chunk
+
+
+class Storage(abc.ABC):
+    """
+    Where uploaded media lives, addressed by keys such as `photos/<uuid>.jpg`
+
+    Methods are blocking; call them from a worker thread in async code.
+    """
+
+    @abc.abstractmethod
+    def save(self, key: str, stream: BinaryIO, content_type: Optional[str] = None,
+             max_size: Optional[int] = None) -> int:
+        """Stream `stream` into `key` and return the number of bytes stored"""
+
+    def delete(self, key: str):
+        self.delete_many([key])
+
+    @abc.abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete keys, ignoring missing ones; returns how many existed"""
+
+    @abc.abstractmethod
+    def size(self, key: str) -> Optional[int]:
+        """Stored size of `key`, or None if it does not exist"""
+
+    @abc.abstractmethod
+    def read_head(self, key: str, size: int) -> bytes:
+        """The first `size` bytes of `key`"""
+
+    def download_url(self, key: str, expires_in: int = PRESIGN_TTL_SECONDS) -> Optional[str]:
+        """Presigned URL to fetch `key` directly, or None if the API serves it"""
+        return None
+
+    @abc.abstractmethod
+    def presigned_upload(self, key: str, content_type: str, max_size: int,
+                         expires_in: int = PRESIGN_TTL_SECONDS) -> dict:
+        """Target for a direct upload: {"method", "url", "headers"}"""
+
+
+class LocalStorage(Storage):
+    """
+    Files under a local directory
+
+    Also the stand-in for object storage in development and tests:
+    presigned uploads are HMAC-signed URLs for PUT /api/storage/{key}, which
+    the API streams to disk through `save`.
+    """
+
+    def __init__(self, root: Path, signing_key: str, upload_url: str = "/api/storage"):
+        self.root = Path(root)
+        self.signing_key = signing_key.encode("utf-8")
+        self.upload_url = upload_url
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def save(self, key: str, stream: BinaryIO, content_type: Optional[str] = None,
+             max_size: Optional[int] = None) -> int:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written beside the target and renamed, so readers never see a partial file
+        partial = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+        reader = LimitedReader(stream, max_size)
+        try:
+            with open(partial, "wb") as target:
+                shutil.copyfileobj(reader, target, STREAM_CHUNK_SIZE)
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+        return reader.bytes_read
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        deleted = 0
+        for key in keys:
+            try:
+                self.path(key).unlink()
+                deleted += 1
+            except FileNotFoundError:
+                pass
+        return deleted
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return self.path(key).stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def read_head(self, key: str, size: int) -> bytes:
+        with open(self.path(key), "rb") as source:
+            return source.read(size)
+
+    def signature(self, key: str, expires: int, max_size: int, content_type: str) -> str:
+        message = f"PUT\n{key}\n{expires}\n{max_size}\n{content_type}".encode("utf-8")
+        return hmac.new(self.signing_key, message, hashlib.sha256).hexdigest()
+
+    def verify_upload(self, key: str, expires: int, max_size: int, content_type: str, signature: str) -> bool:
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self.signature(key, expires, max_size, content_type), signature)
+
+    def presigned_upload(self, key: str, content_type: str, max_size: int,
+                         expires_in: int = PRESIGN_TTL_SECONDS) -> dict:
+        expires = int(time.time()) + expires_in
+        query = urlencode({
+            "expires": expires,
+            "max_size": max_size,
+            "signature": self.signature(key, expires, max_size, content_type)
+        })
+        return {
+            "method": "PUT",
+            "url": f"{self.upload_url}/{quote(key)}?{query}",
+            "headers": {"Content-Type": content_type}
+        }
+
+
+class S3Storage(Storage):
+    """
+    Objects in an S3-compatible bucket (AWS S3, MinIO, ...)
+
+    Uploads stream through boto3's managed transfer, which switches to a
+    multipart upload above STREAM_CHUNK_SIZE. Downloads and direct uploads
+    use presigned URLs, so those bytes never pass through the API.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 region_name: Optional[str] = None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region_name)
+        self.transfer_config = TransferConfig(multipart_threshold=STREAM_CHUNK_SIZE, multipart_chunksize=STREAM_CHUNK_SIZE)
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def save(self, key: str, stream: BinaryIO, content_type: Optional[str] = None,
+             max_size: Optional[int] = None) -> int:
+        reader = LimitedReader(stream, max_size)
+        extra_args = {"ContentType": content_type} if content_type else None
+        # A FileTooLarge raised mid-transfer aborts the multipart upload
+        self.client.upload_fileobj(reader, self.bucket, self.object_key(key), ExtraArgs=extra_args, Config=self.transfer_config)
+        return reader.bytes_read
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        deleted = 0
+        # DeleteObjects takes at most 1000 keys per request
+        for start in range(0, len(keys), 1000):
+            response = self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": self.object_key(key)} for key in keys[start:start + 1000]], "Quiet": False}
+            )
+            deleted += len(response.get("Deleted", []))
+        return deleted
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))["ContentLength"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def read_head(self, key: str, size: int) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket, Key=self.object_key(key), Range=f"bytes=0-{size - 1}")
+        return response["Body"].read()
+
+    def download_url(self, key: str, expires_in: int = PRESIGN_TTL_SECONDS) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self.object_key(key)}, ExpiresIn=expires_in
+        )
+
+    def presigned_upload(self, key: str, content_type: str, max_size: int,
+                         expires_in: int = PRESIGN_TTL_SECONDS) -> dict:
+        # A presigned POST is the only S3 direct upload that can enforce a size limit
+        post = self.client.generate_presigned_post(
+            self.bucket,
+            self.object_key(key),
+            Fields={"Content-Type": content_type},
+            Conditions=[{"Content-Type": content_type}, ["content-length-range", 1, max_size]],
+            ExpiresIn=expires_in
+        )
+        return {"method": "POST", "url": post["url"], "fields": post["fields"], "headers": {}}
+
+
+class DeleteQueue:
+    """
+    Deletes storage keys in the background, in batches
+
+    `submit` returns at once. Keys submitted while a batch is lingering or
+    being deleted join the next one, so a burst of media deletes costs a
+    few delete_many calls (one DeleteObjects request per 1000 keys on S3)
+    on a worker thread instead of a blocking unlink per request. Failed
+    batches are logged; on local storage the upload GC collects what a
+    failure or crash leaves behind.
+    """
+
+    def __init__(self, storage: Storage, batch_size: int = DELETE_QUEUE_BATCH_SIZE, linger: float = DELETE_QUEUE_LINGER):
+        self.storage = storage
+        self.batch_size = batch_size
+        self.linger = linger
+        self._pending: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def _draining(self) -> bool:
+        # A task of another, possibly closed, loop (a CLI's asyncio.run) does not count
+        return self._task is not None and not self._task.done() and self._task.get_loop() is asyncio.get_running_loop()
+
+    def submit(self, keys: Iterable[str]):
+        self._pending.extend(keys)
+        if self._pending and not self._draining():
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def flush(self):
+        """Wait until everything submitted so far is deleted"""
+        while self._draining():
+            await self._task
+        if self._pending:
+            await self._drain(linger=False)
+
+    async def _drain(self, linger: bool = True):
+        if linger:
+            await asyncio.sleep(self.linger)
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            try:
+                await asyncio.to_thread(self.storage.delete_many, batch)
+            except Exception:
+                logger.exception(f"Failed to delete {len(batch)} stored files")
+
+
+def create_storage(upload_dir: Path, signing_key: str) -> Storage:
+    """
+    Build the upload storage from environment configuration
+
+    STORAGE_BACKEND is 'local' (default, files under upload_dir) or 's3',
+    configured by S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL (for MinIO and other
+    S3-compatible stores), S3_REGION and the usual AWS credential variables.
+    """
+    backend = os.getenv("STORAGE_BACKEND", "local").lower()
+    if backend == "s3":
+        if boto3 is None or not os.getenv("S3_BUCKET"):
+            raise RuntimeError("STORAGE_BACKEND=s3 needs boto3 and S3_BUCKET")
+        logger.info(f"Storing uploads in bucket {os.getenv('S3_BUCKET')}")
+        return S3Storage(
+            os.getenv("S3_BUCKET"),
+            prefix=os.getenv("S3_PREFIX", ""),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL"),
+            region_name=os.getenv("S3_REGION")
+        )
+    if backend != "local":
+        raise RuntimeError(f"Unknown STORAGE_BACKEND '{backend}'")
+    return LocalStorage(upload_dir, signing_key)
@@ -0,0 +1,305 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+# Longest side of the web rendition and of the poster
+WEB_MAX_DIMENSION = 1280
+POSTER_MAX_DIMENSION = 640
+TRANSCODE_TIMEOUT = timedelta(minutes=10)
+TRANSCODE_MAX_ATTEMPTS = 3
+# How often idle workers look for jobs queued by other API instances
+TRANSCODE_POLL_INTERVAL = 5.0
+# Media kind of videos, for players and clubs alike
+VIDEO_KIND = "videos"
+
+
+class TranscodeFailed(Exception):
+    """ffmpeg or ffprobe exited with an error or ran past the timeout"""
+
+
+def web_video_args(ffmpeg: str, source: str, target: Path) -> List[str]:
+    """H.264/AAC MP4 capped at WEB_MAX_DIMENSION, with the moov atom up front"""
+    scale = (
+        f"scale='min({WEB_MAX_DIMENSION},iw)':'min({WEB_MAX_DIMENSION},ih)'"
+        ":force_original_aspect_ratio=decrease:force_divisible_by=2"
+    )
+    return [
+        ffmpeg, "-nostdin", "-y", "-v", "error", "-i", source,
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-vf", scale, "-pix_fmt", "yuv420p",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-maxrate", "4M", "-bufsize", "8M",
+        "-c:a", "aac", "-b:a", "128k", "-ac", "2",
+        "-movflags", "+faststart",
+        str(target)
+    ]
+
+
+def poster_args(ffmpeg: str, source: Path, target: Path) -> List[str]:
+    """A representative frame from the start of the video as JPEG"""
+    scale = (
+        f"scale='min({POSTER_MAX_DIMENSION},iw)':'min({POSTER_MAX_DIMENSION},ih)'"
+        ":force_original_aspect_ratio=decrease"
+    )
+    return [
+        ffmpeg, "-nostdin", "-y", "-v", "error", "-i", str(source),
+        "-vf", f"thumbnail=50,{scale}", "-frames:v", "1", "-q:v", "3",
+        str(target)
+    ]
+
+
+def probe_args(ffprobe: str, source: Path) -> List[str]:
+    return [
+        ffprobe, "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=width,height:format=duration", "-of", "json",
+        str(source)
+    ]
+
+
+def derived_filenames(filename: str) -> dict:
+    """Names of the web rendition and poster stored beside an uploaded video"""
+    stem = Path(filename).stem
+    return {"web_filename": f"{stem}.web.mp4", "poster_filename": f"{stem}.poster.jpg"}
+
+
+class TranscodeWorker:
+    """
+    Background transcoding of uploaded videos with ffmpeg
+
+    `enqueue` records a job in `transcode_jobs`; up to `workers` jobs run
+    at once, each as its own ffmpeg subprocess, so the pool size bounds
+    CPU use regardless of how many videos arrive. A job writes a
+    web-optimised MP4 (H.264/AAC, capped size and bitrate, faststart) and
+    a poster JPEG next to the upload, probes duration and dimensions, and
+    records all of it on the video's entry in `media`. Jobs are claimed
+    with a lease, so those of a crashed instance are picked up again,
+    and failed jobs are retried up to TRANSCODE_MAX_ATTEMPTS times.
+    """
+
+    def __init__(self, db, storage, media, ffmpeg: Optional[str], ffprobe: Optional[str], workers: int = 1,
+                 timeout: timedelta = TRANSCODE_TIMEOUT, work_dir: Optional[Path] = None,
+                 on_updated: Optional[Callable[[str, str], Awaitable[None]]] = None):
+        self.db = db
+        self.storage = storage
+        self.media = media
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.work_dir = work_dir
+        self.on_updated = on_updated
+        self._wakeup = asyncio.Event()
+        self._tasks = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.ffmpeg and self.ffprobe)
+
+    async def ensure_indexes(self):
+        await self.db.transcode_jobs.create_index("id", unique=True)
+        await self.db.transcode_jobs.create_index([("status", 1), ("created_at", 1)])
+
+    def start(self):
+        """Start the worker tasks on the running loop"""
+        if not self.enabled:
+            logger.warning("ffmpeg/ffprobe not found, videos are served as uploaded")
+            return
+        for _ in range(self.workers):
+            task = asyncio.get_running_loop().create_task(self._work())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def enqueue(self, owner_type: str, owner_id: str, directory: str, media_id: str, filename: str,
+                      job_id: Optional[str] = None) -> Optional[dict]:
+        """Queue a video for transcoding; None when ffmpeg is not available"""
+        if not self.enabled:
+            return None
+        now = datetime.utcnow()
+        job = {
+            "id": job_id or str(uuid.uuid4()),
+            "owner_type": owner_type,
+            "owner_id": owner_id,
+            "directory": directory,
+            "media_id": media_id,
+            "filename": filename,
+            "status": "queued",
+            "attempts": 0,
+            "error": None,
+            "result": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "lease_until": None
+        }
+        await self.db.transcode_jobs.insert_one(dict(job))
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.db.transcode_jobs.find_one({"id": job_id}, {"_id": 0, "lease_until": 0})
+
+    async def _work(self):
+        while True:
+            job = None
+            try:
+                job = await self._claim()
+                if job:
+                    await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Database trouble; a claimed job is retried once its lease lapses
+                logger.exception("Transcode worker error")
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), TRANSCODE_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _claim(self) -> Optional[dict]:
+        """Take the oldest queued job, or a running one whose worker went away"""
+        now = datetime.utcnow()
+        # Covers the three processes of a job, each bounded by the timeout
+        lease = self.timeout * 3 + timedelta(minutes=1)
+        return await self.db.transcode_jobs.find_one_and_update(
+            {"$or": [{"status": "queued"}, {"status": "running", "lease_until": {"$lt": now}}]},
+            {
+                "$set": {"status": "running", "started_at": now, "lease_until": now + lease},
+                "$inc": {"attempts": 1}
+            },
+            projection={"_id": 0},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _set_media(self, job: dict, fields: dict) -> bool:
+        """Update the job's media entry; False if the video is gone"""
+        updated = await self.media.update(job["owner_type"], job["owner_id"], VIDEO_KIND, job["media_id"], fields)
+        if self.on_updated:
+            await self.on_updated(job["owner_type"], job["owner_id"])
+        return updated
+
+    async def _finish(self, job: dict, status: str, **fields):
+        await self.db.transcode_jobs.update_one(
+            {"id": job["id"]},
+            {"$set": {"status": status, "finished_at": datetime.utcnow(), "lease_until": None, **fields}}
+        )
+
+    async def _process(self, job: dict):
+        if not await self._set_media(job, {"transcode_status": "running"}):
+            await self._finish(job, "cancelled", error="Video was deleted")
+            return
+        try:
+            result = await self._transcode(job)
+        except asyncio.CancelledError:
+            # Shutting down: the lease lapses and the job is picked up again
+            raise
+        except Exception as e:
+            logger.warning(f"Transcode job {job['id']} attempt {job['attempts']} failed: {e}")
+            if job["attempts"] < TRANSCODE_MAX_ATTEMPTS:
+                await self.db.transcode_jobs.update_one(
+                    {"id": job["id"]}, {"$set": {"status": "queued", "error": str(e), "lease_until": None}}
+                )
+                await self._set_media(job, {"transcode_status": "queued"})
+            else:
+                await self._finish(job, "failed", error=str(e))
+                await self._set_media(job, {"transcode_status": "failed"})
+            return
+
+        if not await self._set_media(job, {**result, "transcode_status": "completed"}):
+            # Deleted while transcoding
+            await asyncio.to_thread(
+                self.storage.delete_many,
+                [f"{job['directory']}/{result['web_filename']}", f"{job['directory']}/{result['poster_filename']}"]
+            )
+            await self._finish(job, "cancelled", error="Video was deleted")
+            return
+        await self._finish(job, "completed", result=result, error=None)
+        logger.info(f"Transcode job {job['id']} completed")
+
+    async def _transcode(self, job: dict) -> dict:
+        key = f"{job['directory']}/{job['filename']}"
+        # Object storage hands ffmpeg a presigned URL; local files are read in place
+        source = self.storage.download_url(key) or str(self.storage.path(key))
+        names = derived_filenames(job["filename"])
+        with tempfile.TemporaryDirectory(prefix="transcode_", dir=self.work_dir) as work_dir:
+            web_path = Path(work_dir) / names["web_filename"]
+            poster_path = Path(work_dir) / names["poster_filename"]
+            await self._run(web_video_args(self.ffmpeg, source, web_path))
+            await self._run(poster_args(self.ffmpeg, web_path, poster_path))
+            probe = json.loads(await self._run(probe_args(self.ffprobe, web_path)) or "{}")
+
+            web_size = await asyncio.to_thread(self._store, f"{job['directory']}/{names['web_filename']}", web_path, "video/mp4")
+            await asyncio.to_thread(self._store, f"{job['directory']}/{names['poster_filename']}", poster_path, "image/jpeg")
+
+        stream = (probe.get("streams") or [{}])[0]
+        duration = probe.get("format", {}).get("duration")
+        return {
+            **names,
+            "web_file_size": web_size,
+            "duration": float(duration) if duration else None,
+            "width": stream.get("width"),
+            "height": stream.get("height")
+        }
+
+    def _store(self, key: str, path: Path, content_type: str) -> int:
+        with open(path, "rb") as source:
+            return self.storage.save(key, source, content_type)
+
+    async def _run(self, args: List[str]) -> str:
+        """Run one ffmpeg/ffprobe process and return its stdout"""
+        process = await asyncio.create_subprocess_exec(
+            *args, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout.total_seconds())
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            process.kill()
+            await process.wait()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise TranscodeFailed(f"{Path(args[0]).name} timed out")
+        if process.returncode != 0:
+            message = stderr.decode("utf-8", "replace").strip().splitlines()
+            raise TranscodeFailed(f"{Path(args[0]).name} exited with {process.returncode}: {message[-1] if message else ''}")
+        return stdout.decode("utf-8", "replace")
+
+
+def create_transcoder(db, storage, media, on_updated: Optional[Callable[[str, str], Awaitable[None]]] = None) -> TranscodeWorker:
+    """
+    Build the transcoding worker from environment configuration
+
+    FFMPEG_PATH and FFPROBE_PATH default to the binaries on PATH; without
+    them transcoding is off. TRANSCODE_WORKERS (default half the CPUs)
+    bounds concurrent ffmpeg processes, TRANSCODE_TIMEOUT_SECONDS each
+    process's run time and TRANSCODE_WORK_DIR where outputs are written
+    before they are stored.
+    """
+    work_dir = os.getenv("TRANSCODE_WORK_DIR")
+    return TranscodeWorker(
+        db,
+        storage,
+        media,
+        os.getenv("FFMPEG_PATH") or shutil.which("ffmpeg"),
+        os.getenv("FFPROBE_PATH") or shutil.which("ffprobe"),
+        workers=int(os.getenv("TRANSCODE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2)))),
+        timeout=timedelta(seconds=float(os.getenv("TRANSCODE_TIMEOUT_SECONDS", str(TRANSCODE_TIMEOUT.total_seconds())))),
+        work_dir=Path(work_dir) if work_dir else None,
+        on_updated=on_updated
+    )
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from deletion import MEDIA_FIELDS, MEDIA_ITEM_FILES, media_item_paths, media_paths
+
+logger = logging.getLogger(__name__)
+
+# Files are spread over shards by a hash of their path; each run covers a few
+GC_SHARDS = 64
+GC_SHARDS_PER_RUN = 8
+# Unreferenced files younger than this may belong to an upload still being saved
+GC_GRACE_PERIOD = timedelta(hours=24)
+# Quarantined files are deleted after this long unless they become referenced again
+GC_QUARANTINE_PERIOD = timedelta(days=7)
+GC_STATE_ID = "upload_gc"
+
+
+def path_hash(path: str) -> int:
+    """64-bit hash of an upload path relative to the upload root"""
+    return int.from_bytes(hashlib.blake2b(path.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class ReferenceSet:
+    """
+    Compact membership set of upload paths: a sorted array of 64-bit hashes
+
+    Eight bytes per file instead of a Python string. A hash collision can
+    only make an orphan look referenced, so it is kept, never the reverse.
+    """
+
+    def __init__(self, hashes: Iterable[int]):
+        self.hashes = np.unique(np.fromiter(hashes, dtype=np.uint64))
+
+    def __contains__(self, path_hash_value: int) -> bool:
+        index = np.searchsorted(self.hashes, np.uint64(path_hash_value))
+        return bool(index < len(self.hashes) and self.hashes[index] == path_hash_value)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+
+class UploadGC:
+    """
+    Finds uploaded files no player or club references any more
+
+    Each run takes the next `shards_per_run` of GC_SHARDS hash shards, so
+    only that slice of the reference set is held in memory. It streams
+    the referenced paths from Mongo, walks the upload directories with
+    os.scandir and moves unreferenced files older than the grace period
+    into quarantine. Quarantined files that are referenced again are put
+    back, and those quarantined for longer than the quarantine period are
+    deleted. The position and last report are kept in `upload_gc_state`.
+    """
+
+    def __init__(self, db, upload_dir: Path, quarantine_dir: Path,
+                 grace_period: timedelta = GC_GRACE_PERIOD, quarantine_period: timedelta = GC_QUARANTINE_PERIOD,
+                 shards_per_run: int = GC_SHARDS_PER_RUN, dry_run: bool = False):
+        self.db = db
+        self.upload_dir = Path(upload_dir)
+        self.quarantine_dir = Path(quarantine_dir)
+        self.grace_period = grace_period
+        self.quarantine_period = quarantine_period
+        self.shards_per_run = max(1, min(shards_per_run, GC_SHARDS))
+        self.dry_run = dry_run
+        self.directories = sorted({directory for fields in MEDIA_FIELDS.values() for directory in fields.values()})
+
+    async def run(self) -> dict:
+        """Collect the next shards and return the run's report"""
+        state = await self.db.upload_gc_state.find_one({"id": GC_STATE_ID}, {"_id": 0}) or {}
+        first = state.get("next_shard", 0) % GC_SHARDS
+        shards = {(first + offset) % GC_SHARDS for offset in range(self.shards_per_run)}
+
+        report = {
+            "started_at": datetime.utcnow(),
+            "shards": sorted(shards),
+            "dry_run": self.dry_run,
+            "referenced": 0,
+            "scanned": 0,
+            "quarantined": 0,
+            "quarantined_bytes": 0,
+            "restored": 0,
+            "deleted": 0,
+            "reclaimed_bytes": 0
+        }
+        references = await self._references(shards)
+        report["referenced"] = len(references)
+        await asyncio.to_thread(self._sweep, shards, references, report)
+        report["finished_at"] = datetime.utcnow()
+
+        if not self.dry_run:
+            await self.db.upload_gc_state.update_one(
+                {"id": GC_STATE_ID},
+                {"$set": {"next_shard": (first + self.shards_per_run) % GC_SHARDS, "last_report": report}},
+                upsert=True
+            )
+        logger.info(
+            f"Upload GC shards {report['shards']}: {report['quarantined']} quarantined, "
+            f"{report['deleted']} deleted, {report['reclaimed_bytes']} bytes reclaimed"
+        )
+        return report
+
+    async def _references(self, shards: set) -> ReferenceSet:
+        """Hashes of the upload paths referenced from profiles and media entries that fall in `shards`"""
+        hashes = []
+        for entity_type, collection in [("player", self.db.players), ("club", self.db.clubs)]:
+            projection = {"_id": 0, **{field: 1 for field in MEDIA_FIELDS[entity_type]}}
+            async for document in collection.find({}, projection).batch_size(1000):
+                for path in media_paths(entity_type, document):
+                    value = path_hash(path)
+                    if value % GC_SHARDS in shards:
+                        hashes.append(value)
+        # Photos, videos and gallery images
+        projection = {"_id": 0, "owner_type": 1, "kind": 1, **{field: 1 for field in MEDIA_ITEM_FILES}}
+        async for item in self.db.media.find({}, projection).batch_size(1000):
+            directory = MEDIA_FIELDS[item["owner_type"]][item["kind"]]
+            for path in media_item_paths(directory, item):
+                value = path_hash(path)
+                if value % GC_SHARDS in shards:
+                    hashes.append(value)
+        return ReferenceSet(hashes)
+
+    def _sweep(self, shards: set, references: ReferenceSet, report: dict):
+        now = time.time()
+        grace_cutoff = now - self.grace_period.total_seconds()
+        purge_cutoff = now - self.quarantine_period.total_seconds()
+        for directory in self.directories:
+            # Quarantine first, so files moved there in this run are not purged with it
+            for entry, path, value in self._entries(self.quarantine_dir / directory, directory, shards):
+                if value in references:
+                    self._move(entry.path, self.upload_dir / path)
+                    report["restored"] += 1
+                elif entry.stat().st_mtime < purge_cutoff:
+                    size = entry.stat().st_size
+                    if not self.dry_run:
+                        os.unlink(entry.path)
+                    report["deleted"] += 1
+                    report["reclaimed_bytes"] += size
+
+            for entry, path, value in self._entries(self.upload_dir / directory, directory, shards):
+                report["scanned"] += 1
+                stat = entry.stat()
+                if value in references or stat.st_mtime >= grace_cutoff:
+                    continue
+                self._move(entry.path, self.quarantine_dir / path)
+                if not self.dry_run:
+                    # The quarantine period counts from now
+                    os.utime(self.quarantine_dir / path)
+                report["quarantined"] += 1
+                report["quarantined_bytes"] += stat.st_size
+
+    def _entries(self, root: Path, directory: str, shards: set):
+        """Files directly in `root` whose path hash falls in `shards`, one at a time"""
+        try:
+            iterator = os.scandir(root)
+        except FileNotFoundError:
+            return
+        with iterator:
+            for entry in iterator:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                path = f"{directory}/{entry.name}"
+                value = path_hash(path)
+                if value % GC_SHARDS in shards:
+                    yield entry, path, value
+
+    def _move(self, source: str, target: Path):
+        if self.dry_run:
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+
+
+def create_upload_gc(db, upload_dir: Path, dry_run: bool = False, shards_per_run: Optional[int] = None) -> UploadGC:
+    """
+    Build the collector from environment configuration
+
+    UPLOAD_QUARANTINE_DIR defaults to a directory next to the upload root,
+    outside the statically served tree.
+    """
+    upload_dir = Path(upload_dir)
+    return UploadGC(
+        db,
+        upload_dir,
+        Path(os.getenv("UPLOAD_QUARANTINE_DIR", str(upload_dir.parent / "upload_quarantine"))),
+        grace_period=timedelta(hours=float(os.getenv("UPLOAD_GC_GRACE_HOURS", "24"))),
+        quarantine_period=timedelta(days=float(os.getenv("UPLOAD_GC_QUARANTINE_DAYS", "7"))),
+        shards_per_run=shards_per_run or int(os.getenv("UPLOAD_GC_SHARDS_PER_RUN", str(GC_SHARDS_PER_RUN))),
+        dry_run=dry_run
+    )
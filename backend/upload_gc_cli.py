@@ -0,0 +1,40 @@
+"""
+Quarantine and delete uploaded files that no profile references
+
+Each invocation covers the next slice of the upload tree, so running it
+hourly from cron sweeps everything every few hours without ever holding
+the full reference set in memory.
+
+Usage:
+    python upload_gc_cli.py
+    python upload_gc_cli.py --dry-run --shards-per-run 64
+"""
+import asyncio
+import json
+from typing import Optional
+
+import typer
+
+from server import db, storage
+from storage import LocalStorage
+from upload_gc import create_upload_gc
+
+cli = typer.Typer(add_completion=False)
+
+
+@cli.command()
+def main(
+    shards_per_run: Optional[int] = typer.Option(None, help="Hash shards (of 64) to cover, defaults to UPLOAD_GC_SHARDS_PER_RUN or 8"),
+    dry_run: bool = typer.Option(False, help="Report what would be quarantined or deleted without touching files")
+):
+    if not isinstance(storage, LocalStorage):
+        # Walking a bucket needs a listing-based sweep, which this collector does not do
+        typer.echo("Upload GC only applies to local storage (STORAGE_BACKEND=local)", err=True)
+        raise typer.Exit(code=1)
+    gc = create_upload_gc(db, storage.root, dry_run=dry_run, shards_per_run=shards_per_run)
+    report = asyncio.run(gc.run())
+    typer.echo(json.dumps(report, default=str, indent=2))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,106 @@
+import logging
+from typing import BinaryIO, Optional
+
+try:
+    import magic
+except ImportError:
+    # Container signatures below still cover every accepted type
+    magic = None
+
+logger = logging.getLogger(__name__)
+
+# Bytes of an upload inspected to decide its type; the rest is never read for validation
+SNIFF_BYTES = 8192
+
+ISO_BMFF_LEADING_BOXES = {b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip"}
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _iso_bmff_type(head: bytes) -> Optional[str]:
+    """MP4 or QuickTime from the first box of an ISO base media file"""
+    if len(head) < 12 or head[4:8] not in ISO_BMFF_LEADING_BOXES:
+        return None
+    box_size = int.from_bytes(head[0:4], "big")
+    # 1 means a 64-bit size follows, 0 means the box runs to the end of the file
+    if box_size not in (0, 1) and box_size < 8:
+        return None
+    if head[4:8] != b"ftyp":
+        # Old QuickTime files start with their movie or media data
+        return "video/quicktime"
+    return "video/quicktime" if head[8:12] == b"qt  " else "video/mp4"
+
+
+def container_type(head: bytes) -> Optional[str]:
+    """MIME type from the file signature or container header, if it is one we accept"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        # OLE2 compound document, as written by Word 97-2003
+        return "application/msword"
+    if head.startswith(b"PK\x03\x04"):
+        # A .docx is a zip whose first entries are its content types and word/ parts
+        if b"[Content_Types].xml" in head or b"word/" in head:
+            return DOCX_CONTENT_TYPE
+        return "application/zip"
+    if head.startswith(b"RIFF") and head[8:12] == b"AVI ":
+        return "video/x-msvideo"
+    return _iso_bmff_type(head)
+
+
+def sniff_type(head: bytes) -> Optional[str]:
+    """
+    MIME type of an upload from its first bytes
+
+    Container signatures are checked first; libmagic covers the rest.
+    Returns None if the type cannot be determined.
+    """
+    detected = container_type(head)
+    if detected or magic is None or not head:
+        return detected
+    try:
+        return magic.from_buffer(head, mime=True)
+    except Exception:
+        logger.exception("libmagic failed to identify an upload")
+        return None
+
+
+def validate_file_type(head: bytes, allowed_types: set) -> Optional[str]:
+    """The sniffed MIME type if it is allowed, otherwise None"""
+    detected = sniff_type(head[:SNIFF_BYTES])
+    return detected if detected in allowed_types else None
+
+
+def read_head(stream: BinaryIO, size: int = SNIFF_BYTES) -> bytes:
+    """Up to `size` bytes from the start of a stream, however short its reads"""
+    parts = []
+    remaining = size
+    while remaining > 0:
+        part = stream.read(remaining)
+        if not part:
+            break
+        parts.append(part)
+        remaining -= len(part)
+    return b"".join(parts)
+
+
+class PrefixedReader:
+    """File-like stream that replays an already read head before the rest of `stream`"""
+
+    def __init__(self, head: bytes, stream: BinaryIO):
+        self.head = head
+        self.stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        if not self.head:
+            return self.stream.read(size)
+        if size < 0:
+            data, self.head = self.head + self.stream.read(), b""
+            return data
+        data, self.head = self.head[:size], self.head[size:]
+        return data
@@ -1330,12 +1330,12 @@ class FieldHockeyConnectAPITest(unittest.TestCase):
             else:
                 checks.append("❌ CV")
             
-            if hasattr(cls, 'uploaded_photo') and any(photo.get('filename') == cls.uploaded_photo for photo in player.get('photos', [])):
+            if hasattr(cls, 'uploaded_photo') and any(photo.get('filename') == cls.uploaded_photo for photo in requests.get(f"{BASE_URL}/players/{cls.existing_player_id}/photos").json()):
                 checks.append("✅ Photo")
             else:
                 checks.append("❌ Photo")
             
-            if hasattr(cls, 'uploaded_video') and any(video.get('filename') == cls.uploaded_video for video in player.get('videos', [])):
+            if hasattr(cls, 'uploaded_video') and any(video.get('filename') == cls.uploaded_video for video in requests.get(f"{BASE_URL}/players/{cls.existing_player_id}/videos").json()):
                 checks.append("✅ Video")
             else:
                 checks.append("❌ Video")
@@ -1362,12 +1362,12 @@ class FieldHockeyConnectAPITest(unittest.TestCase):
             else:
                 checks.append("❌ Logo")
             
-            if hasattr(cls, 'uploaded_gallery') and any(img.get('filename') == cls.uploaded_gallery for img in club.get('gallery_images', [])):
+            if hasattr(cls, 'uploaded_gallery') and any(img.get('filename') == cls.uploaded_gallery for img in requests.get(f"{BASE_URL}/clubs/{cls.existing_club_id}/gallery").json()):
                 checks.append("✅ Gallery")
             else:
                 checks.append("❌ Gallery")
             
-            if hasattr(cls, 'uploaded_club_video') and any(video.get('filename') == cls.uploaded_club_video for video in club.get('videos', [])):
+            if hasattr(cls, 'uploaded_club_video') and any(video.get('filename') == cls.uploaded_club_video for video in requests.get(f"{BASE_URL}/clubs/{cls.existing_club_id}/videos").json()):
                 checks.append("✅ Video")
             else:
                 checks.append("❌ Video")
@@ -1509,11 +1509,10 @@ class FieldHockeyConnectAPITest(unittest.TestCase):
         """Test file deletion functionality"""
         print("\n   🔍 Testing file deletion...")
         
-        # Get player profile to find uploaded photo ID
-        response = requests.get(f"{BASE_URL}/players/{cls.existing_player_id}")
+        # List the player's photos to find an uploaded photo ID
+        response = requests.get(f"{BASE_URL}/players/{cls.existing_player_id}/photos")
         if response.status_code == 200:
-            player = response.json()
-            photos = player.get('photos', [])
+            photos = response.json()
             
             if photos:
                 photo_to_delete = photos[0]
@@ -1532,13 +1531,12 @@ class FieldHockeyConnectAPITest(unittest.TestCase):
             else:
                 print("   ⚠️  No photos found to test deletion")
         else:
-            print(f"   ❌ Failed to get player profile for deletion test: {response.status_code}")
+            print(f"   ❌ Failed to list player photos for deletion test: {response.status_code}")
         
-        # Get club profile to find uploaded gallery image ID
-        response = requests.get(f"{BASE_URL}/clubs/{cls.existing_club_id}")
+        # List the club's gallery to find an uploaded gallery image ID
+        response = requests.get(f"{BASE_URL}/clubs/{cls.existing_club_id}/gallery")
         if response.status_code == 200:
-            club = response.json()
-            gallery_images = club.get('gallery_images', [])
+            gallery_images = response.json()
             
             if gallery_images:
                 image_to_delete = gallery_images[0]
@@ -1557,7 +1555,7 @@ class FieldHockeyConnectAPITest(unittest.TestCase):
             else:
                 print("   ⚠️  No gallery images found to test deletion")
         else:
-            print(f"   ❌ Failed to get club profile for deletion test: {response.status_code}")
+            print(f"   ❌ Failed to list club gallery for deletion test: {response.status_code}")
     
     @classmethod
     def test_comprehensive_api_endpoints(cls):
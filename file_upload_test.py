@@ -155,18 +155,18 @@ class FileUploadTest:
                         print(f"❌ Photo access test failed: {photo_response.status_code}")
                         return False
                     
-                    # Get updated player to get the photo ID
-                    player_response = requests.get(f"{BASE_URL}/players/{self.player_id}")
-                    if player_response.status_code == 200:
-                        player_data = player_response.json()
-                        if player_data['photos'] and len(player_data['photos']) > 0:
-                            self.photo_id = player_data['photos'][0]['id']
+                    # List the player's photos to get the photo ID
+                    photos_response = requests.get(f"{BASE_URL}/players/{self.player_id}/photos")
+                    if photos_response.status_code == 200:
+                        photos = photos_response.json()
+                        if photos and len(photos) > 0:
+                            self.photo_id = photos[0]['id']
                             print(f"✅ Photo ID retrieved: {self.photo_id}")
                         else:
                             print("❌ Photo not found in player data")
                             return False
                     else:
-                        print(f"❌ Failed to get player data: {player_response.status_code}")
+                        print(f"❌ Failed to list player photos: {photos_response.status_code}")
                         return False
                 else:
                     print("❌ Photo upload test failed: No filename in response")
@@ -195,18 +195,18 @@ class FileUploadTest:
                         print(f"❌ Video access test failed: {video_response.status_code}")
                         return False
                     
-                    # Get updated player to get the video ID
-                    player_response = requests.get(f"{BASE_URL}/players/{self.player_id}")
-                    if player_response.status_code == 200:
-                        player_data = player_response.json()
-                        if player_data['videos'] and len(player_data['videos']) > 0:
-                            self.video_id = player_data['videos'][0]['id']
+                    # List the player's videos to get the video ID
+                    videos_response = requests.get(f"{BASE_URL}/players/{self.player_id}/videos")
+                    if videos_response.status_code == 200:
+                        videos = videos_response.json()
+                        if videos and len(videos) > 0:
+                            self.video_id = videos[0]['id']
                             print(f"✅ Video ID retrieved: {self.video_id}")
                         else:
                             print("❌ Video not found in player data")
                             return False
                     else:
-                        print(f"❌ Failed to get player data: {player_response.status_code}")
+                        print(f"❌ Failed to list player videos: {videos_response.status_code}")
                         return False
                 else:
                     print("❌ Video upload test failed: No filename in response")
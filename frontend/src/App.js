@@ -110,7 +110,6 @@ function App() {
 
 function MainApp() {
   const [currentView, setCurrentView] = useState("home");
-  const [players, setPlayers] = useState([]);
   const [clubs, setClubs] = useState([]);
   const [vacancies, setVacancies] = useState([]);
   const [applications, setApplications] = useState([]);
@@ -152,16 +151,21 @@ function MainApp() {
 
   const loadData = async () => {
     try {
-      const [playersRes, clubsRes, vacanciesRes, applicationsRes] = await Promise.all([
-        axios.get(`${API}/players`),
-        axios.get(`${API}/clubs`),
+      const [vacanciesRes, applicationsRes] = await Promise.all([
         axios.get(`${API}/vacancies`),
         axios.get(`${API}/applications`)
       ]);
-      setPlayers(playersRes.data);
-      setClubs(clubsRes.data);
       setVacancies(vacanciesRes.data);
       setApplications(applicationsRes.data);
+
+      // Only the clubs of the listed vacancies, for their logos
+      const clubIds = [...new Set(vacanciesRes.data.map(vacancy => vacancy.club_id))];
+      if (clubIds.length > 0) {
+        const clubsRes = await axios.get(`${API}/clubs`, { params: { ids: clubIds.join(','), view: 'card' } });
+        setClubs(clubsRes.data);
+      } else {
+        setClubs([]);
+      }
     } catch (error) {
       console.error("Error loading data:", error);
     }
@@ -1,5 +1,6 @@
 import React, { useState, useRef } from 'react';
 import axios from 'axios';
+import useMediaList from './useMediaList';
 import './ClubProfile.css';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -24,6 +25,8 @@ const ClubProfile = ({ club, onClubUpdate }) => {
   });
   const [uploading, setUploading] = useState(false);
   const [uploadProgress, setUploadProgress] = useState({});
+  const gallery = useMediaList(`clubs/${club.id}/gallery`, club.updated_at);
+  const videos = useMediaList(`clubs/${club.id}/videos`, club.updated_at);
   
   const logoInputRef = useRef(null);
   const galleryInputRef = useRef(null);
@@ -452,8 +455,8 @@ const ClubProfile = ({ club, onClubUpdate }) => {
           </div>
           
           <div className="media-grid-modern">
-            {club.gallery_images && club.gallery_images.length > 0 ? (
-              club.gallery_images.map((image) => (
+            {gallery.items.length > 0 ? (
+              gallery.items.map((image) => (
                 <div key={image.id} className="media-card">
                   <div className="media-thumbnail-container">
                     <img 
@@ -490,6 +493,11 @@ const ClubProfile = ({ club, onClubUpdate }) => {
               </div>
             )}
           </div>
+          {gallery.hasMore && (
+            <button className="upload-btn-modern secondary load-more-btn" onClick={gallery.loadMore} disabled={gallery.loading}>
+              {gallery.loading ? 'Loading...' : 'Load more'}
+            </button>
+          )}
           
           {uploadProgress.gallery !== undefined && (
             <div className="upload-progress-modern">
@@ -526,12 +534,13 @@ const ClubProfile = ({ club, onClubUpdate }) => {
           </div>
           
           <div className="media-grid-modern">
-            {club.videos && club.videos.length > 0 ? (
-              club.videos.map((video) => (
+            {videos.items.length > 0 ? (
+              videos.items.map((video) => (
                 <div key={video.id} className="media-card">
                   <div className="media-thumbnail-container">
                     <video 
-                      src={`${BACKEND_URL}/api/uploads/club_videos/${video.filename}`} 
+                      src={`${BACKEND_URL}/api/uploads/club_videos/${video.web_filename || video.filename}`} 
+                      poster={video.poster_filename ? `${BACKEND_URL}/api/uploads/club_videos/${video.poster_filename}` : undefined}
                       className="media-thumbnail-modern"
                       controls
                       preload="metadata"
@@ -567,6 +576,11 @@ const ClubProfile = ({ club, onClubUpdate }) => {
               </div>
             )}
           </div>
+          {videos.hasMore && (
+            <button className="upload-btn-modern secondary load-more-btn" onClick={videos.loadMore} disabled={videos.loading}>
+              {videos.loading ? 'Loading...' : 'Load more'}
+            </button>
+          )}
           
           {uploadProgress.video !== undefined && (
             <div className="upload-progress-modern">
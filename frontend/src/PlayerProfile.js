@@ -1,5 +1,6 @@
 import React, { useState, useRef } from 'react';
 import axios from 'axios';
+import useMediaList from './useMediaList';
 import './PlayerProfile.css';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -18,6 +19,8 @@ const PlayerProfile = ({ player, onPlayerUpdate }) => {
   });
   const [uploading, setUploading] = useState(false);
   const [uploadProgress, setUploadProgress] = useState({});
+  const photos = useMediaList(`players/${player.id}/photos`, player.updated_at);
+  const videos = useMediaList(`players/${player.id}/videos`, player.updated_at);
   
   const avatarInputRef = useRef(null);
   const cvInputRef = useRef(null);
@@ -455,8 +458,8 @@ const PlayerProfile = ({ player, onPlayerUpdate }) => {
           </div>
           
           <div className="media-grid-modern">
-            {player.photos && player.photos.length > 0 ? (
-              player.photos.map((photo) => (
+            {photos.items.length > 0 ? (
+              photos.items.map((photo) => (
                 <div key={photo.id} className="media-card">
                   <div className="media-thumbnail-container">
                     <img 
@@ -493,6 +496,11 @@ const PlayerProfile = ({ player, onPlayerUpdate }) => {
               </div>
             )}
           </div>
+          {photos.hasMore && (
+            <button className="upload-btn-modern secondary load-more-btn" onClick={photos.loadMore} disabled={photos.loading}>
+              {photos.loading ? 'Loading...' : 'Load more'}
+            </button>
+          )}
           
           {uploadProgress.photo !== undefined && (
             <div className="upload-progress-modern">
@@ -532,12 +540,13 @@ const PlayerProfile = ({ player, onPlayerUpdate }) => {
           </div>
           
           <div className="media-grid-modern">
-            {player.videos && player.videos.length > 0 ? (
-              player.videos.map((video) => (
+            {videos.items.length > 0 ? (
+              videos.items.map((video) => (
                 <div key={video.id} className="media-card">
                   <div className="media-thumbnail-container">
                     <video 
-                      src={`${BACKEND_URL}/api/uploads/videos/${video.filename}`} 
+                      src={`${BACKEND_URL}/api/uploads/videos/${video.web_filename || video.filename}`} 
+                      poster={video.poster_filename ? `${BACKEND_URL}/api/uploads/videos/${video.poster_filename}` : undefined}
                       className="media-thumbnail-modern"
                       controls
                       preload="metadata"
@@ -589,6 +598,11 @@ const PlayerProfile = ({ player, onPlayerUpdate }) => {
               </div>
             )}
           </div>
+          {videos.hasMore && (
+            <button className="upload-btn-modern secondary load-more-btn" onClick={videos.loadMore} disabled={videos.loading}>
+              {videos.loading ? 'Loading...' : 'Load more'}
+            </button>
+          )}
           
           {uploadProgress.video !== undefined && (
             <div className="upload-progress-modern">
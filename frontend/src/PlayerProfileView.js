@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import useMediaList from './useMediaList';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -8,6 +9,8 @@ const PlayerProfileView = ({ playerId, onClose }) => {
   const [player, setPlayer] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const photos = useMediaList(`players/${playerId}/photos`);
+  const videos = useMediaList(`players/${playerId}/videos`);
 
   useEffect(() => {
     const fetchPlayerProfile = async () => {
@@ -111,32 +114,49 @@ const PlayerProfileView = ({ playerId, onClose }) => {
             </div>
           )}
 
-          {player.photos && player.photos.length > 0 && (
+          {photos.items.length > 0 && (
             <div className="profile-section">
               <h3>Photos</h3>
               <div className="media-grid">
-                {player.photos.map((photo, index) => (
+                {photos.items.map((photo, index) => (
                   <div key={index} className="media-item">
                     <img src={getImageUrl(photo.filename)} alt={`Photo ${index + 1}`} />
                   </div>
                 ))}
               </div>
+              {photos.hasMore && (
+                <button className="load-more-btn" onClick={photos.loadMore} disabled={photos.loading}>
+                  {photos.loading ? 'Loading...' : 'Load more'}
+                </button>
+              )}
             </div>
           )}
 
-          {player.videos && player.videos.length > 0 && (
+          {videos.items.length > 0 && (
             <div className="profile-section">
               <h3>Videos</h3>
               <div className="media-grid">
-                {player.videos.map((video, index) => (
+                {videos.items.map((video, index) => (
                   <div key={index} className="media-item">
-                    <video controls>
-                      <source src={getImageUrl(video.filename)} type="video/mp4" />
+                    <video
+                      controls
+                      preload="metadata"
+                      poster={video.poster_filename ? `${BACKEND_URL}/api/uploads/videos/${video.poster_filename}` : undefined}
+                    >
+                      <source
+                        src={`${BACKEND_URL}/api/uploads/videos/${video.web_filename || video.filename}`}
+                        type={video.web_filename ? "video/mp4" : undefined}
+                      />
                       Your browser does not support the video tag.
                     </video>
                   </div>
                 ))}
               </div>
+              {videos.hasMore && (
+                <button className="load-more-btn" onClick={videos.loadMore} disabled={videos.loading}>
+                  {videos.loading ? 'Loading...' : 'Load more'}
+                </button>
+              )}
             </div>
           )}
 
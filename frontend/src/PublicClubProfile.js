@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import useMediaList from './useMediaList';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -12,6 +13,8 @@ const PublicClubProfile = ({ onContactClub }) => {
   const [vacancies, setVacancies] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const gallery = useMediaList(`clubs/${clubId}/gallery`);
+  const videos = useMediaList(`clubs/${clubId}/videos`);
 
   useEffect(() => {
     const fetchClubData = async () => {
@@ -202,33 +205,50 @@ const PublicClubProfile = ({ onContactClub }) => {
           )}
 
           {/* Gallery */}
-          {club.gallery_images && club.gallery_images.length > 0 && (
+          {gallery.items.length > 0 && (
             <div className="profile-section">
               <h3>Gallery</h3>
               <div className="media-gallery">
-                {club.gallery_images.map((image, index) => (
+                {gallery.items.map((image, index) => (
                   <div key={index} className="media-item">
                     <img src={getImageUrl(image.filename)} alt={`Gallery ${index + 1}`} />
                   </div>
                 ))}
               </div>
+              {gallery.hasMore && (
+                <button className="load-more-btn" onClick={gallery.loadMore} disabled={gallery.loading}>
+                  {gallery.loading ? 'Loading...' : 'Load more'}
+                </button>
+              )}
             </div>
           )}
 
           {/* Videos */}
-          {club.videos && club.videos.length > 0 && (
+          {videos.items.length > 0 && (
             <div className="profile-section">
               <h3>Club Videos</h3>
               <div className="media-gallery">
-                {club.videos.map((video, index) => (
+                {videos.items.map((video, index) => (
                   <div key={index} className="media-item">
-                    <video controls poster="">
-                      <source src={getImageUrl(video.filename)} type="video/mp4" />
+                    <video
+                      controls
+                      preload="metadata"
+                      poster={video.poster_filename ? `${BACKEND_URL}/api/uploads/club_videos/${video.poster_filename}` : undefined}
+                    >
+                      <source
+                        src={`${BACKEND_URL}/api/uploads/club_videos/${video.web_filename || video.filename}`}
+                        type={video.web_filename ? "video/mp4" : undefined}
+                      />
                       Your browser does not support the video tag.
                     </video>
                   </div>
                 ))}
               </div>
+              {videos.hasMore && (
+                <button className="load-more-btn" onClick={videos.loadMore} disabled={videos.loading}>
+                  {videos.loading ? 'Loading...' : 'Load more'}
+                </button>
+              )}
             </div>
           )}
         </div>
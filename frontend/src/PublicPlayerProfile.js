@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import useMediaList from './useMediaList';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -11,6 +12,8 @@ const PublicPlayerProfile = ({ onContactPlayer }) => {
   const [player, setPlayer] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const photos = useMediaList(`players/${playerId}/photos`);
+  const videos = useMediaList(`players/${playerId}/videos`);
 
   useEffect(() => {
     const fetchPlayerProfile = async () => {
@@ -163,33 +166,50 @@ const PublicPlayerProfile = ({ onContactPlayer }) => {
           </div>
 
           {/* Media Gallery */}
-          {player.photos && player.photos.length > 0 && (
+          {photos.items.length > 0 && (
             <div className="profile-section">
               <h3>Photo Gallery</h3>
               <div className="media-gallery">
-                {player.photos.map((photo, index) => (
+                {photos.items.map((photo, index) => (
                   <div key={index} className="media-item">
                     <img src={getImageUrl(photo.filename)} alt={`Photo ${index + 1}`} />
                   </div>
                 ))}
               </div>
+              {photos.hasMore && (
+                <button className="load-more-btn" onClick={photos.loadMore} disabled={photos.loading}>
+                  {photos.loading ? 'Loading...' : 'Load more'}
+                </button>
+              )}
             </div>
           )}
 
           {/* Highlight Videos */}
-          {player.videos && player.videos.length > 0 && (
+          {videos.items.length > 0 && (
             <div className="profile-section">
               <h3>Highlight Videos</h3>
               <div className="media-gallery">
-                {player.videos.map((video, index) => (
+                {videos.items.map((video, index) => (
                   <div key={index} className="media-item">
-                    <video controls poster="">
-                      <source src={getImageUrl(video.filename)} type="video/mp4" />
+                    <video
+                      controls
+                      preload="metadata"
+                      poster={video.poster_filename ? `${BACKEND_URL}/api/uploads/videos/${video.poster_filename}` : undefined}
+                    >
+                      <source
+                        src={`${BACKEND_URL}/api/uploads/videos/${video.web_filename || video.filename}`}
+                        type={video.web_filename ? "video/mp4" : undefined}
+                      />
                       Your browser does not support the video tag.
                     </video>
                   </div>
                 ))}
               </div>
+              {videos.hasMore && (
+                <button className="load-more-btn" onClick={videos.loadMore} disabled={videos.loading}>
+                  {videos.loading ? 'Loading...' : 'Load more'}
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -0,0 +1,43 @@
+import { useState, useEffect, useCallback } from 'react';
+import axios from 'axios';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+const API = `${BACKEND_URL}/api`;
+const PAGE_SIZE = 24;
+
+// Photos, videos or gallery images of a profile, newest first, a page at a time.
+// `path` is the listing endpoint, e.g. `players/${id}/photos`; a new `refreshKey`
+// (the profile's updated_at) reloads the first page after uploads and deletes.
+const useMediaList = (path, refreshKey) => {
+  const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(false);
+
+  const fetchPage = useCallback(async (cursor) => {
+    setLoading(true);
+    try {
+      const response = await axios.get(`${API}/${path}`, {
+        params: { limit: PAGE_SIZE, cursor: cursor || undefined }
+      });
+      setItems(prev => (cursor ? [...prev, ...response.data] : response.data));
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error(`Error fetching ${path}:`, error);
+    } finally {
+      setLoading(false);
+    }
+  }, [path]);
+
+  useEffect(() => {
+    fetchPage(null);
+  }, [fetchPage, refreshKey]);
+
+  return {
+    items,
+    hasMore: Boolean(nextCursor),
+    loading,
+    loadMore: () => fetchPage(nextCursor)
+  };
+};
+
+export default useMediaList;
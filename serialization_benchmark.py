@@ -0,0 +1,124 @@
+"""
+Micro-benchmark: validated vs trusted serialization of list endpoint payloads
+
+Compares the classic handler path (build models from Mongo documents, then let
+FastAPI dump, re-validate against response_model and encode) with the trusted
+path used by the list endpoints (trusted_rows + FastJSONResponse).
+
+Usage:
+    python serialization_benchmark.py [rows ...]
+"""
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from fast_json import FastJSONResponse, orjson, trusted_rows
+from server import Application, Message, Player, Vacancy
+
+
+def make_vacancy(i):
+    now = datetime.utcnow()
+    return {
+        "id": str(uuid.uuid4()), "club_id": str(uuid.uuid4()), "club_name": f"Club {i}",
+        "position": "Midfielder", "title": f"First team midfielder {i}",
+        "description": "We are looking for a committed midfielder to join our first team squad. " * 4,
+        "requirements": "Minimum two seasons at national league level.", "experience_level": "Advanced",
+        "location": "Amsterdam, Netherlands", "salary_range": "25000-35000", "contract_type": "Full-time",
+        "start_date": "2025-08-01", "application_deadline": now + timedelta(days=30),
+        "benefits": ["Visa", "Accommodation", "Transport"], "status": "active", "priority": "normal",
+        "views_count": i * 3, "applications_count": i, "created_at": now, "updated_at": now, "published_at": now
+    }
+
+
+def make_application(i):
+    now = datetime.utcnow()
+    return {
+        "id": str(uuid.uuid4()), "player_id": str(uuid.uuid4()), "player_name": f"Player {i}",
+        "player_position": "Forward", "player_location": "Utrecht", "player_experience": "Intermediate",
+        "vacancy_id": str(uuid.uuid4()), "vacancy_title": "Striker", "vacancy_position": "Forward",
+        "club_name": f"Club {i}", "status": "pending", "priority": "normal", "rating": 4,
+        "notes": "Strong in the circle.", "cover_letter": "I would love to join your club. " * 5,
+        "applied_at": now, "updated_at": now
+    }
+
+
+def make_message(i):
+    now = datetime.utcnow()
+    return {
+        "id": str(uuid.uuid4()), "conversation_id": str(uuid.uuid4()), "sender_id": str(uuid.uuid4()),
+        "sender_type": "club", "sender_name": f"Club {i}", "receiver_id": str(uuid.uuid4()),
+        "receiver_type": "player", "receiver_name": f"Player {i}", "subject": "Trial invitation",
+        "content": "Thanks for applying, we would like to invite you to a trial session. " * 2,
+        "is_read": False, "is_deleted_by_sender": False, "is_deleted_by_receiver": False,
+        "created_at": now, "updated_at": now
+    }
+
+
+def make_player(i):
+    now = datetime.utcnow()
+    media = {
+        "id": str(uuid.uuid4()), "filename": f"{uuid.uuid4()}.jpg", "original_name": "match.jpg",
+        "file_type": "image/jpeg", "file_size": 204800, "uploaded_at": now
+    }
+    return {
+        "id": str(uuid.uuid4()), "name": f"Player {i}", "email": f"player{i}@example.com",
+        "country": "Netherlands", "position": "Defender", "experience_level": "Professional",
+        "location": "Rotterdam", "bio": "Left-sided defender with strong aerial ability. " * 3, "age": 24,
+        "avatar": f"{uuid.uuid4()}.jpg", "cv_document": f"{uuid.uuid4()}.pdf",
+        "photos": [dict(media) for _ in range(4)], "videos": [], "is_verified": True,
+        "created_at": now, "updated_at": now
+    }
+
+
+def validated_path(model, documents):
+    """Handler builds models, FastAPI dumps, re-validates and encodes them"""
+    models = [model(**document) for document in documents]
+    adapter = TypeAdapter(List[model])
+    content = [item.model_dump(by_alias=True) for item in models]
+    value = adapter.validate_python(content)
+    return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+
+def trusted_path(model, documents):
+    return FastJSONResponse(trusted_rows(model, documents)).body
+
+
+def bench(func, model, documents, repeat=5):
+    number = max(1, 2000 // len(documents))
+    best = min(timeit.repeat(lambda: func(model, documents), number=number, repeat=repeat))
+    return best / number * 1000
+
+
+def main():
+    row_counts = [int(arg) for arg in sys.argv[1:]] or [100, 1000]
+    cases = [
+        ("vacancies", Vacancy, make_vacancy),
+        ("applications", Application, make_application),
+        ("messages", Message, make_message),
+        ("players", Player, make_player)
+    ]
+
+    print(f"JSON encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(f"{'payload':<14}{'rows':>6}{'validated ms':>15}{'trusted ms':>13}{'saved ms':>11}{'speedup':>10}")
+    for name, model, factory in cases:
+        for rows in row_counts:
+            documents = [factory(i) for i in range(rows)]
+            assert len(trusted_path(model, documents)) > 0
+            validated_ms = bench(validated_path, model, documents)
+            trusted_ms = bench(trusted_path, model, documents)
+            print(
+                f"{name:<14}{rows:>6}{validated_ms:>15.2f}{trusted_ms:>13.2f}"
+                f"{validated_ms - trusted_ms:>11.2f}{validated_ms / trusted_ms:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import csv
+import io
+import requests
+import unittest
+import uuid
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+
+class ApplicantExportTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        cls.password = "TestPassword123!"
+
+        # Register a test club
+        club_email = f"club_{cls.test_id}@test.com"
+        club_data = {
+            "name": f"Test Club {cls.test_id}",
+            "email": club_email,
+            "password": cls.password,
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/clubs", json=club_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test club: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        clubs = requests.get(f"{BASE_URL}/clubs").json()
+        cls.club_id = next(club["id"] for club in clubs if club["email"] == club_email)
+        print(f"✅ Test club created with ID: {cls.club_id}")
+
+        # Create a test vacancy
+        vacancy_data = {
+            "club_id": cls.club_id,
+            "position": "Forward",
+            "title": f"Export Vacancy {cls.test_id}",
+            "description": "Test vacancy description",
+            "experience_level": "Intermediate",
+            "location": "Test City",
+            "status": "active"
+        }
+        response = requests.post(f"{BASE_URL}/vacancies", json=vacancy_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test vacancy: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+        cls.vacancy_id = response.json()["id"]
+
+        # Register test players and apply
+        player_emails = []
+        for i in range(2):
+            player_email = f"player_{i}_{cls.test_id}@test.com"
+            player_data = {
+                "name": f"Test Player {i} {cls.test_id}",
+                "email": player_email,
+                "password": cls.password,
+                "position": "Forward",
+                "experience_level": "Intermediate",
+                "location": "Test City"
+            }
+            requests.post(f"{BASE_URL}/players", json=player_data)
+            player_emails.append(player_email)
+
+        players = requests.get(f"{BASE_URL}/players").json()
+        cls.player_ids = [player["id"] for player in players if player["email"] in player_emails]
+        for player_id in cls.player_ids:
+            application_data = {
+                "player_id": player_id,
+                "vacancy_id": cls.vacancy_id,
+                "cover_letter": "=HYPERLINK(\"http://example.com\")"
+            }
+            requests.post(f"{BASE_URL}/applications", json=application_data)
+        print(f"✅ Test applications created: {len(cls.player_ids)}")
+
+    def test_01_csv_export(self):
+        """Test exporting applicants as CSV"""
+        print("\n🔍 Testing CSV applicant export...")
+
+        response = requests.get(f"{BASE_URL}/clubs/{self.club_id}/applications/export")
+
+        self.assertEqual(response.status_code, 200, f"Failed to export applicants: {response.text}")
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        self.assertIn("attachment", response.headers.get("content-disposition", ""))
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        self.assertEqual(len(rows), len(self.player_ids))
+        self.assertEqual({row["player_id"] for row in rows}, set(self.player_ids))
+        for row in rows:
+            self.assertEqual(row["vacancy_id"], self.vacancy_id)
+            self.assertTrue(row["player_email"].endswith("@test.com"))
+            # Formula-like values must not be exported as live formulas
+            self.assertTrue(row["cover_letter"].startswith("'="))
+
+        print("✅ CSV applicant export test passed")
+
+    def test_02_xlsx_export(self):
+        """Test exporting applicants as XLSX"""
+        print("\n🔍 Testing XLSX applicant export...")
+
+        response = requests.get(f"{BASE_URL}/clubs/{self.club_id}/applications/export", params={"format": "xlsx"})
+
+        self.assertEqual(response.status_code, 200, f"Failed to export applicants: {response.text}")
+        self.assertEqual(
+            response.headers["content-type"],
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        # XLSX files are zip archives
+        self.assertTrue(response.content.startswith(b"PK"))
+
+        print("✅ XLSX applicant export test passed")
+
+    def test_03_export_unknown_club(self):
+        """Test exporting applicants for a club that does not exist"""
+        print("\n🔍 Testing export for unknown club...")
+
+        response = requests.get(f"{BASE_URL}/clubs/{uuid.uuid4()}/applications/export")
+        self.assertEqual(response.status_code, 404)
+
+        print("✅ Unknown club export test passed")
+
+if __name__ == "__main__":
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,94 @@
+import json
+import os
+import requests
+import unittest
+import uuid
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+
+# Must match IMPORT_API_KEY on the backend
+IMPORT_API_KEY = os.environ.get("IMPORT_API_KEY")
+
+@unittest.skipUnless(IMPORT_API_KEY, "IMPORT_API_KEY not set")
+class BulkImportTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        cls.headers = {"X-Import-Key": IMPORT_API_KEY}
+        cls.club_email = f"import_club_{cls.test_id}@test.com"
+
+    def test_01_import_requires_key(self):
+        """Test that imports are rejected without the import key"""
+        print("\n🔍 Testing import without key...")
+
+        files = {"file": ("players.csv", b"name,email\n", "text/csv")}
+        response = requests.post(f"{BASE_URL}/import/players", files=files)
+        self.assertEqual(response.status_code, 403)
+
+        print("✅ Import key test passed")
+
+    def test_02_import_players_csv(self):
+        """Test importing players from CSV, reporting invalid rows by line"""
+        print("\n🔍 Testing player CSV import...")
+
+        content = (
+            "name,email,password,position,experience_level,location,age\n"
+            f"Import Player A,import_a_{self.test_id}@test.com,TestPassword123!,Forward,Advanced,Test City,22\n"
+            f"Import Player B,import_b_{self.test_id}@test.com,TestPassword123!,Defender,Beginner,Test City,not-a-number\n"
+            f"Import Player C,import_a_{self.test_id}@test.com,TestPassword123!,Forward,Advanced,Test City,\n"
+        )
+        files = {"file": ("players.csv", content.encode(), "text/csv")}
+        response = requests.post(
+            f"{BASE_URL}/import/players",
+            files=files,
+            params={"send_verification": "false"},
+            headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, 200, f"Failed to import players: {response.text}")
+        report = response.json()
+        self.assertEqual(report["total"], 3)
+        self.assertEqual(report["inserted"], 1)
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual([error["line"] for error in report["errors"]], [3, 4])
+
+        players = requests.get(f"{BASE_URL}/players").json()
+        self.assertTrue(any(player["email"] == f"import_a_{self.test_id}@test.com" for player in players))
+
+        print("✅ Player CSV import test passed")
+
+    def test_03_import_clubs_and_vacancies_ndjson(self):
+        """Test importing a club and a vacancy that refers to it by email"""
+        print("\n🔍 Testing club and vacancy NDJSON import...")
+
+        club = {"name": f"Import Club {self.test_id}", "email": self.club_email, "password": "TestPassword123!", "location": "Test City"}
+        files = {"file": ("clubs.ndjson", (json.dumps(club) + "\n").encode(), "application/x-ndjson")}
+        response = requests.post(f"{BASE_URL}/import/clubs", files=files, headers=self.headers)
+        self.assertEqual(response.status_code, 200, f"Failed to import clubs: {response.text}")
+        self.assertEqual(response.json()["inserted"], 1)
+
+        vacancy = {
+            "club_email": self.club_email,
+            "position": "Midfielder",
+            "title": f"Import Vacancy {self.test_id}",
+            "description": "Imported vacancy",
+            "experience_level": "Intermediate",
+            "location": "Test City",
+            "benefits": ["Visa"]
+        }
+        files = {"file": ("vacancies.ndjson", (json.dumps(vacancy) + "\n").encode(), "application/x-ndjson")}
+        response = requests.post(f"{BASE_URL}/import/vacancies", files=files, headers=self.headers)
+        self.assertEqual(response.status_code, 200, f"Failed to import vacancies: {response.text}")
+        self.assertEqual(response.json()["inserted"], 1)
+
+        vacancies = requests.get(f"{BASE_URL}/vacancies", params={"limit": 500}).json()
+        imported = [item for item in vacancies if item["title"] == f"Import Vacancy {self.test_id}"]
+        self.assertEqual(len(imported), 1)
+        self.assertEqual(imported[0]["club_name"], f"Import Club {self.test_id}")
+
+        print("✅ Club and vacancy NDJSON import test passed")
+
+if __name__ == "__main__":
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,127 @@
+import requests
+import unittest
+import uuid
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+
+class BulkMessagingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        cls.password = "TestPassword123!"
+
+        # Register a test club
+        club_email = f"club_{cls.test_id}@test.com"
+        club_data = {
+            "name": f"Test Club {cls.test_id}",
+            "email": club_email,
+            "password": cls.password,
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/clubs", json=club_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test club: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        clubs = requests.get(f"{BASE_URL}/clubs").json()
+        cls.club_id = next(club["id"] for club in clubs if club["email"] == club_email)
+        print(f"✅ Test club created with ID: {cls.club_id}")
+
+        # Register test players
+        player_emails = []
+        for i in range(3):
+            player_email = f"player_{i}_{cls.test_id}@test.com"
+            player_data = {
+                "name": f"Test Player {i} {cls.test_id}",
+                "email": player_email,
+                "password": cls.password,
+                "position": "Forward",
+                "experience_level": "Intermediate",
+                "location": "Test City"
+            }
+            response = requests.post(f"{BASE_URL}/players", json=player_data)
+            if response.status_code != 200:
+                print(f"❌ Failed to create test player {i}: {response.status_code} - {response.text}")
+                raise Exception("Test setup failed")
+            player_emails.append(player_email)
+
+        players = requests.get(f"{BASE_URL}/players").json()
+        cls.player_ids = [player["id"] for player in players if player["email"] in player_emails]
+        print(f"✅ Test players created: {len(cls.player_ids)}")
+
+    def test_01_bulk_send(self):
+        """Test sending one message to several players"""
+        print("\n🔍 Testing bulk message send...")
+
+        missing_id = str(uuid.uuid4())
+        bulk_data = {
+            "receiver_ids": self.player_ids + [missing_id],
+            "receiver_type": "player",
+            "subject": "Trial invitation",
+            "content": "You have been shortlisted for a trial."
+        }
+
+        response = requests.post(
+            f"{BASE_URL}/messages/bulk-send",
+            params={"sender_id": self.club_id, "sender_type": "club"},
+            json=bulk_data
+        )
+
+        self.assertEqual(response.status_code, 200, f"Failed to bulk send: {response.text}")
+
+        result = response.json()
+        self.assertEqual(result["sent_count"], len(self.player_ids))
+        self.assertEqual(result["failed_count"], 1)
+
+        statuses = {item["receiver_id"]: item["status"] for item in result["results"]}
+        self.assertEqual(statuses[missing_id], "not_found")
+        for player_id in self.player_ids:
+            self.assertEqual(statuses[player_id], "sent")
+
+        print("✅ Bulk message send test passed")
+
+    def test_02_bulk_send_reuses_conversations(self):
+        """Test that a second bulk send lands in the existing conversations"""
+        print("\n🔍 Testing bulk send conversation reuse...")
+
+        response = requests.post(
+            f"{BASE_URL}/messages/bulk-send",
+            params={"sender_id": self.club_id, "sender_type": "club"},
+            json={"receiver_ids": self.player_ids, "receiver_type": "player", "content": "Follow-up"}
+        )
+        self.assertEqual(response.status_code, 200, f"Failed to bulk send: {response.text}")
+
+        response = requests.get(f"{BASE_URL}/conversations/{self.club_id}/club/list")
+        self.assertEqual(response.status_code, 200, f"Failed to list conversations: {response.text}")
+        self.assertEqual(len(response.json()), len(self.player_ids))
+
+        for player_id in self.player_ids:
+            response = requests.get(f"{BASE_URL}/messages/unread-count/{player_id}/player")
+            self.assertEqual(response.json()["unread_count"], 2)
+
+        print("✅ Bulk send conversation reuse test passed")
+
+    def test_03_bulk_send_limits(self):
+        """Test bulk send input validation"""
+        print("\n🔍 Testing bulk send validation...")
+
+        response = requests.post(
+            f"{BASE_URL}/messages/bulk-send",
+            params={"sender_id": self.club_id, "sender_type": "club"},
+            json={"receiver_ids": [], "receiver_type": "player", "content": "Nobody"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = requests.post(
+            f"{BASE_URL}/messages/bulk-send",
+            params={"sender_id": self.club_id, "sender_type": "club"},
+            json={"receiver_ids": [str(uuid.uuid4()) for _ in range(501)], "receiver_type": "player", "content": "Everyone"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+        print("✅ Bulk send validation test passed")
+
+if __name__ == "__main__":
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,154 @@
+import jwt
+import os
+import requests
+import time
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+# The server's session signing key, to sign in without going through email verification
+JWT_SECRET = os.environ.get("JWT_SECRET")
+
+def session_headers(user_id: str, user_type: str) -> dict:
+    """Bearer header for a session token as login would issue it"""
+    now = datetime.utcnow()
+    payload = {"sub": user_id, "type": user_type, "name": "", "iat": now, "exp": now + timedelta(hours=1)}
+    return {"Authorization": f"Bearer {jwt.encode(payload, JWT_SECRET, algorithm='HS256')}"}
+
+class CascadingDeleteTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if not JWT_SECRET:
+            raise unittest.SkipTest("JWT_SECRET must be set to sign in as the test accounts")
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        cls.password = "TestPassword123!"
+
+        # Register a test club
+        club_email = f"club_{cls.test_id}@test.com"
+        club_data = {
+            "name": f"Test Club {cls.test_id}",
+            "email": club_email,
+            "password": cls.password,
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/clubs", json=club_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test club: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        clubs = requests.get(f"{BASE_URL}/clubs").json()
+        cls.club_id = next(club["id"] for club in clubs if club["email"] == club_email)
+
+        vacancy_data = {
+            "club_id": cls.club_id,
+            "position": "Defender",
+            "title": f"Delete Vacancy {cls.test_id}",
+            "description": "Test vacancy description",
+            "experience_level": "Intermediate",
+            "location": "Test City",
+            "status": "active"
+        }
+        response = requests.post(f"{BASE_URL}/vacancies", json=vacancy_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test vacancy: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+        cls.vacancy_id = response.json()["id"]
+
+        # Register a test player who applies and messages the club
+        player_email = f"player_{cls.test_id}@test.com"
+        player_data = {
+            "name": f"Test Player {cls.test_id}",
+            "email": player_email,
+            "password": cls.password,
+            "position": "Defender",
+            "experience_level": "Intermediate",
+            "location": "Test City"
+        }
+        requests.post(f"{BASE_URL}/players", json=player_data)
+        players = requests.get(f"{BASE_URL}/players").json()
+        cls.player_id = next(player["id"] for player in players if player["email"] == player_email)
+
+        requests.post(f"{BASE_URL}/applications", json={"player_id": cls.player_id, "vacancy_id": cls.vacancy_id})
+        requests.post(
+            f"{BASE_URL}/messages/send",
+            params={"sender_id": cls.player_id, "sender_type": "player"},
+            json={"receiver_id": cls.club_id, "receiver_type": "club", "content": "Hello"}
+        )
+        print(f"✅ Test club, vacancy and player created")
+
+    def wait_for_deletion(self, deletion_id: str) -> dict:
+        for _ in range(50):
+            response = requests.get(f"{BASE_URL}/deletions/{deletion_id}")
+            self.assertEqual(response.status_code, 200, f"Failed to get deletion: {response.text}")
+            if response.json()["status"] != "running":
+                return response.json()
+            time.sleep(0.2)
+        self.fail("Deletion did not finish")
+
+    def test_01_delete_player(self):
+        """Test that a deleted player is gone at once and their data is cascaded"""
+        print("\n🔍 Testing player deletion...")
+
+        headers = session_headers(self.player_id, "player")
+        response = requests.delete(f"{BASE_URL}/players/{self.player_id}", headers=headers)
+        self.assertEqual(response.status_code, 200, f"Failed to delete player: {response.text}")
+        self.assertEqual(requests.get(f"{BASE_URL}/players/{self.player_id}").status_code, 404)
+
+        deletion = self.wait_for_deletion(response.json()["deletion_id"])
+        self.assertEqual(deletion["status"], "completed")
+        self.assertEqual(deletion["progress"]["applications"], 1)
+        self.assertEqual(deletion["progress"]["conversations"], 1)
+
+        response = requests.get(f"{BASE_URL}/clubs/{self.club_id}/applications")
+        self.assertEqual(response.json(), [])
+        self.assertEqual(requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}").json()["applications_count"], 0)
+
+        # The account is already gone
+        self.assertEqual(requests.delete(f"{BASE_URL}/players/{self.player_id}", headers=headers).status_code, 404)
+
+        print("✅ Player deletion test passed")
+
+    def test_02_delete_club(self):
+        """Test that deleting a club removes its vacancies"""
+        print("\n🔍 Testing club deletion...")
+
+        response = requests.delete(f"{BASE_URL}/clubs/{self.club_id}", headers=session_headers(self.club_id, "club"))
+        self.assertEqual(response.status_code, 200, f"Failed to delete club: {response.text}")
+
+        deletion = self.wait_for_deletion(response.json()["deletion_id"])
+        self.assertEqual(deletion["status"], "completed")
+        self.assertEqual(deletion["progress"]["vacancies"], 1)
+        self.assertEqual(requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}").status_code, 404)
+
+        print("✅ Club deletion test passed")
+
+    def test_00_requires_account_owner(self):
+        """Test that only the signed-in account itself can delete it"""
+        print("\n🔍 Testing deletion authorization...")
+
+        self.assertEqual(requests.delete(f"{BASE_URL}/players/{self.player_id}").status_code, 401)
+        self.assertEqual(requests.delete(f"{BASE_URL}/clubs/{self.club_id}").status_code, 401)
+        response = requests.delete(f"{BASE_URL}/players/{self.player_id}", headers=session_headers(self.club_id, "club"))
+        self.assertEqual(response.status_code, 403)
+        response = requests.delete(f"{BASE_URL}/clubs/{self.club_id}", headers=session_headers(str(uuid.uuid4()), "club"))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(requests.get(f"{BASE_URL}/players/{self.player_id}").status_code, 200)
+
+        print("✅ Deletion authorization test passed")
+
+    def test_03_unknown_ids(self):
+        """Test deleting entities that do not exist"""
+        print("\n🔍 Testing deletion of unknown ids...")
+
+        account_id = str(uuid.uuid4())
+        self.assertEqual(requests.delete(f"{BASE_URL}/players/{account_id}", headers=session_headers(account_id, "player")).status_code, 404)
+        self.assertEqual(requests.delete(f"{BASE_URL}/clubs/{account_id}", headers=session_headers(account_id, "club")).status_code, 404)
+        self.assertEqual(requests.get(f"{BASE_URL}/deletions/{uuid.uuid4()}").status_code, 404)
+
+        print("✅ Unknown id test passed")
+
+if __name__ == "__main__":
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
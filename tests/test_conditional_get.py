@@ -0,0 +1,96 @@
+import requests
+import unittest
+import uuid
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+
+class ConditionalGetTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+
+        # Register a test club
+        club_email = f"club_{cls.test_id}@test.com"
+        club_data = {
+            "name": f"Test Club {cls.test_id}",
+            "email": club_email,
+            "password": "TestPassword123!",
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/clubs", json=club_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test club: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        clubs = requests.get(f"{BASE_URL}/clubs").json()
+        cls.club_id = next(club["id"] for club in clubs if club["email"] == club_email)
+
+        vacancy_data = {
+            "club_id": cls.club_id,
+            "position": "Forward",
+            "title": f"Conditional Vacancy {cls.test_id}",
+            "description": "Test vacancy description",
+            "experience_level": "Intermediate",
+            "location": "Test City",
+            "status": "active"
+        }
+        response = requests.post(f"{BASE_URL}/vacancies", json=vacancy_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test vacancy: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+        cls.vacancy_id = response.json()["id"]
+        print(f"✅ Test vacancy created with ID: {cls.vacancy_id}")
+
+    def test_01_validators(self):
+        """Test that vacancy reads carry a version ETag, Last-Modified and Cache-Control"""
+        print("\n🔍 Testing response validators...")
+
+        response = requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["ETag"], f'"{response.json()["version"]}"')
+        self.assertIn("Last-Modified", response.headers)
+        self.assertIn("max-age", response.headers["Cache-Control"])
+
+        print("✅ Response validators test passed")
+
+    def test_02_not_modified(self):
+        """Test 304 responses for If-None-Match and If-Modified-Since"""
+        print("\n🔍 Testing 304 Not Modified...")
+
+        response = requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}")
+        etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+
+        response = requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+
+        response = requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}", headers={"If-Modified-Since": last_modified})
+        self.assertEqual(response.status_code, 304)
+
+        response = requests.get(f"{BASE_URL}/public/clubs/browse", params={"view": "card"})
+        self.assertEqual(response.status_code, 200)
+        response = requests.get(f"{BASE_URL}/public/clubs/browse", params={"view": "card"}, headers={"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+        print("✅ 304 Not Modified test passed")
+
+    def test_03_modified(self):
+        """Test that an update changes the ETag"""
+        print("\n🔍 Testing ETag change after update...")
+
+        etag = requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}").headers["ETag"]
+        response = requests.put(f"{BASE_URL}/vacancies/{self.vacancy_id}", json={"title": f"Updated Vacancy {self.test_id}"})
+        self.assertEqual(response.status_code, 200, f"Failed to update vacancy: {response.text}")
+
+        response = requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.json()["title"], f"Updated Vacancy {self.test_id}")
+
+        print("✅ ETag change test passed")
+
+if __name__ == "__main__":
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,119 @@
+import requests
+import unittest
+import uuid
+from pathlib import Path
+from urllib.parse import urljoin
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+FIXTURES_DIR = Path(__file__).parent
+
+class DirectUploadTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        player_email = f"player_{cls.test_id}@test.com"
+        player_data = {
+            "name": f"Test Player {cls.test_id}",
+            "email": player_email,
+            "password": "TestPassword123!",
+            "position": "Midfielder",
+            "experience_level": "Intermediate",
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/players", json=player_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test player: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        players = requests.get(f"{BASE_URL}/players").json()
+        cls.player_id = next(player["id"] for player in players if player["email"] == player_email)
+        print(f"✅ Test player created")
+
+    def presign(self, size: int) -> dict:
+        response = requests.post(f"{BASE_URL}/uploads/presign", json={
+            "owner_id": self.player_id,
+            "kind": "video",
+            "filename": "clip.mp4",
+            "content_type": "video/mp4",
+            "size": size
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to presign upload: {response.text}")
+        return response.json()
+
+    def complete(self, target: dict, owner_id: str = None) -> requests.Response:
+        return requests.post(f"{BASE_URL}/uploads/complete", json={
+            "owner_id": owner_id or self.player_id,
+            "kind": "video",
+            "key": target["key"],
+            "upload_token": target["upload_token"],
+            "original_name": "clip.mp4"
+        })
+
+    def send(self, target: dict, content: bytes) -> requests.Response:
+        url = urljoin(BASE_URL, target["url"])
+        if target["method"] == "POST":
+            # Presigned POST to object storage: policy fields first, file last
+            return requests.post(url, data=target["fields"], files={"file": ("clip.mp4", content, "video/mp4")})
+        return requests.put(url, data=content, headers=target["headers"])
+
+    def test_01_presigned_upload(self):
+        """Test that a video sent to its presigned target is attached on completion"""
+        print("\n🔍 Testing presigned video upload...")
+        with open(FIXTURES_DIR / "test_club_video.mp4", "rb") as f:
+            content = f.read()
+        target = self.presign(len(content))
+        self.assertTrue(target["key"].startswith("videos/"))
+
+        response = self.send(target, content)
+        self.assertLess(response.status_code, 300, f"Failed to upload to storage: {response.text}")
+
+        # The token is bound to the owner it was presigned for
+        self.assertEqual(self.complete(target, owner_id=str(uuid.uuid4())).status_code, 403)
+
+        response = self.complete(target)
+        self.assertEqual(response.status_code, 200, f"Failed to complete upload: {response.text}")
+        # A key is attached once
+        self.assertEqual(self.complete(target).status_code, 409)
+
+        videos = requests.get(f"{BASE_URL}/players/{self.player_id}/videos").json()
+        video = next(video for video in videos if video["filename"] == response.json()["filename"])
+        self.assertEqual(video["file_size"], len(content))
+
+        response = requests.get(f"{BASE_URL}/uploads/{target['key']}")
+        self.assertEqual(response.status_code, 200, f"Failed to download upload: {response.status_code}")
+        self.assertEqual(response.content, content)
+        print(f"✅ Presigned upload stored {len(content)} bytes and attached the video")
+
+    def test_02_complete_without_upload(self):
+        """Test that completing an upload that never arrived is rejected"""
+        print("\n🔍 Testing completion of a missing upload...")
+        target = self.presign(1024)
+        self.assertEqual(self.complete(target).status_code, 400)
+        print("✅ Missing upload rejected")
+
+    def test_03_size_limit(self):
+        """Test that presigning more than the upload limit is rejected"""
+        print("\n🔍 Testing presign size limit...")
+        response = requests.post(f"{BASE_URL}/uploads/presign", json={
+            "owner_id": self.player_id,
+            "kind": "video",
+            "filename": "clip.mp4",
+            "content_type": "video/mp4",
+            "size": 10 * 1024 * 1024 * 1024
+        })
+        self.assertEqual(response.status_code, 400)
+        print("✅ Oversized upload rejected")
+
+    def test_04_forged_key(self):
+        """Test that a key cannot be completed with the token of another key"""
+        print("\n🔍 Testing completion with a mismatched token...")
+        target = self.presign(1024)
+        other = self.presign(1024)
+        response = self.complete({"key": other["key"], "upload_token": target["upload_token"]})
+        self.assertEqual(response.status_code, 403)
+        print("✅ Mismatched token rejected")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import requests
+import unittest
+import uuid
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+
+class GeoSearchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+
+        # Register a test club
+        club_email = f"club_{cls.test_id}@test.com"
+        club_data = {
+            "name": f"Test Club {cls.test_id}",
+            "email": club_email,
+            "password": "TestPassword123!",
+            "location": "Haarlem, Netherlands"
+        }
+        response = requests.post(f"{BASE_URL}/clubs", json=club_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test club: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        clubs = requests.get(f"{BASE_URL}/clubs").json()
+        cls.club = next(club for club in clubs if club["email"] == club_email)
+
+        # Haarlem is about 18 km from Amsterdam
+        vacancy_data = {
+            "club_id": cls.club["id"],
+            "position": "Defender",
+            "title": f"Geo Vacancy {cls.test_id}",
+            "description": "Test vacancy description",
+            "experience_level": "Intermediate",
+            "location": "Haarlem, Netherlands",
+            "status": "active"
+        }
+        response = requests.post(f"{BASE_URL}/vacancies", json=vacancy_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test vacancy: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+        cls.vacancy = response.json()
+        print(f"✅ Test vacancy created with ID: {cls.vacancy['id']}")
+
+    def test_01_geocoded_on_create(self):
+        """Test that new clubs and vacancies get a GeoJSON point"""
+        print("\n🔍 Testing geocoding on create...")
+
+        self.assertEqual(self.vacancy["geo"]["type"], "Point")
+        longitude, latitude = self.vacancy["geo"]["coordinates"]
+        self.assertAlmostEqual(longitude, 4.65, delta=0.1)
+        self.assertAlmostEqual(latitude, 52.39, delta=0.1)
+        self.assertEqual(self.club["geo"], self.vacancy["geo"])
+
+        print("✅ Geocoding test passed")
+
+    def test_02_radius_search(self):
+        """Test searching vacancies within a radius of a place"""
+        print("\n🔍 Testing vacancy radius search...")
+
+        response = requests.get(f"{BASE_URL}/vacancies", params={"near": "Amsterdam", "radius_km": 30, "limit": 500})
+        self.assertEqual(response.status_code, 200, f"Radius search failed: {response.text}")
+        self.assertIn(self.vacancy["id"], [vacancy["id"] for vacancy in response.json()])
+
+        response = requests.get(f"{BASE_URL}/vacancies", params={"near": "Amsterdam", "radius_km": 5, "limit": 500})
+        self.assertEqual(response.status_code, 200, f"Radius search failed: {response.text}")
+        self.assertNotIn(self.vacancy["id"], [vacancy["id"] for vacancy in response.json()])
+
+        print("✅ Radius search test passed")
+
+    def test_03_nearest_search(self):
+        """Test that coordinate searches return the nearest vacancies first"""
+        print("\n🔍 Testing nearest vacancy search...")
+
+        longitude, latitude = self.vacancy["geo"]["coordinates"]
+        response = requests.get(f"{BASE_URL}/vacancies", params={"lat": latitude, "lng": longitude, "limit": 1})
+        self.assertEqual(response.status_code, 200, f"Nearest search failed: {response.text}")
+        nearest = response.json()[0]
+        self.assertEqual(nearest["geo"], self.vacancy["geo"])
+
+        print("✅ Nearest search test passed")
+
+    def test_04_invalid_search(self):
+        """Test unknown places and incomplete geo parameters"""
+        print("\n🔍 Testing invalid geo searches...")
+
+        self.assertEqual(requests.get(f"{BASE_URL}/vacancies", params={"near": f"Nowhere {self.test_id}"}).status_code, 400)
+        self.assertEqual(requests.get(f"{BASE_URL}/vacancies", params={"radius_km": 10}).status_code, 400)
+        self.assertEqual(requests.get(f"{BASE_URL}/public/players/browse", params={"lat": 91, "lng": 0}).status_code, 400)
+        response = requests.get(f"{BASE_URL}/vacancies", params={"lat": 52.37})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "lat and lng must be given together")
+        self.assertEqual(requests.get(f"{BASE_URL}/public/clubs/browse", params={"lng": 4.9, "radius_km": 10}).status_code, 400)
+
+        print("✅ Invalid geo search test passed")
+
+if __name__ == "__main__":
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,65 @@
+import requests
+import unittest
+import uuid
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+
+class ListPaginationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        emails = []
+        for index in range(3):
+            club_email = f"club_{index}_{cls.test_id}@test.com"
+            club_data = {
+                "name": f"Test Club {index} {cls.test_id}",
+                "email": club_email,
+                "password": "TestPassword123!",
+                "location": "Test City"
+            }
+            response = requests.post(f"{BASE_URL}/clubs", json=club_data)
+            if response.status_code != 200:
+                print(f"❌ Failed to create test club: {response.status_code} - {response.text}")
+                raise Exception("Test setup failed")
+            emails.append(club_email)
+
+        clubs = requests.get(f"{BASE_URL}/clubs").json()
+        cls.club_ids = [next(club["id"] for club in clubs if club["email"] == email) for email in emails]
+        print(f"✅ {len(cls.club_ids)} test clubs created")
+
+    def test_01_unpaged_default(self):
+        """Test that a list requested without limit or cursor is not cut to one page"""
+        print("\n🔍 Testing unpaged club list...")
+        response = requests.get(f"{BASE_URL}/clubs", params={"view": "card"})
+        self.assertEqual(response.status_code, 200)
+        clubs = response.json()
+        if len(clubs) < 1000:
+            self.assertNotIn("X-Next-Cursor", response.headers)
+        self.assertTrue(set(self.club_ids) <= {club["id"] for club in clubs})
+        print(f"✅ Listed {len(clubs)} clubs in one response")
+
+    def test_02_paged(self):
+        """Test that an explicit limit pages with X-Next-Cursor"""
+        print("\n🔍 Testing paged club list...")
+        response = requests.get(f"{BASE_URL}/clubs", params={"limit": 1, "view": "card"})
+        self.assertEqual(len(response.json()), 1)
+        cursor = response.headers["X-Next-Cursor"]
+
+        response = requests.get(f"{BASE_URL}/clubs", params={"limit": 1, "cursor": cursor, "view": "card"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+        print("✅ Club list paged")
+
+    def test_03_lookup_by_ids(self):
+        """Test that ids returns just the requested clubs"""
+        print("\n🔍 Testing club lookup by ids...")
+        wanted = self.club_ids[:2]
+        response = requests.get(f"{BASE_URL}/clubs", params={"ids": ",".join(wanted), "view": "card"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(club["id"] for club in response.json()), sorted(wanted))
+        print("✅ Clubs looked up by id")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from matching import MatchIndex, utc_timestamp
+
+
+class MatchDeadlineTest(unittest.TestCase):
+    """Application deadlines are stored as naive UTC and must be read as UTC whatever the server's zone"""
+
+    def setUp(self):
+        # A zone well behind UTC, where reading naive values as local time shifts them by hours
+        previous = os.environ.get("TZ")
+        os.environ["TZ"] = "America/New_York"
+        time.tzset()
+
+        def restore():
+            if previous is None:
+                os.environ.pop("TZ", None)
+            else:
+                os.environ["TZ"] = previous
+            time.tzset()
+        self.addCleanup(restore)
+
+    def test_01_naive_values_are_utc(self):
+        """Test that a naive datetime converts like the same instant in UTC"""
+        naive = datetime(2024, 6, 1, 12, 0)
+        self.assertEqual(utc_timestamp(naive), naive.replace(tzinfo=timezone.utc).timestamp())
+        self.assertEqual(utc_timestamp(None), float("inf"))
+        self.assertEqual(utc_timestamp("2024-06-01", default=0.0), 0.0)
+
+    def test_02_deadline_open_until_it_passes(self):
+        """Test that a vacancy closing within the hour is open, and one closed an hour ago is not"""
+        index = MatchIndex(db=None)
+        now = datetime.utcnow()
+        index.upsert_vacancy({"id": "closing", "club_id": "c1", "application_deadline": now + timedelta(minutes=30)})
+        index.upsert_vacancy({"id": "closed", "club_id": "c1", "application_deadline": now - timedelta(hours=1)})
+        index.upsert_vacancy({"id": "open", "club_id": "c1", "application_deadline": None})
+
+        open_rows = index._open_vacancies()
+        self.assertTrue(open_rows[index.vacancies.rows["closing"]])
+        self.assertFalse(open_rows[index.vacancies.rows["closed"]])
+        self.assertTrue(open_rows[index.vacancies.rows["open"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
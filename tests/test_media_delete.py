@@ -0,0 +1,64 @@
+import requests
+import unittest
+import uuid
+from pathlib import Path
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+FIXTURES_DIR = Path(__file__).parent
+
+class MediaDeleteTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        player_email = f"player_{cls.test_id}@test.com"
+        player_data = {
+            "name": f"Test Player {cls.test_id}",
+            "email": player_email,
+            "password": "TestPassword123!",
+            "position": "Defender",
+            "experience_level": "Intermediate",
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/players", json=player_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test player: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        players = requests.get(f"{BASE_URL}/players").json()
+        cls.player_id = next(player["id"] for player in players if player["email"] == player_email)
+        print(f"✅ Test player created")
+
+    def test_01_delete_one_of_several_photos(self):
+        """Test that deleting a photo removes exactly that entry"""
+        print("\n🔍 Testing photo deletion...")
+        for _ in range(3):
+            with open(FIXTURES_DIR / "test_gallery.jpg", "rb") as f:
+                files = {"file": ("photo.jpg", f, "image/jpeg")}
+                response = requests.post(f"{BASE_URL}/players/{self.player_id}/photos", files=files)
+            self.assertEqual(response.status_code, 200, f"Failed to upload photo: {response.text}")
+
+        photos = requests.get(f"{BASE_URL}/players/{self.player_id}/photos").json()
+        removed = photos[1]
+        response = requests.delete(f"{BASE_URL}/players/{self.player_id}/photos/{removed['id']}")
+        self.assertEqual(response.status_code, 200, f"Failed to delete photo: {response.text}")
+
+        remaining = requests.get(f"{BASE_URL}/players/{self.player_id}/photos").json()
+        self.assertEqual([photo["id"] for photo in remaining], [photos[0]["id"], photos[2]["id"]])
+
+        # Deleting it again finds nothing to pull
+        response = requests.delete(f"{BASE_URL}/players/{self.player_id}/photos/{removed['id']}")
+        self.assertEqual(response.status_code, 404)
+        print("✅ Photo removed from the profile")
+
+    def test_02_unknown_owner(self):
+        """Test that deleting media of a missing player reports the player"""
+        print("\n🔍 Testing media deletion for a missing player...")
+        response = requests.delete(f"{BASE_URL}/players/{uuid.uuid4()}/videos/{uuid.uuid4()}")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["detail"], "Player not found")
+        print("✅ Missing player reported")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import requests
+import unittest
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+FIXTURES_DIR = Path(__file__).parent
+
+class MediaLibraryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        player_email = f"player_{cls.test_id}@test.com"
+        player_data = {
+            "name": f"Test Player {cls.test_id}",
+            "email": player_email,
+            "password": "TestPassword123!",
+            "position": "Forward",
+            "experience_level": "Intermediate",
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/players", json=player_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test player: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        players = requests.get(f"{BASE_URL}/players").json()
+        cls.player_id = next(player["id"] for player in players if player["email"] == player_email)
+
+        cls.uploaded = []
+        for index in range(5):
+            with open(FIXTURES_DIR / "test_gallery.jpg", "rb") as f:
+                files = {"file": (f"photo_{index}.jpg", f, "image/jpeg")}
+                response = requests.post(f"{BASE_URL}/players/{cls.player_id}/photos", files=files)
+            if response.status_code != 200:
+                print(f"❌ Failed to upload test photo: {response.status_code} - {response.text}")
+                raise Exception("Test setup failed")
+            cls.uploaded.append(response.json()["filename"])
+        print(f"✅ Test player created with {len(cls.uploaded)} photos")
+
+    def test_01_profile_embeds_count_and_cover(self):
+        """Test that the profile carries a count and the newest photo instead of the list"""
+        print("\n🔍 Testing profile media summary...")
+        player = requests.get(f"{BASE_URL}/players/{self.player_id}").json()
+        self.assertNotIn("photos", player)
+        self.assertEqual(player["media"]["photos"]["count"], 5)
+        self.assertEqual(player["media"]["photos"]["cover"]["filename"], self.uploaded[-1])
+        print("✅ Profile carries the photo count and cover")
+
+    def test_02_paginated_listing(self):
+        """Test that photos are listed newest first, a page at a time"""
+        print("\n🔍 Testing paginated photo listing...")
+        filenames = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(f"{BASE_URL}/players/{self.player_id}/photos", params=params)
+            self.assertEqual(response.status_code, 200, f"Failed to list photos: {response.text}")
+            pages += 1
+            filenames.extend(photo["filename"] for photo in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        self.assertEqual(filenames, list(reversed(self.uploaded)))
+        self.assertEqual(pages, 3)
+        print(f"✅ Listed {len(filenames)} photos over {pages} pages")
+
+    def test_03_deleting_cover_promotes_next(self):
+        """Test that deleting the newest photo makes the next newest the cover"""
+        print("\n🔍 Testing cover replacement...")
+        photos = requests.get(f"{BASE_URL}/players/{self.player_id}/photos", params={"limit": 2}).json()
+        response = requests.delete(f"{BASE_URL}/players/{self.player_id}/photos/{photos[0]['id']}")
+        self.assertEqual(response.status_code, 200, f"Failed to delete photo: {response.text}")
+
+        player = requests.get(f"{BASE_URL}/players/{self.player_id}").json()
+        self.assertEqual(player["media"]["photos"]["count"], 4)
+        self.assertEqual(player["media"]["photos"]["cover"]["id"], photos[1]["id"])
+        print("✅ Next newest photo became the cover")
+
+    def test_04_concurrent_deletes_keep_cover(self):
+        """Test that deleting the cover and the next newest photo at once leaves a remaining photo as cover"""
+        print("\n🔍 Testing concurrent deletes...")
+        photos = requests.get(f"{BASE_URL}/players/{self.player_id}/photos", params={"limit": 3}).json()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            responses = list(pool.map(
+                lambda photo: requests.delete(f"{BASE_URL}/players/{self.player_id}/photos/{photo['id']}"),
+                photos[:2]
+            ))
+        for response in responses:
+            self.assertEqual(response.status_code, 200, f"Failed to delete photo: {response.text}")
+
+        player = requests.get(f"{BASE_URL}/players/{self.player_id}").json()
+        self.assertEqual(player["media"]["photos"]["count"], 2)
+        self.assertEqual(player["media"]["photos"]["cover"]["id"], photos[2]["id"])
+        print("✅ Cover points at a remaining photo")
+
+    def test_05_unknown_owner(self):
+        """Test that listing media of a missing player is a 404"""
+        print("\n🔍 Testing media listing for a missing player...")
+        response = requests.get(f"{BASE_URL}/players/{uuid.uuid4()}/videos")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["detail"], "Player not found")
+        print("✅ Missing player reported")
+
+if __name__ == "__main__":
+    unittest.main()
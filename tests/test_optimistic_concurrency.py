@@ -0,0 +1,113 @@
+import requests
+import unittest
+import uuid
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+
+class OptimisticConcurrencyTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+
+        # Register a test club
+        club_email = f"club_{cls.test_id}@test.com"
+        club_data = {
+            "name": f"Test Club {cls.test_id}",
+            "email": club_email,
+            "password": "TestPassword123!",
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/clubs", json=club_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test club: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        clubs = requests.get(f"{BASE_URL}/clubs").json()
+        cls.club_id = next(club["id"] for club in clubs if club["email"] == club_email)
+
+        vacancy_data = {
+            "club_id": cls.club_id,
+            "position": "Midfielder",
+            "title": f"Versioned Vacancy {cls.test_id}",
+            "description": "Test vacancy description",
+            "experience_level": "Intermediate",
+            "location": "Test City",
+            "status": "draft"
+        }
+        response = requests.post(f"{BASE_URL}/vacancies", json=vacancy_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test vacancy: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+        cls.vacancy_id = response.json()["id"]
+        print(f"✅ Test vacancy created with ID: {cls.vacancy_id}")
+
+    def test_01_version_bumped(self):
+        """Test that a matching If-Match updates the vacancy and bumps its version"""
+        print("\n🔍 Testing versioned update...")
+
+        version = requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}").json()["version"]
+        response = requests.put(
+            f"{BASE_URL}/vacancies/{self.vacancy_id}",
+            json={"status": "active"},
+            headers={"If-Match": f'"{version}"'}
+        )
+        self.assertEqual(response.status_code, 200, f"Failed to update vacancy: {response.text}")
+        self.assertEqual(response.json()["version"], version + 1)
+        self.assertIsNotNone(response.json()["published_at"])
+
+        print("✅ Versioned update test passed")
+
+    def test_02_stale_version_rejected(self):
+        """Test that a stale If-Match is rejected with 412 and leaves the vacancy unchanged"""
+        print("\n🔍 Testing stale version rejection...")
+
+        vacancy = requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}").json()
+        requests.put(f"{BASE_URL}/vacancies/{self.vacancy_id}", json={"title": f"First Edit {self.test_id}"})
+
+        response = requests.put(
+            f"{BASE_URL}/vacancies/{self.vacancy_id}",
+            json={"title": f"Second Edit {self.test_id}"},
+            headers={"If-Match": f'"{vacancy["version"]}"'}
+        )
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}").json()["title"], f"First Edit {self.test_id}")
+
+        print("✅ Stale version rejection test passed")
+
+    def test_03_read_etag_as_precondition(self):
+        """Test that the ETag of a read is accepted as If-Match, and the update returns the next one"""
+        print("\n🔍 Testing read ETag as If-Match...")
+
+        etag = requests.get(f"{BASE_URL}/vacancies/{self.vacancy_id}").headers["ETag"]
+        response = requests.put(
+            f"{BASE_URL}/vacancies/{self.vacancy_id}",
+            json={"title": f"Echoed Edit {self.test_id}"},
+            headers={"If-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200, f"Failed to update vacancy: {response.text}")
+        self.assertEqual(response.headers["ETag"], f'"{response.json()["version"]}"')
+
+        response = requests.put(
+            f"{BASE_URL}/vacancies/{self.vacancy_id}",
+            json={"title": f"Stale Edit {self.test_id}"},
+            headers={"If-Match": etag}
+        )
+        self.assertEqual(response.status_code, 412)
+
+        print("✅ Read ETag precondition test passed")
+
+    def test_04_invalid_precondition(self):
+        """Test malformed If-Match headers and unknown documents"""
+        print("\n🔍 Testing invalid preconditions...")
+
+        response = requests.put(f"{BASE_URL}/clubs/{self.club_id}", json={"league": "Test"}, headers={"If-Match": "latest"})
+        self.assertEqual(response.status_code, 400)
+        response = requests.put(f"{BASE_URL}/clubs/{uuid.uuid4()}", json={"league": "Test"}, headers={"If-Match": '"1"'})
+        self.assertEqual(response.status_code, 404)
+
+        print("✅ Invalid precondition test passed")
+
+if __name__ == "__main__":
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,64 @@
+import requests
+import unittest
+import uuid
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+
+class ProfileCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+
+        # Register a test player
+        player_email = f"player_{cls.test_id}@test.com"
+        player_data = {
+            "name": f"Test Player {cls.test_id}",
+            "email": player_email,
+            "password": "TestPassword123!",
+            "position": "Forward",
+            "experience_level": "Advanced",
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/players", json=player_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test player: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        players = requests.get(f"{BASE_URL}/players").json()
+        cls.player_id = next(player["id"] for player in players if player["email"] == player_email)
+        print(f"✅ Test player created with ID: {cls.player_id}")
+
+    def test_01_update_visible_immediately(self):
+        """Test that a cached profile is invalidated by an update"""
+        print("\n🔍 Testing profile cache invalidation...")
+
+        # Populate the cache
+        for _ in range(2):
+            response = requests.get(f"{BASE_URL}/players/{self.player_id}")
+            self.assertEqual(response.status_code, 200)
+
+        new_name = f"Renamed Player {self.test_id}"
+        response = requests.put(f"{BASE_URL}/players/{self.player_id}", json={"name": new_name})
+        self.assertEqual(response.status_code, 200, f"Failed to update player: {response.text}")
+
+        response = requests.get(f"{BASE_URL}/players/{self.player_id}")
+        self.assertEqual(response.json()["name"], new_name)
+
+        print("✅ Profile cache invalidation test passed")
+
+    def test_02_metrics(self):
+        """Test the profile cache metrics endpoint"""
+        print("\n🔍 Testing profile cache metrics...")
+
+        response = requests.get(f"{BASE_URL}/metrics/profile-cache")
+        self.assertEqual(response.status_code, 200, f"Failed to get metrics: {response.text}")
+        metrics = response.json()
+        for field in ["local_hits", "shared_hits", "misses", "coalesced", "invalidations", "hit_ratio"]:
+            self.assertIn(field, metrics)
+
+        print("✅ Profile cache metrics test passed")
+
+if __name__ == "__main__":
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,163 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from rate_limiter import MAX_RETRY_AFTER, BucketPolicy, InMemoryBucketStore, LoginRateLimiter
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class RecordingStore(InMemoryBucketStore):
+    """In-memory store that remembers which buckets were taken from"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.taken = []
+
+    async def take(self, key, policy):
+        self.taken.append(key)
+        return await super().take(key, policy)
+
+
+class BrokenStore:
+    async def take(self, key, policy):
+        raise ConnectionError("store unavailable")
+
+
+class RateLimiterTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("rate_limiter.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TokenBucketTest(RateLimiterTestCase):
+    async def test_01_burst_then_reject(self):
+        """Test that a bucket admits its capacity at once and rejects the next take"""
+        store = InMemoryBucketStore()
+        policy = BucketPolicy(capacity=3, refill_per_second=1)
+        for _ in range(3):
+            self.assertEqual(await store.take("key", policy), (True, 0.0))
+        allowed, retry_after = await store.take("key", policy)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 1.0)
+
+    async def test_02_refill(self):
+        """Test that tokens refill at the policy rate, up to capacity"""
+        store = InMemoryBucketStore()
+        policy = BucketPolicy(capacity=2, refill_per_second=0.5)
+        await store.take("key", policy)
+        await store.take("key", policy)
+
+        self.clock.advance(1)
+        allowed, retry_after = await store.take("key", policy)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 1.0)
+
+        self.clock.advance(1)
+        self.assertTrue((await store.take("key", policy))[0])
+
+        # A long idle period refills no further than capacity
+        self.clock.advance(3600)
+        self.assertTrue((await store.take("key", policy))[0])
+        self.assertTrue((await store.take("key", policy))[0])
+        self.assertFalse((await store.take("key", policy))[0])
+
+    def test_03_retry_after(self):
+        """Test the wait for the next token, including a bucket that never refills"""
+        self.assertAlmostEqual(BucketPolicy(capacity=5, refill_per_second=5 / 60).retry_after(0.5), 6.0)
+        self.assertEqual(BucketPolicy(capacity=5, refill_per_second=1).retry_after(2), 0.0)
+        self.assertEqual(BucketPolicy(capacity=5, refill_per_second=0).retry_after(0), float("inf"))
+
+    async def test_04_lru_eviction(self):
+        """Test that the store keeps at most max_keys buckets, evicting the least recently used"""
+        store = InMemoryBucketStore(max_keys=2)
+        policy = BucketPolicy(capacity=1, refill_per_second=0)
+        await store.take("a", policy)
+        await store.take("b", policy)
+        # Touching "a" again makes "b" the least recently used
+        await store.take("a", policy)
+        await store.take("c", policy)
+
+        self.assertEqual(list(store._buckets), ["a", "c"])
+        # An evicted bucket starts full again
+        self.assertTrue((await store.take("b", policy))[0])
+        self.assertEqual(list(store._buckets), ["c", "b"])
+
+
+class LoginRateLimiterTest(RateLimiterTestCase):
+    def limiter(self, store, email_capacity=2, ip_capacity=5):
+        return LoginRateLimiter(
+            store,
+            email_policy=BucketPolicy(capacity=email_capacity, refill_per_second=email_capacity / 60),
+            ip_policy=BucketPolicy(capacity=ip_capacity, refill_per_second=ip_capacity / 60)
+        )
+
+    async def test_01_email_limit(self):
+        """Test that attempts for one account are limited regardless of case and whitespace"""
+        limiter = self.limiter(InMemoryBucketStore())
+        self.assertTrue((await limiter.check("player", "Someone@Test.com", "10.0.0.1"))[0])
+        self.assertTrue((await limiter.check("player", " someone@test.com", "10.0.0.2"))[0])
+        allowed, retry_after = await limiter.check("player", "someone@test.com", "10.0.0.3")
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 30.0)
+        # Clubs and players with the same email have separate buckets
+        self.assertTrue((await limiter.check("club", "someone@test.com", "10.0.0.4"))[0])
+        self.assertEqual(limiter.metrics["rejected_email"], 1)
+
+    async def test_02_ip_checked_before_email(self):
+        """Test that a client over its IP limit is rejected without draining the account's bucket"""
+        store = RecordingStore()
+        limiter = self.limiter(store, ip_capacity=1)
+        self.assertTrue((await limiter.check("player", "victim@test.com", "10.0.0.1"))[0])
+        self.assertEqual(store.taken, ["login:ip:10.0.0.1", "login:player:victim@test.com"])
+
+        store.taken.clear()
+        allowed, retry_after = await limiter.check("player", "victim@test.com", "10.0.0.1")
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 60.0)
+        self.assertEqual(store.taken, ["login:ip:10.0.0.1"])
+        self.assertEqual(limiter.metrics["rejected_ip"], 1)
+
+        # The account still has its own attempts left from another address
+        self.assertTrue((await limiter.check("player", "victim@test.com", "10.0.0.2"))[0])
+
+    async def test_03_fail_open(self):
+        """Test that store errors admit the attempt and are counted"""
+        limiter = self.limiter(BrokenStore())
+        with self.assertLogs("rate_limiter", level="ERROR"):
+            self.assertEqual(await limiter.check("player", "someone@test.com", "10.0.0.1"), (True, 0.0))
+        self.assertEqual(limiter.metrics["store_errors"], 1)
+        self.assertEqual(limiter.metrics["allowed"], 0)
+
+    async def test_04_retry_after_capped(self):
+        """Test that a limit with no refill reports a finite wait"""
+        limiter = LoginRateLimiter(InMemoryBucketStore(), BucketPolicy(1, 0), BucketPolicy(5, 0))
+        self.assertTrue((await limiter.check("player", "someone@test.com", "10.0.0.1"))[0])
+        self.assertEqual(await limiter.check("player", "someone@test.com", "10.0.0.1"), (False, MAX_RETRY_AFTER))
+
+    async def test_05_disabled(self):
+        """Test that a disabled limiter admits everything without touching the store"""
+        store = RecordingStore()
+        limiter = LoginRateLimiter(store, BucketPolicy(0, 0), BucketPolicy(0, 0), enabled=False)
+        self.assertEqual(await limiter.check("player", "someone@test.com", None), (True, 0.0))
+        self.assertEqual(store.taken, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
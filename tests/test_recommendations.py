@@ -0,0 +1,135 @@
+import requests
+import unittest
+import uuid
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+
+class RecommendationsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        cls.password = "TestPassword123!"
+
+        # Register a test club
+        club_email = f"club_{cls.test_id}@test.com"
+        club_data = {
+            "name": f"Test Club {cls.test_id}",
+            "email": club_email,
+            "password": cls.password,
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/clubs", json=club_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test club: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        clubs = requests.get(f"{BASE_URL}/clubs").json()
+        cls.club_id = next(club["id"] for club in clubs if club["email"] == club_email)
+
+        # A vacancy in the player's city and position, and one that fits poorly
+        cls.vacancy_ids = []
+        for position, location in [("Forward", f"City {cls.test_id}, Testland"), ("Goalkeeper", "Elsewhere, Otherland")]:
+            vacancy_data = {
+                "club_id": cls.club_id,
+                "position": position,
+                "title": f"{position} {cls.test_id}",
+                "description": "Test vacancy description",
+                "experience_level": "Advanced",
+                "location": location,
+                "benefits": ["Visa", "Accommodation"],
+                "status": "active"
+            }
+            response = requests.post(f"{BASE_URL}/vacancies", json=vacancy_data)
+            if response.status_code != 200:
+                print(f"❌ Failed to create test vacancy: {response.status_code} - {response.text}")
+                raise Exception("Test setup failed")
+            cls.vacancy_ids.append(response.json()["id"])
+
+        # Register a test player
+        player_email = f"player_{cls.test_id}@test.com"
+        player_data = {
+            "name": f"Test Player {cls.test_id}",
+            "email": player_email,
+            "password": cls.password,
+            "position": "Forward",
+            "experience_level": "Advanced",
+            "location": f"City {cls.test_id}",
+            "country": "Testland",
+            "age": 24
+        }
+        requests.post(f"{BASE_URL}/players", json=player_data)
+        players = requests.get(f"{BASE_URL}/players").json()
+        cls.player_id = next(player["id"] for player in players if player["email"] == player_email)
+        print(f"✅ Test club, vacancies and player created")
+
+    def test_01_recommended_vacancies(self):
+        """Test that the best matching vacancy ranks above a poor match"""
+        print("\n🔍 Testing recommended vacancies for a player...")
+
+        response = requests.get(f"{BASE_URL}/players/{self.player_id}/recommended-vacancies", params={"limit": 100})
+
+        self.assertEqual(response.status_code, 200, f"Failed to get recommendations: {response.text}")
+        matches = response.json()
+        ranked = [match["vacancy"]["id"] for match in matches if match["vacancy"]["id"] in self.vacancy_ids]
+        self.assertEqual(ranked[0], self.vacancy_ids[0])
+        scores = [match["score"] for match in matches]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+        print("✅ Recommended vacancies test passed")
+
+    def test_02_applied_vacancy_excluded(self):
+        """Test that vacancies the player applied to are not recommended"""
+        print("\n🔍 Testing applied vacancy exclusion...")
+
+        response = requests.post(f"{BASE_URL}/applications", json={"player_id": self.player_id, "vacancy_id": self.vacancy_ids[0]})
+        self.assertEqual(response.status_code, 200, f"Failed to apply: {response.text}")
+
+        response = requests.get(f"{BASE_URL}/players/{self.player_id}/recommended-vacancies", params={"limit": 100})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(self.vacancy_ids[0], [match["vacancy"]["id"] for match in response.json()])
+
+        print("✅ Applied vacancy exclusion test passed")
+
+    def test_03_recommended_players(self):
+        """Test player recommendations for a vacancy and a club"""
+        print("\n🔍 Testing recommended players...")
+
+        response = requests.get(f"{BASE_URL}/vacancies/{self.vacancy_ids[1]}/recommended-players")
+        self.assertEqual(response.status_code, 200, f"Failed to get recommendations: {response.text}")
+        self.assertIsInstance(response.json(), list)
+
+        response = requests.get(f"{BASE_URL}/clubs/{self.club_id}/recommended-players")
+        self.assertEqual(response.status_code, 200, f"Failed to get recommendations: {response.text}")
+        for match in response.json():
+            self.assertIn("id", match["player"])
+
+        print("✅ Recommended players test passed")
+
+    def test_04_unknown_ids(self):
+        """Test recommendations for ids that do not exist"""
+        print("\n🔍 Testing recommendations for unknown ids...")
+
+        self.assertEqual(requests.get(f"{BASE_URL}/players/{uuid.uuid4()}/recommended-vacancies").status_code, 404)
+        self.assertEqual(requests.get(f"{BASE_URL}/vacancies/{uuid.uuid4()}/recommended-players").status_code, 404)
+        self.assertEqual(requests.get(f"{BASE_URL}/clubs/{uuid.uuid4()}/recommended-players").status_code, 404)
+
+        print("✅ Unknown id test passed")
+
+    def test_05_digests(self):
+        """Test reading precomputed digests before any digest run has covered these users"""
+        print("\n🔍 Testing recommendation digests...")
+
+        response = requests.get(f"{BASE_URL}/players/{self.player_id}/digest")
+        self.assertEqual(response.status_code, 200, f"Failed to get player digest: {response.text}")
+        self.assertIsInstance(response.json()["vacancies"], list)
+
+        response = requests.get(f"{BASE_URL}/clubs/{self.club_id}/digest")
+        self.assertEqual(response.status_code, 200, f"Failed to get club digest: {response.text}")
+        self.assertIsInstance(response.json()["players"], list)
+
+        print("✅ Recommendation digests test passed")
+
+if __name__ == "__main__":
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
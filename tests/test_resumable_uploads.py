@@ -0,0 +1,108 @@
+import hashlib
+import requests
+import unittest
+import uuid
+from pathlib import Path
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+FIXTURES_DIR = Path(__file__).parent
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+class ResumableUploadTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        club_email = f"club_{cls.test_id}@test.com"
+        club_data = {
+            "name": f"Test Club {cls.test_id}",
+            "email": club_email,
+            "password": "TestPassword123!",
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/clubs", json=club_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test club: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        clubs = requests.get(f"{BASE_URL}/clubs").json()
+        cls.club_id = next(club["id"] for club in clubs if club["email"] == club_email)
+
+        with open(FIXTURES_DIR / "test_club_video.mp4", "rb") as f:
+            cls.video = f.read()
+        print(f"✅ Test club created")
+
+    def start_upload(self) -> dict:
+        response = requests.post(f"{BASE_URL}/uploads/resumable", json={
+            "owner_id": self.club_id,
+            "kind": "club_video",
+            "filename": "match.mp4",
+            "content_type": "video/mp4",
+            "size": len(self.video),
+            "chunk_size": 1024
+        })
+        self.assertEqual(response.status_code, 200, f"Failed to start upload: {response.text}")
+        return response.json()
+
+    def put_chunk(self, upload: dict, index: int, data: bytes, checksum: str = None) -> requests.Response:
+        return requests.put(
+            f"{BASE_URL}/uploads/resumable/{upload['id']}/chunks/{index}",
+            data=data,
+            headers={"Chunk-SHA256": checksum or sha256(data)}
+        )
+
+    def test_01_resume_after_interruption(self):
+        """Test that an interrupted upload resumes with only the missing chunks"""
+        print("\n🔍 Testing resumable club video upload...")
+        upload = self.start_upload()
+        chunk_size = upload["chunk_size"]
+        chunks = [self.video[start:start + chunk_size] for start in range(0, len(self.video), chunk_size)]
+        self.assertEqual(upload["total_chunks"], len(chunks))
+
+        # The connection drops after the first chunk
+        response = self.put_chunk(upload, 0, chunks[0])
+        self.assertEqual(response.status_code, 200, f"Failed to upload chunk: {response.text}")
+
+        response = requests.get(f"{BASE_URL}/uploads/resumable/{upload['id']}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["missing"], list(range(1, len(chunks))))
+
+        for index in response.json()["missing"]:
+            response = self.put_chunk(upload, index, chunks[index])
+            self.assertEqual(response.status_code, 200, f"Failed to upload chunk: {response.text}")
+
+        response = requests.post(
+            f"{BASE_URL}/uploads/resumable/{upload['id']}/complete",
+            params={"sha256": sha256(self.video)}
+        )
+        self.assertEqual(response.status_code, 200, f"Failed to complete upload: {response.text}")
+        filename = response.json()["filename"]
+
+        videos = requests.get(f"{BASE_URL}/clubs/{self.club_id}/videos").json()
+        video = next(video for video in videos if video["filename"] == filename)
+        self.assertEqual(video["file_size"], len(self.video))
+        print(f"✅ Resumed upload assembled {len(chunks)} chunks into the club's videos")
+
+    def test_02_corrupt_chunk_rejected(self):
+        """Test that a chunk that does not match its checksum is not kept"""
+        print("\n🔍 Testing chunk checksum verification...")
+        upload = self.start_upload()
+        chunk = self.video[:upload["chunk_size"]]
+        response = self.put_chunk(upload, 0, chunk, checksum=sha256(b"something else"))
+        self.assertEqual(response.status_code, 400)
+
+        response = requests.get(f"{BASE_URL}/uploads/resumable/{upload['id']}")
+        self.assertIn(0, response.json()["missing"])
+
+        response = requests.post(f"{BASE_URL}/uploads/resumable/{upload['id']}/complete")
+        self.assertEqual(response.status_code, 400)
+
+        response = requests.delete(f"{BASE_URL}/uploads/resumable/{upload['id']}")
+        self.assertEqual(response.status_code, 200)
+        print("✅ Corrupt chunk rejected and upload aborted")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from upload_gc import GC_SHARDS, GC_STATE_ID, UploadGC
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield dict(document)
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for the collector: unfiltered finds and state upserts by id"""
+
+    def __init__(self, documents=None):
+        self.documents = list(documents or [])
+
+    def find(self, filter_query=None, projection=None):
+        return FakeCursor(self.documents)
+
+    async def find_one(self, filter_query, projection=None):
+        return next((dict(document) for document in self.documents if document["id"] == filter_query["id"]), None)
+
+    async def update_one(self, filter_query, update, upsert=False):
+        document = next((document for document in self.documents if document["id"] == filter_query["id"]), None)
+        if document is None and upsert:
+            document = {"id": filter_query["id"]}
+            self.documents.append(document)
+        if document is not None:
+            document.update(update["$set"])
+
+
+class FakeDatabase:
+    def __init__(self, players=None, clubs=None, media=None):
+        self.players = FakeCollection(players)
+        self.clubs = FakeCollection(clubs)
+        self.media = FakeCollection(media)
+        self.upload_gc_state = FakeCollection()
+
+
+class UploadGCTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.upload_dir = root / "uploads"
+        self.quarantine_dir = root / "upload_quarantine"
+        self.db = FakeDatabase(
+            players=[{"id": "p1", "avatar": "kept_avatar.jpg", "cv_document": None}],
+            clubs=[{"id": "c1", "logo": "kept_logo.png"}],
+            media=[{"owner_type": "player", "kind": "photos", "filename": "kept_photo.jpg"}]
+        )
+
+    def collector(self, **kwargs) -> UploadGC:
+        kwargs.setdefault("shards_per_run", GC_SHARDS)
+        return UploadGC(self.db, self.upload_dir, self.quarantine_dir,
+                        grace_period=timedelta(hours=24), quarantine_period=timedelta(days=7), **kwargs)
+
+    def write(self, root: Path, path: str, age: timedelta = timedelta(0), content: bytes = b"data") -> Path:
+        file_path = root / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(content)
+        mtime = time.time() - age.total_seconds()
+        os.utime(file_path, (mtime, mtime))
+        return file_path
+
+    async def test_01_referenced_files_kept(self):
+        """Test that files referenced from profiles and media entries stay, however old"""
+        old = timedelta(days=30)
+        paths = [
+            self.write(self.upload_dir, "avatars/kept_avatar.jpg", old),
+            self.write(self.upload_dir, "logos/kept_logo.png", old),
+            self.write(self.upload_dir, "photos/kept_photo.jpg", old)
+        ]
+        report = await self.collector().run()
+        self.assertTrue(all(path.exists() for path in paths))
+        self.assertEqual(report["referenced"], 3)
+        self.assertEqual(report["scanned"], 3)
+        self.assertEqual(report["quarantined"], 0)
+
+    async def test_02_new_orphans_kept(self):
+        """Test that unreferenced files inside the grace period are left for uploads still being saved"""
+        path = self.write(self.upload_dir, "photos/in_flight.jpg", timedelta(hours=1))
+        report = await self.collector().run()
+        self.assertTrue(path.exists())
+        self.assertEqual(report["quarantined"], 0)
+
+    async def test_03_old_orphans_quarantined(self):
+        """Test that unreferenced files past the grace period move to quarantine with a fresh mtime"""
+        path = self.write(self.upload_dir, "videos/orphan.mp4", timedelta(days=2), b"0123456789")
+        report = await self.collector().run()
+        quarantined = self.quarantine_dir / "videos" / "orphan.mp4"
+        self.assertFalse(path.exists())
+        self.assertTrue(quarantined.exists())
+        self.assertGreater(quarantined.stat().st_mtime, time.time() - 60)
+        self.assertEqual(report["quarantined"], 1)
+        self.assertEqual(report["quarantined_bytes"], 10)
+
+    async def test_04_referenced_again_restored(self):
+        """Test that a quarantined file referenced again is put back in the upload directory"""
+        self.write(self.quarantine_dir, "photos/kept_photo.jpg", timedelta(days=30))
+        report = await self.collector().run()
+        self.assertTrue((self.upload_dir / "photos" / "kept_photo.jpg").exists())
+        self.assertFalse((self.quarantine_dir / "photos" / "kept_photo.jpg").exists())
+        self.assertEqual(report["restored"], 1)
+        self.assertEqual(report["deleted"], 0)
+
+    async def test_05_expired_quarantine_deleted(self):
+        """Test that files quarantined longer than the quarantine period are deleted, newer ones kept"""
+        expired = self.write(self.quarantine_dir, "documents/old_cv.pdf", timedelta(days=8), b"12345")
+        recent = self.write(self.quarantine_dir, "documents/recent_cv.pdf", timedelta(days=1))
+        report = await self.collector().run()
+        self.assertFalse(expired.exists())
+        self.assertTrue(recent.exists())
+        self.assertEqual(report["deleted"], 1)
+        self.assertEqual(report["reclaimed_bytes"], 5)
+
+    async def test_06_dry_run_touches_nothing(self):
+        """Test that a dry run reports what it would do without moving, deleting or checkpointing"""
+        orphan = self.write(self.upload_dir, "photos/orphan.jpg", timedelta(days=2))
+        expired = self.write(self.quarantine_dir, "photos/expired.jpg", timedelta(days=8))
+        restorable = self.write(self.quarantine_dir, "avatars/kept_avatar.jpg", timedelta(days=1))
+        report = await self.collector(dry_run=True).run()
+        self.assertTrue(orphan.exists())
+        self.assertTrue(expired.exists())
+        self.assertTrue(restorable.exists())
+        self.assertFalse((self.upload_dir / "avatars" / "kept_avatar.jpg").exists())
+        self.assertEqual((report["quarantined"], report["deleted"], report["restored"]), (1, 1, 1))
+        self.assertEqual(self.db.upload_gc_state.documents, [])
+
+    async def test_07_next_shard_advances(self):
+        """Test that each run covers the next shards and wraps around"""
+        collector = self.collector(shards_per_run=8)
+        report = await collector.run()
+        self.assertEqual(report["shards"], list(range(8)))
+        state = await self.db.upload_gc_state.find_one({"id": GC_STATE_ID})
+        self.assertEqual(state["next_shard"], 8)
+        self.assertEqual(state["last_report"]["shards"], list(range(8)))
+
+        report = await collector.run()
+        self.assertEqual(report["shards"], list(range(8, 16)))
+
+        await self.db.upload_gc_state.update_one({"id": GC_STATE_ID}, {"$set": {"next_shard": GC_SHARDS - 4}})
+        report = await collector.run()
+        self.assertEqual(report["shards"], [0, 1, 2, 3, GC_SHARDS - 4, GC_SHARDS - 3, GC_SHARDS - 2, GC_SHARDS - 1])
+        self.assertEqual((await self.db.upload_gc_state.find_one({"id": GC_STATE_ID}))["next_shard"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
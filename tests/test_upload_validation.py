@@ -0,0 +1,72 @@
+import requests
+import unittest
+import uuid
+from pathlib import Path
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+FIXTURES_DIR = Path(__file__).parent
+
+class UploadValidationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        player_email = f"player_{cls.test_id}@test.com"
+        player_data = {
+            "name": f"Test Player {cls.test_id}",
+            "email": player_email,
+            "password": "TestPassword123!",
+            "position": "Goalkeeper",
+            "experience_level": "Intermediate",
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/players", json=player_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test player: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        players = requests.get(f"{BASE_URL}/players").json()
+        cls.player_id = next(player["id"] for player in players if player["email"] == player_email)
+        print(f"✅ Test player created")
+
+    def test_01_disguised_file_rejected(self):
+        """Test that a text file with an image extension is rejected by its content"""
+        print("\n🔍 Testing upload of a disguised text file...")
+        with open(FIXTURES_DIR / "test_invalid.txt", "rb") as f:
+            files = {"file": ("holiday.jpg", f, "image/jpeg")}
+            response = requests.post(f"{BASE_URL}/players/{self.player_id}/photos", files=files)
+        self.assertEqual(response.status_code, 400, f"Disguised file was accepted: {response.text}")
+        self.assertIn("Invalid file content", response.json()["detail"])
+        print("✅ Disguised text file rejected")
+
+    def test_02_image_accepted(self):
+        """Test that a real image is accepted, whichever image extension it has"""
+        print("\n🔍 Testing upload of a PNG image...")
+        with open(FIXTURES_DIR / "test_gallery.jpg", "rb") as f:
+            files = {"file": ("photo.jpg", f, "application/octet-stream")}
+            response = requests.post(f"{BASE_URL}/players/{self.player_id}/photos", files=files)
+        self.assertEqual(response.status_code, 200, f"Failed to upload image: {response.text}")
+
+        # The recorded type is the sniffed one, not what the client declared
+        photos = requests.get(f"{BASE_URL}/players/{self.player_id}/photos").json()
+        photo = next(photo for photo in photos if photo["filename"] == response.json()["filename"])
+        self.assertEqual(photo["file_type"], "image/png")
+        print("✅ PNG image accepted")
+
+    def test_03_video_content_checked(self):
+        """Test that a video upload must carry a video container header"""
+        print("\n🔍 Testing video container validation...")
+        with open(FIXTURES_DIR / "test_photo.jpg", "rb") as f:
+            files = {"file": ("clip.mp4", f, "video/mp4")}
+            response = requests.post(f"{BASE_URL}/players/{self.player_id}/videos", files=files)
+        self.assertEqual(response.status_code, 400)
+
+        with open(FIXTURES_DIR / "test_club_video.mp4", "rb") as f:
+            files = {"file": ("clip.mp4", f, "video/mp4")}
+            response = requests.post(f"{BASE_URL}/players/{self.player_id}/videos", files=files)
+        self.assertEqual(response.status_code, 200, f"Failed to upload video: {response.text}")
+        print("✅ Video container header validated")
+
+if __name__ == "__main__":
+    unittest.main()
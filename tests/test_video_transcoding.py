@@ -0,0 +1,71 @@
+import requests
+import time
+import unittest
+import uuid
+from pathlib import Path
+
+# Use the public endpoint from the frontend .env file
+BASE_URL = "https://44807d79-6707-4de4-af2d-bda42117593c.preview.emergentagent.com/api"
+FIXTURES_DIR = Path(__file__).parent
+
+class VideoTranscodingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Generate unique identifiers for test data
+        cls.test_id = str(uuid.uuid4())[:8]
+        player_email = f"player_{cls.test_id}@test.com"
+        player_data = {
+            "name": f"Test Player {cls.test_id}",
+            "email": player_email,
+            "password": "TestPassword123!",
+            "position": "Forward",
+            "experience_level": "Intermediate",
+            "location": "Test City"
+        }
+        response = requests.post(f"{BASE_URL}/players", json=player_data)
+        if response.status_code != 200:
+            print(f"❌ Failed to create test player: {response.status_code} - {response.text}")
+            raise Exception("Test setup failed")
+
+        players = requests.get(f"{BASE_URL}/players").json()
+        cls.player_id = next(player["id"] for player in players if player["email"] == player_email)
+        print(f"✅ Test player created")
+
+    def test_01_video_transcoded(self):
+        """Test that an uploaded video gets a web rendition and a poster"""
+        print("\n🔍 Testing video transcoding...")
+        with open(FIXTURES_DIR / "test_video.mp4", "rb") as f:
+            response = requests.post(
+                f"{BASE_URL}/players/{self.player_id}/videos",
+                files={"file": ("test_video.mp4", f, "video/mp4")}
+            )
+        self.assertEqual(response.status_code, 200, f"Failed to upload video: {response.text}")
+        filename = response.json()["filename"]
+
+        videos = requests.get(f"{BASE_URL}/players/{self.player_id}/videos").json()
+        video = next(video for video in videos if video["filename"] == filename)
+        if not video.get("transcode_job_id"):
+            self.skipTest("Transcoding is not enabled on this server")
+
+        job = None
+        for _ in range(120):
+            response = requests.get(f"{BASE_URL}/transcode-jobs/{video['transcode_job_id']}")
+            self.assertEqual(response.status_code, 200, f"Failed to get transcode job: {response.text}")
+            job = response.json()
+            if job["status"] in ("completed", "failed", "cancelled"):
+                break
+            time.sleep(0.5)
+        self.assertEqual(job["status"], "completed", f"Transcode did not complete: {job}")
+
+        videos = requests.get(f"{BASE_URL}/players/{self.player_id}/videos").json()
+        video = next(video for video in videos if video["filename"] == filename)
+        self.assertEqual(video["transcode_status"], "completed")
+        self.assertTrue(video["web_filename"].endswith(".mp4"))
+        self.assertTrue(video["poster_filename"].endswith(".jpg"))
+
+        response = requests.get(f"{BASE_URL}/uploads/videos/{video['poster_filename']}")
+        self.assertEqual(response.status_code, 200)
+        print(f"✅ Video transcoded to {video['web_filename']} with poster {video['poster_filename']}")
+
+if __name__ == "__main__":
+    unittest.main()